@@ -1,16 +1,237 @@
+import argparse
 import random
 import time
+from collections import namedtuple
 
-class Checkers:
-    def __init__(self):
+# A move: the squares (row, col) the piece stops on, from start to end, and
+# the squares of the pieces it jumps (empty for a simple move)
+Move = namedtuple('Move', ['path', 'captures'])
+
+# Directions each piece moves in: X (human) moves down, O (AI) moves up, kings K and Q both ways
+DIRECTIONS = {
+    'X': ((1, 1), (1, -1)),
+    'O': ((-1, 1), (-1, -1)),
+    'K': ((1, 1), (1, -1), (-1, 1), (-1, -1)),
+    'Q': ((1, 1), (1, -1), (-1, 1), (-1, -1)),
+}
+OPPONENTS = {'X': 'OQ', 'K': 'OQ', 'O': 'XK', 'Q': 'XK'}
+CROWN_ROW = {'X': 7, 'O': 0}  # Men reaching this row become kings
+
+def square_bit(row, col):
+    """Bit of a dark square in the bitboard layout (see BitboardEngine)"""
+    return 1 << (4 * row + col // 2 + row // 2)
+
+def _row_bits(*rows):
+    return sum(square_bit(row, col) for row in rows for col in range(8) if (row + col) % 2 == 1)
+
+class SearchTimeout(Exception):
+    pass
+
+class BitboardEngine:
+    """
+    Alpha-beta search on bitboards: one int for each side's pieces plus one for kings
+
+    Dark square (row, col) is bit 4*row + col//2 + row//2. The spare bits 8, 17
+    and 26 make every diagonal step a shift by 4 or 5 and every jump a shift by
+    8 or 10; a step off the board lands on a spare bit or outside the 35 bits.
+    Side 0 (X) moves towards higher bits, side 1 (O) towards lower bits.
+    A move is (from bit, to bit, mask of jumped pieces).
+    """
+    VALID = _row_bits(*range(8))
+    CROWN = (_row_bits(7), _row_bits(0))
+    BACK_ROW = (_row_bits(0), _row_bits(7))
+    ADVANCED = (_row_bits(4, 5, 6), _row_bits(1, 2, 3))
+    CENTER = sum(square_bit(row, col) for row in (3, 4) for col in range(2, 6) if (row + col) % 2 == 1)
+    FORWARD = ((4, 5), (-4, -5))
+    ALL_DIRECTIONS = (4, 5, -4, -5)
+    WIN_SCORE = 100_000
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, tt_size=1_000_000):
+        self.tt = {}  # position key -> (depth, flag, score, best move)
+        self.tt_size = tt_size
+        self.history = {}  # (from, to) -> bonus for simple moves that caused cutoffs
+        self.nodes = 0
+        self.deadline = None
+
+    def captures(self, own, opp, kings, side):
+        """Get every complete jump sequence of the side to move"""
+        moves = []
+        empty = self.VALID & ~(own | opp)
+        pieces = own
+        while pieces:
+            bit = pieces & -pieces
+            pieces ^= bit
+            king = bool(bit & kings)
+            directions = self.ALL_DIRECTIONS if king else self.FORWARD[side]
+            # The jumping piece leaves its square; jumped pieces stay until the move ends
+            self._extend_jumps(bit, bit, 0, opp, empty | bit, directions, king, side, moves)
+        return moves
+
+    def _extend_jumps(self, start, at, captured, opp, empty, directions, king, side, moves):
+        """Add the jump sequences continuing from bit `at` to moves"""
+        jumped_again = False
+        for shift in directions:
+            if shift > 0:
+                over = at << shift
+                land = over << shift
+            else:
+                over = at >> -shift
+                land = over >> -shift
+            if over & opp and not over & captured and land & empty:
+                jumped_again = True
+                if not king and land & self.CROWN[side]:
+                    moves.append((start, land, captured | over))  # Being crowned ends the move
+                else:
+                    self._extend_jumps(start, land, captured | over, opp, empty, directions, king, side, moves)
+        if not jumped_again and captured:
+            moves.append((start, at, captured))
+
+    def simple_moves(self, own, opp, kings, side):
+        """Get the non-capturing moves of the side to move, one shift per direction"""
+        moves = []
+        empty = self.VALID & ~(own | opp)
+        men = own & ~kings
+        own_kings = own & kings
+        for shift in self.ALL_DIRECTIONS:
+            movers = own_kings | men if shift in self.FORWARD[side] else own_kings
+            targets = (movers << shift if shift > 0 else movers >> -shift) & empty
+            while targets:
+                to = targets & -targets
+                targets ^= to
+                moves.append((to >> shift if shift > 0 else to << -shift, to, 0))
+        return moves
+
+    def legal_moves(self, own, opp, kings, side):
+        """Get the legal moves; jumping is compulsory"""
+        return self.captures(own, opp, kings, side) or self.simple_moves(own, opp, kings, side)
+
+    def apply(self, own, opp, kings, side, move):
+        """Make a move, returning the new (own, opp, kings) seen from the opponent's side"""
+        start, to, captured = move
+        own ^= start ^ to
+        opp &= ~captured
+        kings &= ~captured
+        if kings & start:
+            kings ^= start ^ to
+        elif to & self.CROWN[side]:
+            kings |= to
+        return opp, own, kings
+
+    def evaluate(self, own, opp, kings, side):
+        """Score a position for the side to move: material, advancement, back row and center"""
+        own_men = own & ~kings
+        opp_men = opp & ~kings
+        score = 100 * (own_men.bit_count() - opp_men.bit_count())
+        score += 175 * ((own & kings).bit_count() - (opp & kings).bit_count())
+        score += 4 * ((own_men & self.ADVANCED[side]).bit_count() - (opp_men & self.ADVANCED[1 - side]).bit_count())
+        score += 6 * ((own_men & self.BACK_ROW[side]).bit_count() - (opp_men & self.BACK_ROW[1 - side]).bit_count())
+        score += 3 * ((own & self.CENTER).bit_count() - (opp & self.CENTER).bit_count())
+        return score
+
+    def negamax(self, own, opp, kings, side, depth, alpha, beta, ply):
+        """Alpha-beta search; positions with a jump pending are searched past depth 0"""
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        moves = self.captures(own, opp, kings, side)
+        if not moves:
+            if depth <= 0:
+                return self.evaluate(own, opp, kings, side)
+            moves = self.simple_moves(own, opp, kings, side)
+            if not moves:
+                return -(self.WIN_SCORE - ply)  # No pieces or no moves left: lost
+
+        key = own | opp << 35 | kings << 70 | side << 105
+        entry = self.tt.get(key)
+        best_move = None
+        if entry is not None:
+            entry_depth, flag, score, best_move = entry
+            if entry_depth >= depth:
+                if flag == self.EXACT:
+                    return score
+                if flag == self.LOWER:
+                    alpha = max(alpha, score)
+                elif score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+
+        # Best move from earlier searches first, then the longest jumps, crowning moves and history
+        history = self.history
+        crown = self.CROWN[side]
+        moves.sort(key=lambda move: (move == best_move, move[2].bit_count(), bool(move[1] & crown and not move[0] & kings),
+                                     history.get((move[0], move[1]), 0)), reverse=True)
+
+        original_alpha = alpha
+        best_score = -self.WIN_SCORE * 2
+        for move in moves:
+            next_own, next_opp, next_kings = self.apply(own, opp, kings, side, move)
+            score = -self.negamax(next_own, next_opp, next_kings, 1 - side, depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                if not move[2]:
+                    history[(move[0], move[1])] = history.get((move[0], move[1]), 0) + depth * depth
+                break
+
+        if best_score <= original_alpha:
+            flag = self.UPPER
+        elif best_score >= beta:
+            flag = self.LOWER
+        else:
+            flag = self.EXACT
+        if len(self.tt) >= self.tt_size:
+            self.tt.clear()
+        self.tt[key] = (depth, flag, best_score, best_move)
+        return best_score
+
+    def best_move(self, own, opp, kings, side, max_depth=64, time_limit=None):
+        """Iterative deepening; returns (move, score, depth) of the deepest completed iteration"""
+        self.nodes = 0
+        start = time.perf_counter()
+        moves = self.legal_moves(own, opp, kings, side)
+        if len(moves) <= 1:
+            return (moves[0] if moves else None), None, 0  # Nothing to choose
+
+        best = (moves[0], None, 0)
+        key = own | opp << 35 | kings << 70 | side << 105
+        for depth in range(1, max_depth + 1):
+            self.deadline = start + time_limit if time_limit is not None and depth > 1 else None
+            try:
+                score = self.negamax(own, opp, kings, side, depth, -self.WIN_SCORE * 2, self.WIN_SCORE * 2, 0)
+            except SearchTimeout:
+                break
+            finally:
+                self.deadline = None
+            entry = self.tt.get(key)
+            if entry is not None and entry[3] is not None:
+                best = (entry[3], score, depth)
+            if abs(score) >= self.WIN_SCORE - 1000:
+                break  # Forced result found
+            if time_limit is not None and time.perf_counter() - start > time_limit / 2:
+                break  # The next iteration would not finish in time
+        return best
+
+class CheckersEngine:
+    """Board state, rules and move choice, without any input or output"""
+    
+    def __init__(self, seed=None, ai_mode='search', time_limit=1.0):
+        self.rng = random.Random(seed)
+        self.ai_mode = ai_mode  # search (bitboard alpha-beta) or random (longest jump, otherwise random)
+        self.time_limit = time_limit  # Seconds of search per move
+        self.bitboard = BitboardEngine()
+        self.reset()
+    
+    def reset(self):
+        """Set up the pieces for a new game"""
         self.board = self.initialize_board()
-        self.current_player = 'human'  # human or ai
         self.human_pieces = 12
         self.ai_pieces = 12
-        self.game_count = 0
-        self.human_wins = 0
-        self.ai_wins = 0
-        
+    
     def initialize_board(self):
         """Initialize the checkers board with pieces in starting positions"""
         board = [[' ' for _ in range(8)] for _ in range(8)]
@@ -29,51 +250,6 @@ class Checkers:
         
         return board
     
-    def display_board(self):
-        """Display the current game board with coordinates"""
-        print("\n" + "="*50)
-        print("    A   B   C   D   E   F   G   H")
-        print("  +---+---+---+---+---+---+---+---+")
-        
-        for row in range(8):
-            print(f"{8-row} |", end="")
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece == ' ':
-                    print("   |", end="")
-                else:
-                    print(f" {piece} |", end="")
-            print(f" {8-row}")
-            print("  +---+---+---+---+---+---+---+---+")
-        
-        print("    A   B   C   D   E   F   G   H")
-        print("="*50)
-        print(f"Human pieces (X): {self.human_pieces}")
-        print(f"AI pieces (O): {self.ai_pieces}")
-        print("="*50)
-    
-    def get_coordinates(self, position):
-        """Convert position like 'A1' to board coordinates (row, col)"""
-        if len(position) != 2:
-            return None, None
-        
-        col_char = position[0].upper()
-        row_char = position[1]
-        
-        if col_char not in 'ABCDEFGH' or row_char not in '12345678':
-            return None, None
-        
-        col = ord(col_char) - ord('A')
-        row = 8 - int(row_char)
-        
-        return row, col
-    
-    def get_position_string(self, row, col):
-        """Convert board coordinates to position string like 'A1'"""
-        col_char = chr(ord('A') + col)
-        row_char = str(8 - row)
-        return col_char + row_char
-    
     def is_valid_position(self, row, col):
         """Check if position is within board bounds"""
         return 0 <= row < 8 and 0 <= col < 8
@@ -97,148 +273,271 @@ class Checkers:
         return piece in ['K', 'Q']
     
     def get_valid_moves(self, row, col):
-        """Get all valid moves for a piece at given position"""
+        """Get all valid moves for a piece at given position (only its jumps if it has any)"""
         piece = self.get_piece(row, col)
         if piece == ' ':
             return []
         
-        moves = []
-        is_human = self.is_human_piece(piece)
-        is_king_piece = self.is_king(piece)
-        
-        # Define movement directions
-        if is_human and not is_king_piece:
-            # Human regular pieces move down
-            directions = [(1, 1), (1, -1)]
-        elif not is_human and not is_king_piece:
-            # AI regular pieces move up
-            directions = [(-1, 1), (-1, -1)]
-        else:
-            # Kings can move in all directions
-            directions = [(1, 1), (1, -1), (-1, 1), (-1, -1)]
-        
-        # Check for captures first (forced moves)
-        captures = []
-        for dr, dc in directions:
-            capture_row = row + 2 * dr
-            capture_col = col + 2 * dc
-            jump_row = row + dr
-            jump_col = col + dc
-            
-            if (self.is_valid_position(capture_row, capture_col) and
-                self.get_piece(capture_row, capture_col) == ' ' and
-                self.is_valid_position(jump_row, jump_col)):
-                
-                jump_piece = self.get_piece(jump_row, jump_col)
-                if ((is_human and self.is_ai_piece(jump_piece)) or
-                    (not is_human and self.is_human_piece(jump_piece))):
-                    captures.append((capture_row, capture_col, jump_row, jump_col))
-        
+        captures = self.get_captures(row, col)
         if captures:
             return captures
-        
-        # If no captures, check regular moves
-        for dr, dc in directions:
+        return self.get_simple_moves(row, col)
+    
+    def get_simple_moves(self, row, col):
+        """Get the non-capturing moves of the piece at a position"""
+        moves = []
+        for dr, dc in DIRECTIONS[self.board[row][col]]:
             new_row = row + dr
             new_col = col + dc
+            if 0 <= new_row < 8 and 0 <= new_col < 8 and self.board[new_row][new_col] == ' ':
+                moves.append(Move(((row, col), (new_row, new_col)), ()))
+        return moves
+    
+    def get_captures(self, row, col):
+        """Get every complete jump sequence of the piece at a position"""
+        piece = self.board[row][col]
+        chains = []
+        self.board[row][col] = ' '  # The jumping piece may pass over its own square again
+        try:
+            self._extend_chain(piece, row, col, [(row, col)], [], chains)
+        finally:
+            self.board[row][col] = piece
+        return chains
+    
+    def _extend_chain(self, piece, row, col, path, captured, chains):
+        """Add the jump sequences continuing path from (row, col) to chains"""
+        board = self.board
+        opponents = OPPONENTS[piece]
+        jumped_again = False
+        for dr, dc in DIRECTIONS[piece]:
+            land_row = row + 2 * dr
+            land_col = col + 2 * dc
+            if not (0 <= land_row < 8 and 0 <= land_col < 8) or board[land_row][land_col] != ' ':
+                continue
+            jumped = (row + dr, col + dc)
+            # Jumped pieces stay on the board until the move ends and cannot be jumped twice
+            if board[jumped[0]][jumped[1]] not in opponents or jumped in captured:
+                continue
             
-            if (self.is_valid_position(new_row, new_col) and
-                self.get_piece(new_row, new_col) == ' '):
-                moves.append((new_row, new_col))
+            jumped_again = True
+            path.append((land_row, land_col))
+            captured.append(jumped)
+            if land_row == CROWN_ROW.get(piece):
+                chains.append(Move(tuple(path), tuple(captured)))  # Being crowned ends the move
+            else:
+                self._extend_chain(piece, land_row, land_col, path, captured, chains)
+            path.pop()
+            captured.pop()
         
-        return moves
+        if not jumped_again and captured:
+            chains.append(Move(tuple(path), tuple(captured)))
     
     def get_all_valid_moves(self, player):
-        """Get all valid moves for a player"""
-        all_moves = []
-        captures = []
+        """Get all valid moves for a player; jumping is compulsory"""
+        owns = self.is_human_piece if player == 'human' else self.is_ai_piece
+        squares = [(row, col) for row in range(8) for col in range(8) if owns(self.board[row][col])]
         
-        for row in range(8):
-            for col in range(8):
-                piece = self.get_piece(row, col)
-                if ((player == 'human' and self.is_human_piece(piece)) or
-                    (player == 'ai' and self.is_ai_piece(piece))):
-                    
-                    moves = self.get_valid_moves(row, col)
-                    for move in moves:
-                        if len(move) == 4:  # Capture move
-                            captures.append((row, col, move[0], move[1], move[2], move[3]))
-                        else:  # Regular move
-                            all_moves.append((row, col, move[0], move[1]))
+        captures = []
+        for row, col in squares:
+            captures.extend(self.get_captures(row, col))
+        if captures:
+            return captures
         
-        # Return captures if any exist, otherwise return regular moves
-        return captures if captures else all_moves
+        moves = []
+        for row, col in squares:
+            moves.extend(self.get_simple_moves(row, col))
+        return moves
     
-    def make_move(self, from_row, from_col, to_row, to_col, capture_row=None, capture_col=None):
-        """Make a move on the board"""
+    def make_move(self, move):
+        """Make a move with all its jumps, returning what undo_move needs to take it back"""
+        (from_row, from_col), (to_row, to_col) = move.path[0], move.path[-1]
         piece = self.board[from_row][from_col]
         self.board[from_row][from_col] = ' '
         self.board[to_row][to_col] = piece
         
-        # Handle capture
-        if capture_row is not None and capture_col is not None:
-            captured_piece = self.board[capture_row][capture_col]
-            self.board[capture_row][capture_col] = ' '
-            
-            if self.is_human_piece(captured_piece):
-                self.human_pieces -= 1
-            else:
-                self.ai_pieces -= 1
+        # Handle captures
+        captured_pieces = []
+        for row, col in move.captures:
+            captured_pieces.append(self.board[row][col])
+            self.board[row][col] = ' '
+        if self.is_human_piece(piece):
+            self.ai_pieces -= len(captured_pieces)
+        else:
+            self.human_pieces -= len(captured_pieces)
         
         # Handle king promotion
-        if self.is_human_piece(piece) and to_row == 7:
+        if piece == 'X' and to_row == 7:
             self.board[to_row][to_col] = 'K'  # Human king
-        elif self.is_ai_piece(piece) and to_row == 0:
+        elif piece == 'O' and to_row == 0:
             self.board[to_row][to_col] = 'Q'  # AI king
+        
+        return piece, captured_pieces
+    
+    def undo_move(self, move, undo):
+        """Take back a move made with make_move"""
+        piece, captured_pieces = undo
+        (from_row, from_col), (to_row, to_col) = move.path[0], move.path[-1]
+        self.board[to_row][to_col] = ' '
+        self.board[from_row][from_col] = piece  # Also undoes a promotion
+        
+        for (row, col), captured_piece in zip(move.captures, captured_pieces):
+            self.board[row][col] = captured_piece
+        if self.is_human_piece(piece):
+            self.ai_pieces += len(captured_pieces)
+        else:
+            self.human_pieces += len(captured_pieces)
+    
+    def check_winner(self, player_to_move):
+        """Check if there's a winner ('human' or 'ai') with player_to_move about to move"""
+        if self.human_pieces == 0:
+            return 'ai'
+        elif self.ai_pieces == 0:
+            return 'human'
+        
+        # Check if current player has any valid moves
+        current_moves = self.get_all_valid_moves(player_to_move)
+        if not current_moves:
+            return 'ai' if player_to_move == 'human' else 'human'
+        
+        return None
+    
+    def to_bitboards(self, player):
+        """Get the position as (own pieces, opponent pieces, kings, side) for the BitboardEngine"""
+        human = ai = kings = 0
+        for row in range(8):
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece != ' ':
+                    bit = square_bit(row, col)
+                    if self.is_human_piece(piece):
+                        human |= bit
+                    else:
+                        ai |= bit
+                    if self.is_king(piece):
+                        kings |= bit
+        if player == 'human':
+            return human, ai, kings, 0
+        return ai, human, kings, 1
+    
+    def choose_move(self, player):
+        """Pick a move with the bitboard search, or with simple strategy in random mode"""
+        valid_moves = self.get_all_valid_moves(player)
+        
+        if not valid_moves:
+            return None
+        
+        if self.ai_mode == 'search':
+            (start, to, captured), _, _ = self.bitboard.best_move(*self.to_bitboards(player), time_limit=self.time_limit)
+            for move in valid_moves:
+                if (square_bit(*move.path[0]) == start and square_bit(*move.path[-1]) == to
+                        and sum(square_bit(row, col) for row, col in move.captures) == captured):
+                    return move
+        
+        # Simple strategy: the longest jump, otherwise a random move
+        most_captures = max(len(move.captures) for move in valid_moves)
+        return self.rng.choice([move for move in valid_moves if len(move.captures) == most_captures])
+
+class Checkers:
+    """Console front-end: prompts, messages and statistics around a CheckersEngine"""
+    
+    def __init__(self, engine=None, ai_delay=1.0):
+        self.engine = engine or CheckersEngine()
+        self.ai_delay = ai_delay  # Seconds of "thinking" shown before each AI move
+        self.current_player = 'human'  # human or ai
+        self.game_count = 0
+        self.human_wins = 0
+        self.ai_wins = 0
+    
+    @property
+    def board(self):
+        return self.engine.board
+        
+    def display_board(self):
+        """Display the current game board with coordinates"""
+        print("\n" + "="*50)
+        print("    A   B   C   D   E   F   G   H")
+        print("  +---+---+---+---+---+---+---+---+")
+        
+        for row in range(8):
+            print(f"{8-row} |", end="")
+            for col in range(8):
+                piece = self.board[row][col]
+                if piece == ' ':
+                    print("   |", end="")
+                else:
+                    print(f" {piece} |", end="")
+            print(f" {8-row}")
+            print("  +---+---+---+---+---+---+---+---+")
+        
+        print("    A   B   C   D   E   F   G   H")
+        print("="*50)
+        print(f"Human pieces (X): {self.engine.human_pieces}")
+        print(f"AI pieces (O): {self.engine.ai_pieces}")
+        print("="*50)
+    
+    def get_coordinates(self, position):
+        """Convert position like 'A1' to board coordinates (row, col)"""
+        if len(position) != 2:
+            return None, None
+        
+        col_char = position[0].upper()
+        row_char = position[1]
+        
+        if col_char not in 'ABCDEFGH' or row_char not in '12345678':
+            return None, None
+        
+        col = ord(col_char) - ord('A')
+        row = 8 - int(row_char)
+        
+        return row, col
+    
+    def get_position_string(self, row, col):
+        """Convert board coordinates to position string like 'A1'"""
+        col_char = chr(ord('A') + col)
+        row_char = str(8 - row)
+        return col_char + row_char
     
     def get_human_move(self):
         """Get and validate human player's move"""
         while True:
             try:
-                move_input = input("\nYour turn! Enter move (e.g., 'A3 to B4' or 'A3-B4'): ").strip()
+                move_input = input("\nYour turn! Enter move (e.g., 'A3 to B4', 'A3-B4' or 'C3-E5-C7' for a multi-jump): ").strip()
                 
                 # Parse different input formats
                 if ' to ' in move_input:
-                    from_pos, to_pos = move_input.split(' to ')
+                    positions = move_input.split(' to ')
                 elif '-' in move_input:
-                    from_pos, to_pos = move_input.split('-')
+                    positions = move_input.split('-')
                 else:
                     print("Invalid format! Use 'A3 to B4' or 'A3-B4'")
                     continue
                 
-                from_row, from_col = self.get_coordinates(from_pos.strip())
-                to_row, to_col = self.get_coordinates(to_pos.strip())
-                
-                if from_row is None or to_row is None:
+                squares = tuple(self.get_coordinates(position.strip()) for position in positions)
+                if any(row is None for row, _ in squares):
                     print("Invalid coordinates! Use format like 'A3'")
                     continue
                 
                 # Validate the move
-                piece = self.get_piece(from_row, from_col)
-                if not self.is_human_piece(piece):
+                piece = self.engine.get_piece(*squares[0])
+                if not self.engine.is_human_piece(piece):
                     print("That's not your piece!")
                     continue
                 
-                valid_moves = self.get_valid_moves(from_row, from_col)
-                move_found = False
-                capture_move = None
-                
-                for move in valid_moves:
-                    if len(move) == 4:  # Capture move
-                        if move[0] == to_row and move[1] == to_col:
-                            move_found = True
-                            capture_move = (move[2], move[3])
-                            break
-                    else:  # Regular move
-                        if move[0] == to_row and move[1] == to_col:
-                            move_found = True
-                            break
+                # A jump sequence may be given by its start and end squares if that is unambiguous
+                valid_moves = self.engine.get_all_valid_moves('human')
+                matches = [move for move in valid_moves if move.path == squares]
+                if not matches and len(squares) == 2:
+                    matches = [move for move in valid_moves
+                               if move.path[0] == squares[0] and move.path[-1] == squares[1]]
                 
-                if not move_found:
+                if len(matches) == 1:
+                    return matches[0]
+                if matches:
+                    print("Several jump sequences end there! Enter every square, e.g. 'C3-E5-C7'")
+                elif valid_moves and valid_moves[0].captures:
+                    print("You must jump! Captures are compulsory, and a jump continues while it can.")
+                else:
                     print("Invalid move! Try again.")
-                    continue
-                
-                return from_row, from_col, to_row, to_col, capture_move
                 
             except (ValueError, IndexError):
                 print("Invalid input! Use format like 'A3 to B4'")
@@ -246,35 +545,10 @@ class Checkers:
     def get_ai_move(self):
         """AI makes a move using simple strategy"""
         print("\n🤖 AI is thinking...")
-        time.sleep(1)  # Add some drama
-        
-        valid_moves = self.get_all_valid_moves('ai')
-        
-        if not valid_moves:
-            return None
-        
-        # Simple AI strategy: prefer captures, then random move
-        captures = [move for move in valid_moves if len(move) == 6]
-        if captures:
-            move = random.choice(captures)
-            return move[0], move[1], move[2], move[3], (move[4], move[5])
-        else:
-            move = random.choice(valid_moves)
-            return move[0], move[1], move[2], move[3], None
-    
-    def check_winner(self):
-        """Check if there's a winner"""
-        if self.human_pieces == 0:
-            return 'ai'
-        elif self.ai_pieces == 0:
-            return 'human'
-        
-        # Check if current player has any valid moves
-        current_moves = self.get_all_valid_moves(self.current_player)
-        if not current_moves:
-            return 'ai' if self.current_player == 'human' else 'human'
+        if self.ai_delay:
+            time.sleep(self.ai_delay)  # Add some drama
         
-        return None
+        return self.engine.choose_move('ai')
     
     def get_win_message(self, winner):
         """Get win/loss message"""
@@ -309,14 +583,12 @@ class Checkers:
         print("=" * 50)
         print("You are X (regular) and K (king)")
         print("AI is O (regular) and Q (king)")
-        print("Enter moves like 'A3 to B4' or 'A3-B4'")
+        print("Enter moves like 'A3 to B4' or 'A3-B4', and jumps like 'C3-E5-C7'")
         print("=" * 50)
         
         while True:
             # Reset board for new game
-            self.board = self.initialize_board()
-            self.human_pieces = 12
-            self.ai_pieces = 12
+            self.engine.reset()
             self.current_player = 'human'
             self.game_count += 1
             
@@ -330,18 +602,17 @@ class Checkers:
                     move = self.get_human_move()
                     if move is None:
                         break
-                    from_row, from_col, to_row, to_col, capture = move
                 else:
                     move = self.get_ai_move()
                     if move is None:
                         break
-                    from_row, from_col, to_row, to_col, capture = move
-                    print(f"AI moves from {self.get_position_string(from_row, from_col)} to {self.get_position_string(to_row, to_col)}")
+                    squares = ' to '.join(self.get_position_string(row, col) for row, col in move.path)
+                    print(f"AI moves from {squares}")
                 
-                self.make_move(from_row, from_col, to_row, to_col, capture[0] if capture else None, capture[1] if capture else None)
+                self.engine.make_move(move)
                 
-                # Check for winner
-                winner = self.check_winner()
+                # Check for winner: the other player has no pieces or no moves left
+                winner = self.engine.check_winner('ai' if self.current_player == 'human' else 'human')
                 if winner:
                     self.display_board()
                     
@@ -375,9 +646,58 @@ class Checkers:
                 else:
                     print("Please enter 'y' or 'n'!")
 
+def simulate(games, seed=None, max_moves=200, ai_mode='search', time_limit=1.0):
+    """Play the AI (O) against random moves (X) and report the results and speed"""
+    rng = random.Random(seed)
+    engine = CheckersEngine(seed, ai_mode, time_limit)
+    results = {'ai': 0, 'random': 0, 'draw': 0}
+    ai_moves = 0
+    ai_time = 0.0
+    start = time.perf_counter()
+    
+    for _ in range(games):
+        engine.reset()
+        player = 'human'
+        for _ in range(max_moves):
+            if player == 'ai':
+                move_start = time.perf_counter()
+                move = engine.choose_move('ai')
+                ai_time += time.perf_counter() - move_start
+                ai_moves += 1
+            else:
+                move = rng.choice(engine.get_all_valid_moves('human'))
+            engine.make_move(move)
+            
+            player = 'ai' if player == 'human' else 'human'
+            winner = engine.check_winner(player)
+            if winner:
+                results['ai' if winner == 'ai' else 'random'] += 1
+                break
+        else:
+            results['draw'] += 1  # Move limit reached
+    
+    elapsed = time.perf_counter() - start
+    print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.1f} games/s)")
+    print(f"AI wins: {results['ai']}, random wins: {results['random']}, draws: {results['draw']}")
+    print(f"AI moves: {ai_moves}, {ai_time / max(ai_moves, 1) * 1000:.2f} ms per move")
+    return results
+
 def main():
     """Main function to start the game"""
-    game = Checkers()
+    parser = argparse.ArgumentParser(description="Play Checkers against the computer")
+    parser.add_argument("--ai", choices=["search", "random"], default="search",
+                        help="AI to play against: alpha-beta search or random moves (default: search)")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="seconds of search per AI move (default: 1)")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds the AI pretends to think (default: 1)")
+    parser.add_argument("--simulate", type=int, metavar="GAMES", help="play the AI against random moves and exit")
+    parser.add_argument("--seed", type=int, help="random seed for --simulate")
+    args = parser.parse_args()
+    
+    if args.simulate:
+        simulate(args.simulate, args.seed, ai_mode=args.ai, time_limit=args.time_limit)
+        return
+    
+    game = Checkers(CheckersEngine(ai_mode=args.ai, time_limit=args.time_limit), ai_delay=args.delay)
     game.play_game()
 
 if __name__ == "__main__":
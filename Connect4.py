@@ -1,44 +1,597 @@
+import argparse
+from array import array
+import mmap
+import multiprocessing
+import os
 import random
+import struct
 import time
 
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "connect4_book.bin")
+
+# Positions with exact scores checked by exhaustive search (moves as columns 1-7)
+BENCHMARK_POSITIONS = [
+    ("575213773346345141373424711425", 1),
+    ("311437345334537146647114256512", -1),
+    ("527427557145553641214713171374", 5),
+    ("224435374133127534543554562127", 2),
+    ("43423657416555366653615374", 7),
+    ("54127167245336645345512773", 1),
+    ("45366435544344153355326721", -2),
+    ("34326512443374535447275576", -2),
+    ("5346545345516572741447", 9),
+    ("6474551147655741251445", -2),
+    ("7254446172213646676411", 2),
+    ("7241435541366534133347", 9),
+    ("134443344324172631", 2),
+    ("376422457563531541", 11),
+    ("541442443433273666", 9),
+    ("475655561343763363", 0),
+]
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class BitboardEngine:
+    # Column c uses bits c*7 .. c*7+5 from bottom to top; bit c*7+6 stays empty
+    # so shifted lines never wrap into the next column.
+    WIDTH = 7
+    HEIGHT = 6
+    BOTTOM = sum(1 << (c * 7) for c in range(7))
+    FULL = BOTTOM * ((1 << 6) - 1)
+    CENTER_FIRST = [3, 2, 4, 1, 5, 0, 6]
+    WIN_SCORE = 1_000_000
+    EXACT, LOWER, UPPER = 0, 1, 2
+
+    def __init__(self, tt_size=1_000_003):
+        # Fixed-size tables indexed by key % tt_size; a new entry replaces whatever
+        # was in its slot. Keys are stored to tell a position from the one it replaced.
+        self.tt_size = tt_size
+        self.tt_keys = array('Q', bytes(8 * tt_size))
+        self.tt_data = array('q', bytes(8 * tt_size))  # packed (score, depth, flag + 1, best column)
+        self.solve_keys = array('Q', bytes(8 * tt_size))
+        self.solve_data = array('b', bytes(tt_size))  # bound * 4 + flag (LOWER or UPPER), 0 if empty
+        self.nodes = 0
+        self.deadline = None
+
+    def probe(self, key):
+        # (depth, flag, score, best column) stored for a position, or None
+        index = key % self.tt_size
+        data = self.tt_data[index]
+        if not data or self.tt_keys[index] != key:
+            return None
+        return (data >> 8) & 0xFF, ((data >> 4) & 0xF) - 1, data >> 16, data & 0xF
+
+    def _store(self, key, depth, flag, score, best_col):
+        index = key % self.tt_size
+        self.tt_keys[index] = key
+        self.tt_data[index] = (score << 16) | (depth << 8) | ((flag + 1) << 4) | best_col
+
+    @staticmethod
+    def from_board(board, symbol):
+        # Returns (stones of symbol, all stones, number of stones); board[0] is the top row
+        position = mask = moves = 0
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell != " ":
+                    bit = 1 << (c * 7 + 5 - r)
+                    mask |= bit
+                    moves += 1
+                    if cell == symbol:
+                        position |= bit
+        return position, mask, moves
+
+    @classmethod
+    def from_moves(cls, sequence):
+        # Plays columns given as digits 1-7 ("4453"); returns (stones of the side to move, all stones, moves)
+        position = mask = moves = 0
+        for char in sequence:
+            col = int(char) - 1
+            bit = ((mask + cls.BOTTOM) & cls.FULL) & (0x3F << (col * 7)) if 0 <= col < cls.WIDTH else 0
+            if not bit or cls.is_win(position | bit):
+                raise ValueError(f"Invalid or winning move {char} in {sequence}")
+            position, mask, moves = position ^ mask, mask | bit, moves + 1
+        return position, mask, moves
+
+    @staticmethod
+    def mirror(bits):
+        # Reflects a bitboard left to right
+        mirrored = 0
+        for col in range(7):
+            mirrored |= ((bits >> (col * 7)) & 0x7F) << ((6 - col) * 7)
+        return mirrored
+
+    @staticmethod
+    def is_win(stones):
+        for shift in (1, 7, 6, 8):  # vertical, horizontal, both diagonals
+            pairs = stones & (stones >> shift)
+            if pairs & (pairs >> (2 * shift)):
+                return True
+        return False
 
-class Connect4:
-    def __init__(self):
+    @classmethod
+    def winning_spots(cls, stones, mask):
+        # Empty cells that would complete four for the owner of stones
+        spots = (stones << 1) & (stones << 2) & (stones << 3)
+        for shift in (7, 6, 8):
+            pair = (stones << shift) & (stones << 2 * shift)
+            spots |= pair & (stones << 3 * shift)
+            spots |= pair & (stones >> shift)
+            pair = (stones >> shift) & (stones >> 2 * shift)
+            spots |= pair & (stones << shift)
+            spots |= pair & (stones >> 3 * shift)
+        return spots & (cls.FULL ^ mask)
+
+    def evaluate(self, position, mask, own_spots=None, opponent_spots=None):
+        # Threat count difference plus center control, from the side to move
+        opponent = position ^ mask
+        if own_spots is None:
+            own_spots = self.winning_spots(position, mask)
+            opponent_spots = self.winning_spots(opponent, mask)
+        center = 0x3F << 21
+        threats = own_spots.bit_count() - opponent_spots.bit_count()
+        return threats * 20 + ((position & center).bit_count() - (opponent & center).bit_count()) * 3
+
+    def negamax(self, position, mask, moves, depth, alpha, beta):
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        if moves == self.WIDTH * self.HEIGHT:
+            return 0
+
+        # Win right away if possible
+        possible = (mask + self.BOTTOM) & self.FULL
+        own_spots = self.winning_spots(position, mask)
+        if own_spots & possible:
+            return self.WIN_SCORE - moves - 1
+
+        # Block an opponent's immediate win; two of them cannot be blocked
+        opponent_spots = self.winning_spots(position ^ mask, mask)
+        forced = possible & opponent_spots
+        if forced:
+            if forced & (forced - 1):
+                return -(self.WIN_SCORE - moves - 2)
+            possible = forced
+        possible &= ~(opponent_spots >> 1)  # Never play right below an opponent's winning cell
+        if not possible:
+            return -(self.WIN_SCORE - moves - 2)
+        if depth == 0:
+            return self.evaluate(position, mask, own_spots, opponent_spots)
+
+        key = position + mask
+        entry = self.probe(key)
+        best_col = None
+        if entry is not None:
+            entry_depth, flag, score, best_col = entry
+            if entry_depth >= depth:
+                if flag == self.EXACT:
+                    return score
+                if flag == self.LOWER:
+                    alpha = max(alpha, score)
+                elif score < beta:
+                    beta = score
+                if alpha >= beta:
+                    return score
+
+        order = self.CENTER_FIRST
+        if best_col is not None:
+            order = [best_col] + [col for col in order if col != best_col]
+
+        original_alpha = alpha
+        best_score = -self.WIN_SCORE * 2
+        for col in order:
+            bit = possible & (0x3F << (col * 7))
+            if not bit:
+                continue
+            score = -self.negamax(position ^ mask, mask | bit, moves + 1, depth - 1, -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                best_col = col
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= original_alpha:
+            flag = self.UPPER
+        elif best_score >= beta:
+            flag = self.LOWER
+        else:
+            flag = self.EXACT
+        self._store(key, depth, flag, best_score, best_col)
+        return best_score
+
+    def best_move(self, position, mask, moves, max_depth=42, time_limit=None):
+        # Iterative deepening; returns (column, score, depth) of the deepest completed iteration
+        self.nodes = 0
+        start = time.perf_counter()
+        best = (None, None, 0)
+        for depth in range(1, min(max_depth, self.WIDTH * self.HEIGHT - moves) + 1):
+            self.deadline = start + time_limit if time_limit is not None and depth > 1 else None
+            try:
+                score = self.negamax(position, mask, moves, depth, -self.WIN_SCORE * 2, self.WIN_SCORE * 2)
+            except SearchTimeout:
+                break
+            finally:
+                self.deadline = None
+            entry = self.probe(position + mask)
+            col = entry[3] if entry is not None and entry[0] >= depth else self._urgent_column(position, mask)
+            best = (col, score, depth)
+            if abs(score) >= self.WIN_SCORE - 42:
+                break  # Forced result found
+            if time_limit is not None and time.perf_counter() - start > time_limit / 2:
+                break  # The next iteration would not finish in time
+        return best
+
+    # Exact solver. Scores follow the usual convention: a win with the player's
+    # k-th to last possible stone scores k, a loss scores -k, a draw 0.
+
+    def solve(self, position, mask, moves, time_limit=None):
+        # Null-window searches narrowing [lowest, highest] until the exact score is known
+        self.nodes = 0
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        try:
+            if self.winning_spots(position, mask) & (mask + self.BOTTOM) & self.FULL:
+                return (self.WIDTH * self.HEIGHT + 1 - moves) // 2
+            lowest = -((self.WIDTH * self.HEIGHT - moves) // 2)
+            highest = (self.WIDTH * self.HEIGHT + 1 - moves) // 2
+            while lowest < highest:
+                med = lowest + (highest - lowest) // 2
+                # Probe near zero first: most positions are close to a draw
+                if med <= 0 and int(lowest / 2) < med:
+                    med = int(lowest / 2)
+                elif med >= 0 and int(highest / 2) > med:
+                    med = int(highest / 2)
+                score = self.solve_negamax(position, mask, moves, med, med + 1)
+                if score <= med:
+                    highest = score
+                else:
+                    lowest = score
+            return lowest
+        finally:
+            self.deadline = None
+
+    def solve_negamax(self, position, mask, moves, alpha, beta):
+        # Fail-soft bound on the exact score; the side to move has no immediate win
+        self.nodes += 1
+        if self.deadline is not None and not self.nodes & 1023 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        possible = (mask + self.BOTTOM) & self.FULL
+        opponent_spots = self.winning_spots(position ^ mask, mask)
+        forced = possible & opponent_spots
+        if forced:
+            if forced & (forced - 1):
+                return -((self.WIDTH * self.HEIGHT - moves) // 2)
+            possible = forced
+        possible &= ~(opponent_spots >> 1)
+        if not possible:
+            return -((self.WIDTH * self.HEIGHT - moves) // 2)
+        if moves >= self.WIDTH * self.HEIGHT - 2:
+            return 0  # Neither side can win with the last two stones
+
+        # The opponent cannot win with their next stone, and we cannot win with this one
+        lowest = -((self.WIDTH * self.HEIGHT - 2 - moves) // 2)
+        if alpha < lowest:
+            alpha = lowest
+            if alpha >= beta:
+                return alpha
+        highest = (self.WIDTH * self.HEIGHT - 1 - moves) // 2
+        key = position + mask
+        index = key % self.tt_size
+        entry = self.solve_data[index]
+        if entry and self.solve_keys[index] == key:
+            flag, value = entry & 3, entry >> 2
+            if flag == self.LOWER:
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        return alpha
+            elif value < highest:
+                highest = value
+        if beta > highest:
+            beta = highest
+            if alpha >= beta:
+                return beta
+
+        # Try moves creating the most threats first, ties broken towards the center
+        children = []
+        for index, col in enumerate(self.CENTER_FIRST):
+            bit = possible & (0x3F << (col * 7))
+            if bit:
+                threats = (self.winning_spots(position | bit, mask | bit)).bit_count()
+                children.append((-threats, index, bit))
+        children.sort()
+
+        for _, _, bit in children:
+            score = -self.solve_negamax(position ^ mask, mask | bit, moves + 1, -beta, -alpha)
+            if score >= beta:
+                self._store_solved(key, self.LOWER, score)
+                return score
+            if score > alpha:
+                alpha = score
+        self._store_solved(key, self.UPPER, alpha)
+        return alpha
+
+    def _store_solved(self, key, flag, value):
+        index = key % self.tt_size
+        self.solve_keys[index] = key
+        self.solve_data[index] = value * 4 + flag
+
+    def solve_move(self, position, mask, moves, time_limit=None):
+        # Returns (column, exact score) of the best move, or raises SearchTimeout
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        possible = (mask + self.BOTTOM) & self.FULL
+        urgent = self._urgent_column(position, mask)
+        if self.winning_spots(position, mask) & possible:
+            return urgent, (self.WIDTH * self.HEIGHT + 1 - moves) // 2
+
+        best = (None, None)
+        for col in self.CENTER_FIRST:
+            bit = possible & (0x3F << (col * 7))
+            if not bit:
+                continue
+            remaining = deadline - time.perf_counter() if deadline is not None else None
+            if remaining is not None and remaining <= 0:
+                raise SearchTimeout()
+            score = -self.solve(position ^ mask, mask | bit, moves + 1, remaining)
+            if best[1] is None or score > best[1]:
+                best = (col, score)
+        return best
+
+    def _urgent_column(self, position, mask):
+        # Column of a root that returned before searching: win, block, or any legal move when lost
+        possible = (mask + self.BOTTOM) & self.FULL
+        for spots in (self.winning_spots(position, mask), self.winning_spots(position ^ mask, mask), possible):
+            for col in self.CENTER_FIRST:
+                if possible & spots & (0x3F << (col * 7)):
+                    return col
+        return None
+
+
+class OpeningBook:
+    # Sorted 8-byte records, searched in place through mmap:
+    # bits 9.. key (position + mask, the smaller of it and its mirror image),
+    # bits 3-8 score + 21, bits 0-2 best column (for the stored orientation).
+    HEADER = struct.Struct("<4sII")  # magic, plies covered, number of records
+    RECORD = struct.Struct("<Q")
+    MAGIC = b"C4BK"
+
+    def __init__(self, path=BOOK_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.plies, self.count = self.HEADER.unpack_from(self.data)
+        if magic != self.MAGIC or len(self.data) != self.HEADER.size + self.count * self.RECORD.size:
+            self.data.close()
+            raise ValueError(f"{path} is not a Connect 4 opening book")
+
+    @staticmethod
+    def canonical(position, mask):
+        # Returns (key, mirrored); a position and its mirror image share one record
+        key = position + mask
+        mirrored = BitboardEngine.mirror(key)
+        return (mirrored, True) if mirrored < key else (key, False)
+
+    def lookup(self, position, mask):
+        # Returns (best column, exact score) or None if the position is not in the book
+        key, mirrored = self.canonical(position, mask)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            value = self.RECORD.unpack_from(self.data, self.HEADER.size + middle * self.RECORD.size)[0]
+            if value >> 9 < key:
+                low = middle + 1
+            elif value >> 9 > key:
+                high = middle
+            else:
+                col = value & 7
+                return (6 - col if mirrored else col), ((value >> 3) & 0x3F) - 21
+        return None
+
+    def entries(self):
+        entries = {}
+        for index in range(self.count):
+            value = self.RECORD.unpack_from(self.data, self.HEADER.size + index * self.RECORD.size)[0]
+            entries[value >> 9] = (value & 7, ((value >> 3) & 0x3F) - 21)
+        return entries
+
+    def close(self):
+        self.data.close()
+
+    @classmethod
+    def write(cls, path, entries, plies):
+        # entries: canonical key -> (best column, score); replaces the file atomically
+        records = bytearray(cls.HEADER.pack(cls.MAGIC, plies, len(entries)))
+        for key in sorted(entries):
+            col, score = entries[key]
+            records += cls.RECORD.pack(key << 9 | (score + 21) << 3 | col)
+        with open(path + ".tmp", "wb") as f:
+            f.write(records)
+        os.replace(path + ".tmp", path)
+
+
+_book_engine = None
+
+
+def _solve_book_position(job):
+    global _book_engine
+    if _book_engine is None:
+        _book_engine = BitboardEngine(tt_size=4_000_037)
+    key, position, mask, moves = job
+    col, score = _book_engine.solve_move(position, mask, moves)
+    return key, col, score
+
+
+def build_opening_book(path=BOOK_PATH, plies=8, root="", workers=None):
+    # Solves every position up to `plies` moves after `root`. Progress is saved
+    # as it goes; running again resumes from the positions already in the file.
+    entries = {}
+    if os.path.exists(path):
+        book = OpeningBook(path)
+        entries = book.entries()
+        book.close()
+    position, mask, moves = BitboardEngine.from_moves(root)
+    key, mirrored = OpeningBook.canonical(position, mask)
+    if mirrored:
+        position, mask = BitboardEngine.mirror(position), BitboardEngine.mirror(mask)
+    frontier = {key: (position, mask)}
+
+    with multiprocessing.Pool(workers) as pool:
+        for ply in range(moves, moves + plies):
+            jobs = [(key, position, mask, ply) for key, (position, mask) in frontier.items() if key not in entries]
+            start = time.perf_counter()
+            for done, (key, col, score) in enumerate(pool.imap_unordered(_solve_book_position, jobs), 1):
+                entries[key] = (col, score)
+                if done % 256 == 0:
+                    OpeningBook.write(path, entries, ply)
+                    print(f"  ply {ply}: {done}/{len(jobs)} positions solved")
+            OpeningBook.write(path, entries, ply + 1)
+            print(f"Ply {ply}: {len(frontier)} positions ({len(jobs)} new) in {time.perf_counter() - start:.1f}s")
+
+            # Positions after the next move, skipping games that end with it
+            children = {}
+            for position, mask in frontier.values():
+                possible = (mask + BitboardEngine.BOTTOM) & BitboardEngine.FULL
+                for col in range(7):
+                    bit = possible & (0x3F << (col * 7))
+                    if not bit or BitboardEngine.is_win(position | bit):
+                        continue
+                    child_position, child_mask = position ^ mask, mask | bit
+                    key, mirrored = OpeningBook.canonical(child_position, child_mask)
+                    if mirrored:
+                        child_position = BitboardEngine.mirror(child_position)
+                        child_mask = BitboardEngine.mirror(child_mask)
+                    children[key] = (child_position, child_mask)
+            frontier = children
+    print(f"Book saved to {path}: {len(entries)} positions")
+
+
+def run_benchmark(path=None):
+    # Solves test positions (lines of "moves score", the format of the common
+    # Connect 4 solver test sets) and reports accuracy, time and nodes
+    if path:
+        with open(path) as f:
+            positions = [(line.split()[0], int(line.split()[1])) for line in f if line.strip()]
+    else:
+        positions = BENCHMARK_POSITIONS
+
+    correct = 0
+    total_time = 0.0
+    total_nodes = 0
+    for sequence, expected in positions:
+        engine = BitboardEngine()
+        position, mask, moves = BitboardEngine.from_moves(sequence)
+        start = time.perf_counter()
+        score = engine.solve(position, mask, moves)
+        elapsed = time.perf_counter() - start
+        total_time += elapsed
+        total_nodes += engine.nodes
+        correct += score == expected
+        mark = "ok" if score == expected else f"WRONG (expected {expected})"
+        print(f"{sequence:<42} {score:>3}  {elapsed:8.3f}s {engine.nodes:>10} nodes  {mark}")
+
+    count = len(positions)
+    print(f"\n{correct}/{count} correct, mean time {total_time / count:.3f}s, "
+          f"mean nodes {total_nodes / count:.0f}, {total_nodes / max(total_time, 1e-9) / 1000:.1f}k nodes/s")
+    return correct == count
+
+
+def _window_score(own, other):
+    empty = 4 - own - other
+    s = 0
+    if own == 4:
+        s += 100000
+    elif own == 3 and empty == 1:
+        s += 50
+    elif own == 2 and empty == 2:
+        s += 10
+    if other == 3 and empty == 1:
+        s -= 60
+    elif other == 2 and empty == 2:
+        s -= 12
+    return s
+
+
+class Connect4Engine:
+    # Board state, rules and AI search, without any input or output
+
+    # Heuristic score of a 4-cell window by the stones of the scoring side and its opponent
+    WINDOW_SCORES = [[_window_score(own, other) for other in range(5)] for own in range(5)]
+
+    # The exact solve is only tried with this many empty cells or fewer; earlier
+    # positions of real games rarely solve within a second
+    SOLVE_MAX_EMPTY = 26
+
+    def __init__(self, ai_engine="solver"):
         self.rows = 6
         self.cols = 7
-        self.board = [[" " for _ in range(self.cols)] for _ in range(self.rows)]
-        self.human_symbol = "X"
-        self.ai_symbol = "O"
-        self.current_player = "human"  # human or ai
-        self.game_count = 0
-        self.human_wins = 0
-        self.ai_wins = 0
+        self.symbols = ("X", "O")
 
-    def display_board(self):
-        print("\n" + "=" * 50)
-        print("   " + "   ".join(str(c + 1) for c in range(self.cols)))
-        print("  +" + "+".join(["---"] * self.cols) + "+")
+        # All 69 lines of four cells, and for each cell the lines through it
+        self.windows = []
         for r in range(self.rows):
-            print("  |" + "|".join(f" {self.board[r][c]} " for c in range(self.cols)) + "|")
-            print("  +" + "+".join(["---"] * self.cols) + "+")
-        print("=" * 50)
+            for c in range(self.cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (-1, 1)):
+                    cells = [(r + dr * i, c + dc * i) for i in range(4)]
+                    if all(0 <= rr < self.rows and 0 <= cc < self.cols for rr, cc in cells):
+                        self.windows.append(cells)
+        self.cell_windows = [[[] for _ in range(self.cols)] for _ in range(self.rows)]
+        for index, cells in enumerate(self.windows):
+            for r, c in cells:
+                self.cell_windows[r][c].append(index)
+
+        self.reset_board()
+        self.ai_engine = ai_engine  # solver, bitboard (depth-limited search) or classic (list board minimax)
+        self.bitboard = BitboardEngine()
+        self.book = OpeningBook() if os.path.exists(BOOK_PATH) else None
 
     def get_valid_columns(self):
         return [c for c in range(self.cols) if self.board[0][c] == " "]
 
+    def reset_board(self):
+        self.board = [[" " for _ in range(self.cols)] for _ in range(self.rows)]
+        # Stones per window and side, kept up to date by drop_piece and undo_piece
+        self.window_counts = {symbol: [0] * len(self.windows) for symbol in self.symbols}
+        self.window_score = {symbol: 0 for symbol in self.symbols}  # Sum of WINDOW_SCORES for each side
+        self.fours = {symbol: 0 for symbol in self.symbols}
+        self.center_counts = {symbol: 0 for symbol in self.symbols}
+
     def drop_piece(self, column, symbol):
         for r in range(self.rows - 1, -1, -1):
             if self.board[r][column] == " ":
                 self.board[r][column] = symbol
+                self._update_windows(r, column, symbol, 1)
                 return r, column
         return None
 
     def undo_piece(self, column):
         for r in range(self.rows):
             if self.board[r][column] != " ":
+                self._update_windows(r, column, self.board[r][column], -1)
                 self.board[r][column] = " "
                 return
 
+    def _update_windows(self, r, c, symbol, delta):
+        other = self.other(symbol)
+        own_counts = self.window_counts[symbol]
+        other_counts = self.window_counts[other]
+        scores = self.WINDOW_SCORES
+        own_change = other_change = fours = 0
+        for index in self.cell_windows[r][c]:
+            own, opp = own_counts[index], other_counts[index]
+            own_counts[index] = own + delta
+            own_change += scores[own + delta][opp] - scores[own][opp]
+            other_change += scores[opp][own + delta] - scores[opp][own]
+            if own + delta == 4 or own == 4:
+                fours += delta
+        self.window_score[symbol] += own_change
+        self.window_score[other] += other_change
+        self.fours[symbol] += fours
+        if c == self.cols // 2:
+            self.center_counts[symbol] += delta
+
     def check_winner_symbol(self, symbol):
         # Horizontal
         for r in range(self.rows):
@@ -65,75 +618,48 @@ class Connect4:
     def board_full(self):
         return all(self.board[0][c] != " " for c in range(self.cols))
 
-    def evaluate_position(self):
-        # Simple heuristic: center preference + count potential lines
-        score = 0
-        center_col = self.cols // 2
-        center_count = sum(1 for r in range(self.rows) if self.board[r][center_col] == self.ai_symbol)
-        score += center_count * 3
-
-        def score_window(window):
-            s = 0
-            ai = window.count(self.ai_symbol)
-            hu = window.count(self.human_symbol)
-            empty = window.count(" ")
-            if ai == 4:
-                s += 100000
-            elif ai == 3 and empty == 1:
-                s += 50
-            elif ai == 2 and empty == 2:
-                s += 10
-            if hu == 3 and empty == 1:
-                s -= 60
-            elif hu == 2 and empty == 2:
-                s -= 12
-            return s
-
-        # Horizontal windows
-        for r in range(self.rows):
-            for c in range(self.cols - 3):
-                window = [self.board[r][c + i] for i in range(4)]
-                score += score_window(window)
-        # Vertical windows
-        for c in range(self.cols):
-            for r in range(self.rows - 3):
-                window = [self.board[r + i][c] for i in range(4)]
-                score += score_window(window)
-        # Diagonal down-right
-        for r in range(self.rows - 3):
-            for c in range(self.cols - 3):
-                window = [self.board[r + i][c + i] for i in range(4)]
-                score += score_window(window)
-        # Diagonal up-right
-        for r in range(3, self.rows):
-            for c in range(self.cols - 3):
-                window = [self.board[r - i][c + i] for i in range(4)]
-                score += score_window(window)
+    def other(self, symbol):
+        return self.symbols[1] if symbol == self.symbols[0] else self.symbols[0]
 
-        return score
+    def evaluate_position(self, symbol):
+        # Simple heuristic: center preference + count potential lines (window scores kept incrementally)
+        return self.center_counts[symbol] * 3 + self.window_score[symbol]
 
-    def get_human_move(self):
-        while True:
+    def best_move(self, symbol, max_depth=None, time_limit=1.0):
+        valid_cols = self.get_valid_columns()
+        if not valid_cols:
+            return None
+
+        if self.ai_engine == "classic":
+            return self.classic_move(symbol, max_depth or 4)
+
+        position, mask, moves = BitboardEngine.from_board(self.board, symbol)
+        if self.ai_engine == "solver":
+            col = self.solver_move(position, mask, moves, time_limit)
+        else:
+            col, _, _ = self.bitboard.best_move(position, mask, moves, max_depth or 42, time_limit)
+        return col if col is not None else random.choice(valid_cols)
+
+    def solver_move(self, position, mask, moves, time_limit=1.0):
+        # Perfect play from the opening book, or an exact solve once few cells are empty.
+        # Earlier positions get the whole time for the depth-limited search, and a solve
+        # that does not finish in three quarters of the time leaves it the rest.
+        if self.book is not None:
+            entry = self.book.lookup(position, mask)
+            if entry is not None:
+                return entry[0]
+        start = time.perf_counter()
+        if BitboardEngine.WIDTH * BitboardEngine.HEIGHT - moves <= self.SOLVE_MAX_EMPTY:
             try:
-                move = input("\nYour turn! Choose column (1-7): ").strip()
-                if not move.isdigit():
-                    print("Please enter a number!")
-                    continue
-                col = int(move) - 1
-                if col < 0 or col >= self.cols:
-                    print("Please enter a number between 1 and 7!")
-                    continue
-                if self.board[0][col] != " ":
-                    print("That column is full! Try another.")
-                    continue
+                col, _ = self.bitboard.solve_move(position, mask, moves, time_limit * 0.75)
                 return col
-            except ValueError:
-                print("Please enter a valid number!")
-
-    def get_ai_move(self, max_depth=4):
-        print("\n🤖 AI is thinking...")
-        time.sleep(1)
+            except SearchTimeout:
+                pass
+        remaining = time_limit - (time.perf_counter() - start)
+        col, _, _ = self.bitboard.best_move(position, mask, moves, 42, remaining)
+        return col
 
+    def classic_move(self, symbol, max_depth=4):
         valid_cols = self.get_valid_columns()
         if not valid_cols:
             return None
@@ -144,9 +670,10 @@ class Connect4:
         alpha = float("-inf")
         beta = float("inf")
 
+        opponent = self.other(symbol)
         for col in valid_cols:
-            self.drop_piece(col, self.ai_symbol)
-            score = self.minimax(depth=1, maximizing=False, alpha=alpha, beta=beta, max_depth=max_depth)
+            self.drop_piece(col, symbol)
+            score = self.minimax(1, False, alpha, beta, max_depth, symbol, opponent)
             self.undo_piece(col)
             if score > best_score:
                 best_score = score
@@ -154,13 +681,14 @@ class Connect4:
             alpha = max(alpha, best_score)
         return best_col
 
-    def minimax(self, depth, maximizing, alpha, beta, max_depth):
-        if self.check_winner_symbol(self.ai_symbol):
+    def minimax(self, depth, maximizing, alpha, beta, max_depth, symbol, opponent):
+        # Scores from symbol's side; symbol is the maximizing player
+        if self.fours[symbol]:
             return 1_000_000 - depth
-        if self.check_winner_symbol(self.human_symbol):
+        if self.fours[opponent]:
             return -1_000_000 + depth
         if self.board_full() or depth == max_depth:
-            return self.evaluate_position()
+            return self.evaluate_position(symbol)
 
         valid_cols = self.get_valid_columns()
         if not valid_cols:
@@ -169,8 +697,8 @@ class Connect4:
         if maximizing:
             value = float("-inf")
             for col in valid_cols:
-                self.drop_piece(col, self.ai_symbol)
-                value = max(value, self.minimax(depth + 1, False, alpha, beta, max_depth))
+                self.drop_piece(col, symbol)
+                value = max(value, self.minimax(depth + 1, False, alpha, beta, max_depth, symbol, opponent))
                 self.undo_piece(col)
                 alpha = max(alpha, value)
                 if alpha >= beta:
@@ -179,14 +707,68 @@ class Connect4:
         else:
             value = float("inf")
             for col in valid_cols:
-                self.drop_piece(col, self.human_symbol)
-                value = min(value, self.minimax(depth + 1, True, alpha, beta, max_depth))
+                self.drop_piece(col, opponent)
+                value = min(value, self.minimax(depth + 1, True, alpha, beta, max_depth, symbol, opponent))
                 self.undo_piece(col)
                 beta = min(beta, value)
                 if alpha >= beta:
                     break
             return value
 
+
+class Connect4:
+    # Console front-end: prompts, messages and statistics around a Connect4Engine
+
+    def __init__(self, engine=None, ai_delay=1.0, time_limit=1.0):
+        self.engine = engine or Connect4Engine()
+        self.ai_delay = ai_delay  # Seconds of "thinking" shown before each AI move
+        self.time_limit = time_limit  # Seconds of search per AI move
+        self.rows = self.engine.rows
+        self.cols = self.engine.cols
+        self.human_symbol = "X"
+        self.ai_symbol = "O"
+        self.current_player = "human"  # human or ai
+        self.game_count = 0
+        self.human_wins = 0
+        self.ai_wins = 0
+
+    @property
+    def board(self):
+        return self.engine.board
+
+    def display_board(self):
+        print("\n" + "=" * 50)
+        print("   " + "   ".join(str(c + 1) for c in range(self.cols)))
+        print("  +" + "+".join(["---"] * self.cols) + "+")
+        for r in range(self.rows):
+            print("  |" + "|".join(f" {self.board[r][c]} " for c in range(self.cols)) + "|")
+            print("  +" + "+".join(["---"] * self.cols) + "+")
+        print("=" * 50)
+
+    def get_human_move(self):
+        while True:
+            try:
+                move = input("\nYour turn! Choose column (1-7): ").strip()
+                if not move.isdigit():
+                    print("Please enter a number!")
+                    continue
+                col = int(move) - 1
+                if col < 0 or col >= self.cols:
+                    print("Please enter a number between 1 and 7!")
+                    continue
+                if self.board[0][col] != " ":
+                    print("That column is full! Try another.")
+                    continue
+                return col
+            except ValueError:
+                print("Please enter a valid number!")
+
+    def get_ai_move(self, max_depth=None):
+        print("\n🤖 AI is thinking...")
+        if self.ai_delay:
+            time.sleep(self.ai_delay)
+        return self.engine.best_move(self.ai_symbol, max_depth, self.time_limit)
+
     def announce_result(self, winner_symbol):
         if winner_symbol == self.human_symbol:
             messages = [
@@ -214,7 +796,7 @@ class Connect4:
 
         while True:
             # Reset for new game
-            self.board = [[" " for _ in range(self.cols)] for _ in range(self.rows)]
+            self.engine.reset_board()
             self.current_player = "human"
             self.game_count += 1
 
@@ -224,26 +806,26 @@ class Connect4:
                 self.display_board()
                 if self.current_player == "human":
                     col = self.get_human_move()
-                    self.drop_piece(col, self.human_symbol)
+                    self.engine.drop_piece(col, self.human_symbol)
                 else:
                     col = self.get_ai_move()
                     if col is None:
                         break
-                    self.drop_piece(col, self.ai_symbol)
+                    self.engine.drop_piece(col, self.ai_symbol)
                     print(f"AI drops in column {col + 1}")
 
                 # Check for end conditions
-                if self.check_winner_symbol(self.human_symbol):
+                if self.engine.check_winner_symbol(self.human_symbol):
                     self.display_board()
                     self.announce_result(self.human_symbol)
                     self.human_wins += 1
                     break
-                if self.check_winner_symbol(self.ai_symbol):
+                if self.engine.check_winner_symbol(self.ai_symbol):
                     self.display_board()
                     self.announce_result(self.ai_symbol)
                     self.ai_wins += 1
                     break
-                if self.board_full():
+                if self.engine.board_full():
                     self.display_board()
                     self.announce_result(None)
                     break
@@ -269,8 +851,72 @@ class Connect4:
                     print("Please enter 'y' or 'n'!")
 
 
+def simulate(games, ai_engine="solver", time_limit=1.0, seed=None):
+    # Plays the AI against random moves, alternating who starts, and reports results and speed
+    rng = random.Random(seed)
+    engine = Connect4Engine(ai_engine)
+    results = {"ai": 0, "random": 0, "tie": 0}
+    ai_moves = 0
+    ai_time = 0.0
+    start = time.perf_counter()
+
+    for game in range(games):
+        engine.reset_board()
+        ai_symbol = "X" if game % 2 == 0 else "O"
+        symbol = "X"
+        while True:
+            if symbol == ai_symbol:
+                move_start = time.perf_counter()
+                col = engine.best_move(symbol, time_limit=time_limit)
+                ai_time += time.perf_counter() - move_start
+                ai_moves += 1
+            else:
+                col = rng.choice(engine.get_valid_columns())
+            engine.drop_piece(col, symbol)
+
+            if engine.check_winner_symbol(symbol):
+                results["ai" if symbol == ai_symbol else "random"] += 1
+                break
+            if engine.board_full():
+                results["tie"] += 1
+                break
+            symbol = engine.other(symbol)
+
+    elapsed = time.perf_counter() - start
+    print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.2f} games/s)")
+    print(f"AI wins: {results['ai']}, random wins: {results['random']}, ties: {results['tie']}")
+    print(f"AI moves: {ai_moves}, {ai_time / max(ai_moves, 1) * 1000:.1f} ms per move")
+    return results
+
+
 def main():
-    game = Connect4()
+    parser = argparse.ArgumentParser(description="Play Connect 4 against the computer")
+    parser.add_argument("--engine", choices=["solver", "bitboard", "classic"], default="solver",
+                        help="AI to play against (default: solver)")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="seconds of search per AI move (default: 1)")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds the AI pretends to think (default: 1)")
+    parser.add_argument("--simulate", type=int, metavar="GAMES", help="play the AI against random moves and exit")
+    parser.add_argument("--seed", type=int, help="random seed for --simulate")
+    parser.add_argument("--build-book", type=int, metavar="PLIES",
+                        help="solve all positions up to PLIES moves into the opening book and exit")
+    parser.add_argument("--book-root", default="", metavar="MOVES",
+                        help="build the book below this opening, e.g. 4453 (default: empty board)")
+    parser.add_argument("--workers", type=int, help="processes for --build-book (default: all CPUs)")
+    parser.add_argument("--benchmark", nargs="?", const="", metavar="FILE",
+                        help="solve test positions (lines of 'moves score') and exit")
+    args = parser.parse_args()
+
+    if args.build_book is not None:
+        build_opening_book(BOOK_PATH, args.build_book, args.book_root, args.workers)
+        return
+    if args.benchmark is not None:
+        run_benchmark(args.benchmark or None)
+        return
+    if args.simulate:
+        simulate(args.simulate, args.engine, args.time_limit, args.seed)
+        return
+
+    game = Connect4(Connect4Engine(args.engine), ai_delay=args.delay, time_limit=args.time_limit)
     game.play_game()
 
 
@@ -1,9 +1,108 @@
+import argparse
 import random
 import time
 
-class TicTacToe:
+class TicTacToeEngine:
+    """Board state, rules and minimax search, without any input or output"""
+    
     def __init__(self):
         self.board = [' ' for _ in range(9)]
+    
+    def reset(self):
+        """Clear the board for a new game"""
+        self.board = [' ' for _ in range(9)]
+    
+    def legal_moves(self):
+        """Get the empty positions (0-8)"""
+        return [i for i in range(9) if self.board[i] == ' ']
+    
+    def make_move(self, position, symbol):
+        """Make a move on the board"""
+        self.board[position] = symbol
+    
+    def undo_move(self, position):
+        """Take back the move at a position"""
+        self.board[position] = ' '
+    
+    def check_winner(self):
+        """Check if there's a winner or tie"""
+        # Check rows
+        for i in range(0, 9, 3):
+            if self.board[i] == self.board[i+1] == self.board[i+2] != ' ':
+                return self.board[i]
+        
+        # Check columns
+        for i in range(3):
+            if self.board[i] == self.board[i+3] == self.board[i+6] != ' ':
+                return self.board[i]
+        
+        # Check diagonals
+        if self.board[0] == self.board[4] == self.board[8] != ' ':
+            return self.board[0]
+        if self.board[2] == self.board[4] == self.board[6] != ' ':
+            return self.board[2]
+        
+        # Check for tie
+        if ' ' not in self.board:
+            return 'tie'
+        
+        return None
+    
+    def best_move(self, symbol):
+        """Find the best move for symbol using minimax"""
+        opponent = 'O' if symbol == 'X' else 'X'
+        best_score = float('-inf')
+        best_move = 0
+        
+        for i in range(9):
+            if self.board[i] == ' ':
+                self.board[i] = symbol
+                score = self.minimax(0, False, symbol, opponent)
+                self.board[i] = ' '  # Undo move
+                
+                if score > best_score:
+                    best_score = score
+                    best_move = i
+        
+        return best_move
+    
+    def minimax(self, depth, is_maximizing, symbol, opponent):
+        """Minimax algorithm for AI decision making (scores from symbol's side)"""
+        result = self.check_winner()
+        
+        if result == symbol:
+            return 10 - depth
+        elif result == opponent:
+            return -10 + depth
+        elif result == 'tie':
+            return 0
+        
+        board = self.board
+        if is_maximizing:
+            best_score = float('-inf')
+            for i in range(9):
+                if board[i] == ' ':
+                    board[i] = symbol
+                    score = self.minimax(depth + 1, False, symbol, opponent)
+                    board[i] = ' '
+                    best_score = max(score, best_score)
+            return best_score
+        else:
+            best_score = float('inf')
+            for i in range(9):
+                if board[i] == ' ':
+                    board[i] = opponent
+                    score = self.minimax(depth + 1, True, symbol, opponent)
+                    board[i] = ' '
+                    best_score = min(score, best_score)
+            return best_score
+
+class TicTacToe:
+    """Console front-end: prompts, messages and statistics around a TicTacToeEngine"""
+    
+    def __init__(self, ai_delay=1.0):
+        self.engine = TicTacToeEngine()
+        self.ai_delay = ai_delay  # Seconds of "thinking" shown before each AI move
         self.human_symbol = None
         self.ai_symbol = None
         self.current_player = None
@@ -11,6 +110,10 @@ class TicTacToe:
         self.human_wins = 0
         self.ai_wins = 0
         self.last_winner = None
+    
+    @property
+    def board(self):
+        return self.engine.board
         
     def display_board(self):
         """Display the current game board"""
@@ -80,83 +183,20 @@ class TicTacToe:
                 print("Please enter a valid number!")
     
     def get_ai_move(self):
-        """AI makes move using minimax algorithm"""
+        """AI picks its move with the engine's minimax search"""
         print(f"\n🤖 AI is thinking...")
-        time.sleep(1)  # Add some drama
-        
-        # Use minimax to find best move
-        best_score = float('-inf')
-        best_move = 0
-        
-        for i in range(9):
-            if self.board[i] == ' ':
-                self.board[i] = self.ai_symbol
-                score = self.minimax(self.board, 0, False)
-                self.board[i] = ' '  # Undo move
-                
-                if score > best_score:
-                    best_score = score
-                    best_move = i
+        if self.ai_delay:
+            time.sleep(self.ai_delay)  # Add some drama
         
-        return best_move
-    
-    def minimax(self, board, depth, is_maximizing):
-        """Minimax algorithm for AI decision making"""
-        result = self.check_winner()
-        
-        if result == self.ai_symbol:
-            return 10 - depth
-        elif result == self.human_symbol:
-            return -10 + depth
-        elif result == 'tie':
-            return 0
-        
-        if is_maximizing:
-            best_score = float('-inf')
-            for i in range(9):
-                if board[i] == ' ':
-                    board[i] = self.ai_symbol
-                    score = self.minimax(board, depth + 1, False)
-                    board[i] = ' '
-                    best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(9):
-                if board[i] == ' ':
-                    board[i] = self.human_symbol
-                    score = self.minimax(board, depth + 1, True)
-                    board[i] = ' '
-                    best_score = min(score, best_score)
-            return best_score
+        return self.engine.best_move(self.ai_symbol)
     
     def make_move(self, position, symbol):
         """Make a move on the board"""
-        self.board[position] = symbol
+        self.engine.make_move(position, symbol)
     
     def check_winner(self):
         """Check if there's a winner or tie"""
-        # Check rows
-        for i in range(0, 9, 3):
-            if self.board[i] == self.board[i+1] == self.board[i+2] != ' ':
-                return self.board[i]
-        
-        # Check columns
-        for i in range(3):
-            if self.board[i] == self.board[i+3] == self.board[i+6] != ' ':
-                return self.board[i]
-        
-        # Check diagonals
-        if self.board[0] == self.board[4] == self.board[8] != ' ':
-            return self.board[0]
-        if self.board[2] == self.board[4] == self.board[6] != ' ':
-            return self.board[2]
-        
-        # Check for tie
-        if ' ' not in self.board:
-            return 'tie'
-        
-        return None
+        return self.engine.check_winner()
     
     def get_win_message(self, winner):
         """Get humorous win message or supportive loss message"""
@@ -192,7 +232,7 @@ class TicTacToe:
         
         while True:
             # Reset board for new game
-            self.board = [' ' for _ in range(9)]
+            self.engine.reset()
             self.game_count += 1
             
             # Choose symbols (only on first game)
@@ -254,9 +294,57 @@ class TicTacToe:
                 else:
                     print("Please enter 'y' or 'n'!")
 
+def simulate(games, seed=None):
+    """Play the AI against random moves and report the results and speed"""
+    rng = random.Random(seed)
+    engine = TicTacToeEngine()
+    results = {'ai': 0, 'random': 0, 'tie': 0}
+    ai_moves = 0
+    ai_time = 0.0
+    start = time.perf_counter()
+    
+    for game in range(games):
+        engine.reset()
+        ai_symbol = 'X' if game % 2 == 0 else 'O'  # Alternate who starts
+        symbol = 'X'
+        while True:
+            if symbol == ai_symbol:
+                move_start = time.perf_counter()
+                move = engine.best_move(symbol)
+                ai_time += time.perf_counter() - move_start
+                ai_moves += 1
+            else:
+                move = rng.choice(engine.legal_moves())
+            engine.make_move(move, symbol)
+            
+            winner = engine.check_winner()
+            if winner:
+                if winner == 'tie':
+                    results['tie'] += 1
+                else:
+                    results['ai' if winner == ai_symbol else 'random'] += 1
+                break
+            symbol = 'O' if symbol == 'X' else 'X'
+    
+    elapsed = time.perf_counter() - start
+    print(f"{games} games in {elapsed:.2f}s ({games / elapsed:.1f} games/s)")
+    print(f"AI wins: {results['ai']}, random wins: {results['random']}, ties: {results['tie']}")
+    print(f"AI moves: {ai_moves}, {ai_time / max(ai_moves, 1) * 1000:.1f} ms per move")
+    return results
+
 def main():
     """Main function to start the game"""
-    game = TicTacToe()
+    parser = argparse.ArgumentParser(description="Play Tic-Tac-Toe against the computer")
+    parser.add_argument("--delay", type=float, default=1.0, help="seconds the AI pretends to think (default: 1)")
+    parser.add_argument("--simulate", type=int, metavar="GAMES", help="play the AI against random moves and exit")
+    parser.add_argument("--seed", type=int, help="random seed for --simulate")
+    args = parser.parse_args()
+    
+    if args.simulate:
+        simulate(args.simulate, args.seed)
+        return
+    
+    game = TicTacToe(ai_delay=args.delay)
     game.play_game()
 
 if __name__ == "__main__":
@@ -0,0 +1,143 @@
+"""
+Xiangqi Headless Rendering
+Renders boards to PNG images without a display (for server-side thumbnails)
+"""
+
+import io
+import os
+import threading
+from collections import OrderedDict
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import pygame
+
+from clients.pygame_client.ui_renderer import UI
+from common.constants import BOARD_OFFSET_X, BOARD_OFFSET_Y, SQUARE_SIZE, SCREEN_WIDTH, SCREEN_HEIGHT
+from engine.board import Board
+from engine.transposition import zobrist_key
+
+# Part of the window showing the board (half a square around the outer lines)
+BOARD_RECT = pygame.Rect(BOARD_OFFSET_X - SQUARE_SIZE // 2, BOARD_OFFSET_Y - SQUARE_SIZE // 2,
+                         9 * SQUARE_SIZE, 10 * SQUARE_SIZE)
+
+LAST_MOVE_COLOR = (90, 160, 255)
+
+
+class BoardImageRenderer:
+    """
+    Draws boards with the desktop client's renderer onto an off-screen surface
+
+    Images are PNG bytes cached by position hash, last move and width, so
+    the same position is only drawn and encoded once. Rendering is
+    serialized by a lock; one renderer can serve all server threads.
+    """
+
+    def __init__(self, width=360, cache_size=2048):
+        """
+        Initialize the renderer
+
+        Args:
+            width: Default image width in pixels (the height follows the board's proportions)
+            cache_size: Maximum number of cached images
+        """
+        pygame.font.init()
+        self.width = width
+        self.cache_size = cache_size
+        self._surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        self._ui = UI(self._surface, Board())
+        self._cache = OrderedDict()  # (position key, last move, width) -> PNG bytes
+        self._lock = threading.Lock()
+
+        # Counters for monitoring
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def image_key(board):
+        """
+        Identify the image of a board (for caching and ETags)
+
+        Args:
+            board: Board to draw
+
+        Returns:
+            Hex string of the position hash and last move
+        """
+        key = f"{zobrist_key(board):016x}"
+        if board.move_history:
+            from_pos, to_pos, _ = board.move_history[-1]
+            key += f"-{from_pos[0]}{from_pos[1]}{to_pos[0]}{to_pos[1]}"
+        return key
+
+    def render_png(self, board, width=None):
+        """
+        Draw a board as a PNG image, highlighting its last move
+
+        Args:
+            board: Board to draw
+            width: Image width in pixels (default: self.width)
+
+        Returns:
+            PNG bytes
+        """
+        width = width or self.width
+        key = (self.image_key(board), width)
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return png
+
+            self.misses += 1
+            png = self._draw(board, width)
+            self._cache[key] = png
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return png
+
+    def render_fen(self, fen, width=None):
+        """
+        Draw a position given in FEN as a PNG image
+
+        Args:
+            fen: Position in FEN notation
+            width: Image width in pixels (default: self.width)
+
+        Returns:
+            PNG bytes
+        """
+        return self.render_png(Board.from_fen(fen), width)
+
+    def get_gauges(self):
+        """
+        Get monitoring values
+
+        Returns:
+            List of (name, value, help) tuples
+        """
+        return [
+            ('xiangqi_board_images_cached', len(self._cache), 'Board images held in the cache'),
+            ('xiangqi_board_image_hits', self.hits, 'Board images served from the cache'),
+            ('xiangqi_board_image_renders', self.misses, 'Board images drawn'),
+        ]
+
+    def _draw(self, board, width):
+        """Draw and encode a board (called with the lock held)"""
+        self._ui.board = board
+        self._ui.draw_board()
+        if board.move_history:
+            from_pos, to_pos, _ = board.move_history[-1]
+            self._ui.highlight_square(from_pos, LAST_MOVE_COLOR)
+            self._ui.highlight_square(to_pos, LAST_MOVE_COLOR)
+        self._ui.draw_pieces()
+
+        image = self._surface.subsurface(BOARD_RECT)
+        height = round(width * BOARD_RECT.height / BOARD_RECT.width)
+        if width != BOARD_RECT.width:
+            image = pygame.transform.smoothscale(image, (width, height))
+        buffer = io.BytesIO()
+        pygame.image.save(image, buffer, 'png')
+        return buffer.getvalue()
@@ -5,7 +5,10 @@ Desktop GUI implementation
 """
 
 import pygame
+import queue
 import sys
+import threading
+import time
 from engine.game_engine import GameEngine
 from clients.pygame_client.ui_renderer import UI
 from common.constants import SCREEN_WIDTH, SCREEN_HEIGHT, FPS
@@ -35,16 +38,43 @@ class XiangqiGame:
         self.ai_should_move = False
         self.ai_thinking = False
         self.thinking_animation_frame = 0
-        self.ai_delay_frames = 0  # Delay before AI starts computing
+
+        # The AI searches in a worker thread and posts its result to this queue
+        self.ai_thread = None
+        self.ai_results = queue.Queue()
+        self.ai_started = 0.0
+
+        # Status message, recomputed only after a move
+        self.status = None
+        self.status_moves = None
 
     def handle_events(self):
         """Handle user input events"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.ui.invalidate()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:  # Left click
                     self.handle_click(event.pos)
+            elif event.type == pygame.KEYDOWN:
+                self.handle_key(event.key)
+
+    def handle_key(self, key):
+        """Handle keyboard commands for the AI"""
+        if key == pygame.K_SPACE and self.ai_thinking:
+            # Move now with the best move found so far
+            self.engine.force_ai_move(self.game_id)
+        elif key == pygame.K_ESCAPE and self.ai_thinking:
+            # Cancel the search; the AI's side can then be played by hand
+            self.engine.stop_ai(self.game_id)
+        elif (key == pygame.K_a and not self.ai_should_move and not self.engine.is_game_over(self.game_id)
+              and self.board.current_player == self.engine.get_game(self.game_id)['ai_color']):
+            # Let the AI play the current position (after a cancelled search)
+            self.selected_piece = None
+            self.valid_moves = []
+            self.ai_should_move = True
 
     def handle_click(self, pos):
         """Handle mouse clicks on the board"""
@@ -89,51 +119,73 @@ class XiangqiGame:
         if self.ai_thinking:
             self.thinking_animation_frame += 1
 
-        # Execute AI move if scheduled
-        if self.ai_should_move:
-            if not self.ai_thinking:
-                # Start showing the thinking animation
-                self.ai_thinking = True
-                self.thinking_animation_frame = 0
-                self.ai_delay_frames = 10  # Show animation for 10 frames before computing
-            elif self.ai_delay_frames > 0:
-                # Count down delay frames
-                self.ai_delay_frames -= 1
-            else:
-                # Delay complete, now compute AI move
-                result = self.engine.make_ai_move(self.game_id)
-                self.ai_should_move = False
-                self.ai_thinking = False
+        # Start the AI search in the background if scheduled
+        if self.ai_should_move and self.ai_thread is None:
+            self.ai_thinking = True
+            self.thinking_animation_frame = 0
+            self.ai_started = time.monotonic()
+            self.ai_thread = threading.Thread(target=self._run_ai, name='xiangqi-ai', daemon=True)
+            self.ai_thread.start()
+
+        # Pick up the result once the search is done
+        try:
+            self.ai_results.get_nowait()
+        except queue.Empty:
+            return
+        self.ai_thread = None
+        self.ai_should_move = False
+        self.ai_thinking = False
 
-    def render(self):
-        """Render the game"""
-        self.ui.draw_board()
-        self.ui.draw_pieces()
+    def _run_ai(self):
+        """Search and play the AI's move (worker thread)"""
+        try:
+            result = self.engine.make_ai_move(self.game_id)
+        except Exception as e:
+            result = {'success': False, 'error': str(e)}
+        self.ai_results.put(result)
+
+    def ai_progress_text(self):
+        """Progress line of the running search"""
+        progress = self.engine.get_ai_progress(self.game_id)
+        if not progress:
+            return None
+        elapsed = time.monotonic() - self.ai_started
+        return (f"depth {progress['depth']}, {progress['nodes']} positions, {elapsed:.1f}s"
+                "  (Space: move now, Esc: cancel)")
 
+    def render(self):
+        """Render the game, updating only the parts of the window that changed"""
         # Highlight selected piece and valid moves
+        highlights = {}
         if self.selected_piece:
-            self.ui.highlight_square(self.selected_piece, (255, 255, 0))
             for move in self.valid_moves:
-                self.ui.highlight_square(move, (0, 255, 0))
+                highlights[move] = (0, 255, 0)
+            highlights[self.selected_piece] = (255, 255, 0)
 
-        # Draw game status
-        status = self.engine.get_game_status(self.game_id)
-        self.ui.draw_status(status)
+        # Game status (checkmate detection is too costly to repeat every frame)
+        moves = (len(self.board.move_history), self.board.current_player)
+        if moves != self.status_moves:
+            self.status = self.engine.get_game_status(self.game_id)
+            self.status_moves = moves
 
         # Draw thinking animation if AI is thinking
         if self.ai_thinking:
-            self.ui.draw_thinking_animation(self.thinking_animation_frame)
-
-        pygame.display.flip()
+            self.ui.draw_frame(highlights, self.status, self.thinking_animation_frame, self.ai_progress_text())
+        else:
+            self.ui.draw_frame(highlights, self.status)
 
     def run(self):
         """Main game loop"""
         while self.running:
             self.handle_events()
-            self.render()  # Render first so player move is visible
-            self.update()  # Then update (AI moves after rendering)
+            self.update()
+            self.render()
             self.clock.tick(FPS)
 
+        # Stop a running search before leaving
+        if self.ai_thread is not None:
+            self.engine.stop_ai(self.game_id)
+            self.ai_thread.join()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,103 @@
+"""
+Xiangqi Piece Sprites
+Loads piece images from the texture atlas and caches them per size
+"""
+
+import json
+import os
+
+import pygame
+
+PIECE_KEYS = [f"{color}_{piece_type}" for color in ('red', 'black')
+              for piece_type in ('general', 'advisor', 'elephant', 'horse', 'chariot', 'cannon', 'soldier')]
+
+# Loaded atlases by image directory
+_atlases = {}
+
+
+class PieceAtlas:
+    """
+    Piece images at any size, cut from a texture atlas
+
+    The atlas (made by generate_pieces.py) holds every piece at a few sizes.
+    A requested size uses the smallest variant at least as large, scaled
+    down once and cached, so changing the board size never reads the disk
+    again. Without an atlas the separate piece PNGs are used instead.
+    """
+
+    def __init__(self, directory="assets/images"):
+        """
+        Load the atlas, or the separate piece images if there is none
+
+        Args:
+            directory: Directory of pieces_atlas.png/.json or the piece PNGs
+        """
+        self.directory = directory
+        self.variants = {}  # size -> {image key: Surface at that size}
+        self._scaled = {}  # requested size -> {image key: Surface}
+
+        manifest_path = os.path.join(directory, "pieces_atlas.json")
+        if os.path.exists(manifest_path):
+            self._load_atlas(manifest_path)
+        else:
+            self._load_images()
+
+    def _load_atlas(self, manifest_path):
+        """Load the atlas image once and cut it into subsurfaces"""
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+        sheet = _convert(pygame.image.load(os.path.join(self.directory, manifest['image'])))
+        for variant in manifest['variants']:
+            size = variant['size']
+            self.variants[size] = {
+                key: sheet.subsurface((index * size, variant['y'], size, size))
+                for index, key in enumerate(manifest['pieces'])
+            }
+
+    def _load_images(self):
+        """Load the separate piece images (older asset layout)"""
+        images = {}
+        for key in PIECE_KEYS:
+            filename = os.path.join(self.directory, f"{key}.png")
+            if os.path.exists(filename):
+                images[key] = _convert(pygame.image.load(filename))
+            else:
+                print(f"Warning: Image not found: {filename}")
+        if images:
+            self.variants[max(image.get_width() for image in images.values())] = images
+
+    def get(self, size):
+        """
+        Get all piece images at a size
+
+        Args:
+            size: Width and height in pixels
+
+        Returns:
+            Dictionary image key ("red_horse", ...) -> Surface (empty without images)
+        """
+        images = self._scaled.get(size)
+        if images is None:
+            if not self.variants:
+                return {}
+            larger = [variant for variant in self.variants if variant >= size]
+            source = self.variants[min(larger) if larger else max(self.variants)]
+            images = {
+                key: image if image.get_width() == size else pygame.transform.smoothscale(image, (size, size))
+                for key, image in source.items()
+            }
+            self._scaled[size] = images
+        return images
+
+
+def get_atlas(directory="assets/images"):
+    """Get the piece atlas of a directory, loading it on first use"""
+    atlas = _atlases.get(directory)
+    if atlas is None:
+        atlas = _atlases[directory] = PieceAtlas(directory)
+    return atlas
+
+
+def _convert(image):
+    """Convert an image to the display's pixel format for fast blits (needs a display)"""
+    return image.convert_alpha() if pygame.display.get_surface() else image
@@ -4,7 +4,7 @@ Handles drawing the board, pieces, and user interface elements
 """
 
 import pygame
-import os
+from clients.pygame_client.sprites import get_atlas
 from common.constants import (
     BOARD_OFFSET_X, BOARD_OFFSET_Y, SQUARE_SIZE,
     BOARD_COLOR, LINE_COLOR, PALACE_COLOR, RIVER_COLOR,
@@ -28,28 +28,44 @@ class UI:
         self.board = board
         self.font = pygame.font.Font(None, 48)
         self.status_font = pygame.font.Font(None, 32)
+        self.river_font = pygame.font.Font(None, 36)
+        self.progress_font = pygame.font.Font(None, 24)
         self.piece_images = {}
         self._load_piece_images()
 
+        # Surfaces that never change, rendered once
+        self.board_layer = self._render_board_layer()
+        self._highlight_surfaces = {}  # color -> square surface
+        self._piece_surfaces = {}  # image key -> fallback piece drawing
+        self._circle_surfaces = {}  # alpha -> thinking animation circle
+        self._thinking_background = None
+        self._thinking_icon = None
+
+        # What the display currently shows, to redraw only what changed
+        self._shown_pieces = {}  # (row, col) -> image key
+        self._shown_highlights = {}  # (row, col) -> color
+        self._shown_status = None
+        self._status_rect = None
+        self._overlay_rects = []
+        self._full_redraw = True
+
     def _load_piece_images(self):
-        """Load all piece images"""
-        piece_types = ['general', 'advisor', 'elephant', 'horse', 'chariot', 'cannon', 'soldier']
-        colors = ['red', 'black']
-
-        for color in colors:
-            for piece_type in piece_types:
-                filename = f"assets/images/{color}_{piece_type}.png"
-                if os.path.exists(filename):
-                    image = pygame.image.load(filename)
-                    # Scale image to fit the square size
-                    scaled_image = pygame.transform.scale(image, (SQUARE_SIZE, SQUARE_SIZE))
-                    self.piece_images[f"{color}_{piece_type}"] = scaled_image
-                else:
-                    print(f"Warning: Image not found: {filename}")
+        """Load all piece images (from the shared atlas, scaled to the square size)"""
+        self.piece_images = get_atlas().get(SQUARE_SIZE)
 
     def draw_board(self):
-        """Draw the Xiangqi board"""
-        self.screen.fill(BOARD_COLOR)
+        """Draw the Xiangqi board (from the cached layer)"""
+        self.screen.blit(self.board_layer, (0, 0))
+
+    def _render_board_layer(self):
+        """Render the static board (grid, palaces, river) into a screen-sized surface"""
+        layer = pygame.Surface(self.screen.get_size())
+        self._draw_grid(layer)
+        return layer.convert() if pygame.display.get_surface() else layer
+
+    def _draw_grid(self, surface):
+        """Draw the Xiangqi board lines, palaces and river"""
+        surface.fill(BOARD_COLOR)
 
         # Draw vertical lines
         for col in range(9):
@@ -58,7 +74,7 @@ class UI:
             if col == 0 or col == 8:
                 # Full length lines on the sides
                 pygame.draw.line(
-                    self.screen, LINE_COLOR,
+                    surface, LINE_COLOR,
                     (x, BOARD_OFFSET_Y),
                     (x, BOARD_OFFSET_Y + 9 * SQUARE_SIZE),
                     2
@@ -66,14 +82,14 @@ class UI:
             else:
                 # Top half (black side)
                 pygame.draw.line(
-                    self.screen, LINE_COLOR,
+                    surface, LINE_COLOR,
                     (x, BOARD_OFFSET_Y),
                     (x, BOARD_OFFSET_Y + 4 * SQUARE_SIZE),
                     2
                 )
                 # Bottom half (red side)
                 pygame.draw.line(
-                    self.screen, LINE_COLOR,
+                    surface, LINE_COLOR,
                     (x, BOARD_OFFSET_Y + 5 * SQUARE_SIZE),
                     (x, BOARD_OFFSET_Y + 9 * SQUARE_SIZE),
                     2
@@ -83,40 +99,40 @@ class UI:
         for row in range(10):
             y = BOARD_OFFSET_Y + row * SQUARE_SIZE
             pygame.draw.line(
-                self.screen, LINE_COLOR,
+                surface, LINE_COLOR,
                 (BOARD_OFFSET_X, y),
                 (BOARD_OFFSET_X + 8 * SQUARE_SIZE, y),
                 2
             )
 
         # Draw palace diagonals
-        self._draw_palace_diagonals()
+        self._draw_palace_diagonals(surface)
 
         # Draw river
-        self._draw_river()
+        self._draw_river(surface)
 
         # Draw board border
         pygame.draw.rect(
-            self.screen, LINE_COLOR,
+            surface, LINE_COLOR,
             (BOARD_OFFSET_X, BOARD_OFFSET_Y,
              8 * SQUARE_SIZE, 9 * SQUARE_SIZE),
             3
         )
 
-    def _draw_palace_diagonals(self):
+    def _draw_palace_diagonals(self, surface):
         """Draw diagonal lines in the palaces"""
         # Black palace (top)
         top_palace_x = BOARD_OFFSET_X + 3 * SQUARE_SIZE
         top_palace_y = BOARD_OFFSET_Y
 
         pygame.draw.line(
-            self.screen, LINE_COLOR,
+            surface, LINE_COLOR,
             (top_palace_x, top_palace_y),
             (top_palace_x + 2 * SQUARE_SIZE, top_palace_y + 2 * SQUARE_SIZE),
             2
         )
         pygame.draw.line(
-            self.screen, LINE_COLOR,
+            surface, LINE_COLOR,
             (top_palace_x + 2 * SQUARE_SIZE, top_palace_y),
             (top_palace_x, top_palace_y + 2 * SQUARE_SIZE),
             2
@@ -127,30 +143,29 @@ class UI:
         bottom_palace_y = BOARD_OFFSET_Y + 7 * SQUARE_SIZE
 
         pygame.draw.line(
-            self.screen, LINE_COLOR,
+            surface, LINE_COLOR,
             (bottom_palace_x, bottom_palace_y),
             (bottom_palace_x + 2 * SQUARE_SIZE, bottom_palace_y + 2 * SQUARE_SIZE),
             2
         )
         pygame.draw.line(
-            self.screen, LINE_COLOR,
+            surface, LINE_COLOR,
             (bottom_palace_x + 2 * SQUARE_SIZE, bottom_palace_y),
             (bottom_palace_x, bottom_palace_y + 2 * SQUARE_SIZE),
             2
         )
 
-    def _draw_river(self):
+    def _draw_river(self, surface):
         """Draw the river in the middle of the board"""
         river_y = BOARD_OFFSET_Y + 4 * SQUARE_SIZE + SQUARE_SIZE // 2
-        river_font = pygame.font.Font(None, 36)
 
         # Draw "楚河" (Chu River) on the left
-        chu_text = river_font.render("楚河", True, RIVER_COLOR)
-        self.screen.blit(chu_text, (BOARD_OFFSET_X + SQUARE_SIZE, river_y - 15))
+        chu_text = self.river_font.render("楚河", True, RIVER_COLOR)
+        surface.blit(chu_text, (BOARD_OFFSET_X + SQUARE_SIZE, river_y - 15))
 
         # Draw "漢界" (Han Boundary) on the right
-        han_text = river_font.render("漢界", True, RIVER_COLOR)
-        self.screen.blit(han_text, (BOARD_OFFSET_X + 5 * SQUARE_SIZE, river_y - 15))
+        han_text = self.river_font.render("漢界", True, RIVER_COLOR)
+        surface.blit(han_text, (BOARD_OFFSET_X + 5 * SQUARE_SIZE, river_y - 15))
 
     def draw_pieces(self):
         """Draw all pieces on the board"""
@@ -160,6 +175,96 @@ class UI:
                 if piece:
                     self._draw_piece(piece, row, col)
 
+    def invalidate(self):
+        """Redraw the whole window on the next frame (after it was uncovered or resized)"""
+        self._full_redraw = True
+
+    def draw_frame(self, highlights=None, status_text=None, thinking_frame=None, progress=None):
+        """
+        Draw a frame, redrawing and updating only the parts of the window that changed
+
+        Args:
+            highlights: Optional dictionary (row, col) -> RGB color of highlighted squares
+            status_text: Status message to display
+            thinking_frame: Thinking animation frame number (None when the AI is not thinking)
+            progress: Optional progress line of the thinking animation
+
+        Returns:
+            List of updated rectangles (empty when nothing changed)
+        """
+        pieces = self._piece_keys()
+        highlights = highlights or {}
+
+        dirty = []
+        if self._full_redraw:
+            dirty.append(self.screen.get_rect())
+            self._full_redraw = False
+        else:
+            for pos in set(pieces) | set(self._shown_pieces) | set(highlights) | set(self._shown_highlights):
+                if (pieces.get(pos) != self._shown_pieces.get(pos)
+                        or highlights.get(pos) != self._shown_highlights.get(pos)):
+                    dirty.append(self.square_rect(pos))
+            if status_text != self._shown_status and self._status_rect:
+                dirty.append(self._status_rect)
+            dirty.extend(self._overlay_rects)  # Erase the previous animation frame
+
+        self._shown_pieces = pieces
+        self._shown_highlights = dict(highlights)
+        if status_text != self._shown_status:
+            self._shown_status = status_text
+            self._status_rect = self._measure_status(status_text) if status_text else None
+            if self._status_rect:
+                dirty.append(self._status_rect)
+
+        for rect in dirty:
+            self._restore(rect)
+
+        self._overlay_rects = []
+        if thinking_frame is not None:
+            self._overlay_rects = self.draw_thinking_animation(thinking_frame, progress)
+            dirty.extend(self._overlay_rects)
+
+        if dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+    def square_rect(self, position):
+        """
+        Get the screen rectangle of a square (centered on its intersection)
+
+        Args:
+            position: Tuple (row, col)
+
+        Returns:
+            pygame.Rect
+        """
+        x, y = self.board_to_screen(*position)
+        return pygame.Rect(x - SQUARE_SIZE // 2, y - SQUARE_SIZE // 2, SQUARE_SIZE, SQUARE_SIZE)
+
+    def _piece_keys(self):
+        """Map each occupied square to its image key"""
+        keys = {}
+        for row in range(10):
+            for col in range(9):
+                piece = self.board.get_piece(row, col)
+                if piece:
+                    keys[(row, col)] = f"{piece.color}_{piece.piece_type}"
+        return keys
+
+    def _restore(self, rect):
+        """Redraw the board, pieces, highlights and status inside a rectangle"""
+        self.screen.set_clip(rect)
+        self.screen.blit(self.board_layer, rect, rect)
+        for pos in self._shown_pieces:
+            if self.square_rect(pos).colliderect(rect):
+                self._draw_piece(self.board.get_piece(*pos), *pos)
+        for pos, color in self._shown_highlights.items():
+            if self.square_rect(pos).colliderect(rect):
+                self.highlight_square(pos, color)
+        if self._status_rect and self._status_rect.colliderect(rect):
+            self.draw_status(self._shown_status)
+        self.screen.set_clip(None)
+
     def _draw_piece(self, piece, row, col):
         """
         Draw a single piece
@@ -176,21 +281,25 @@ class UI:
         image_key = f"{piece.color}_{piece.piece_type}"
 
         # Draw piece image if available, otherwise fallback to text
-        if image_key in self.piece_images:
-            image = self.piece_images[image_key]
-            # Center the image on the intersection
-            image_rect = image.get_rect(center=(x, y))
-            self.screen.blit(image, image_rect)
-        else:
-            # Fallback to drawing text (original method)
+        image = self.piece_images.get(image_key) or self._fallback_piece(piece, image_key)
+        # Center the image on the intersection
+        image_rect = image.get_rect(center=(x, y))
+        self.screen.blit(image, image_rect)
+
+    def _fallback_piece(self, piece, image_key):
+        """Draw a piece without image as a circle with its character (once per piece kind)"""
+        surface = self._piece_surfaces.get(image_key)
+        if surface is None:
+            center = (SQUARE_SIZE // 2, SQUARE_SIZE // 2)
+            surface = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE), pygame.SRCALPHA)
             color = RED_PIECE_COLOR if piece.color == 'red' else BLACK_PIECE_COLOR
-            pygame.draw.circle(self.screen, (240, 220, 180), (x, y), SQUARE_SIZE // 3)
-            pygame.draw.circle(self.screen, color, (x, y), SQUARE_SIZE // 3, 3)
+            pygame.draw.circle(surface, (240, 220, 180), center, SQUARE_SIZE // 3)
+            pygame.draw.circle(surface, color, center, SQUARE_SIZE // 3, 3)
 
-            text_color = RED_PIECE_COLOR if piece.color == 'red' else BLACK_PIECE_COLOR
-            text = self.font.render(str(piece), True, text_color)
-            text_rect = text.get_rect(center=(x, y))
-            self.screen.blit(text, text_rect)
+            text = self.font.render(str(piece), True, color)
+            surface.blit(text, text.get_rect(center=center))
+            self._piece_surfaces[image_key] = surface
+        return surface
 
     def highlight_square(self, position, color):
         """
@@ -204,10 +313,13 @@ class UI:
         x = BOARD_OFFSET_X + col * SQUARE_SIZE
         y = BOARD_OFFSET_Y + row * SQUARE_SIZE
 
-        # Draw semi-transparent highlight
-        s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
-        s.set_alpha(100)
-        s.fill(color)
+        # Draw semi-transparent highlight (one surface per color)
+        s = self._highlight_surfaces.get(color)
+        if s is None:
+            s = pygame.Surface((SQUARE_SIZE, SQUARE_SIZE))
+            s.set_alpha(100)
+            s.fill(color)
+            self._highlight_surfaces[color] = s
         self.screen.blit(s, (x - SQUARE_SIZE // 2, y - SQUARE_SIZE // 2))
 
     def draw_status(self, status_text):
@@ -216,6 +328,9 @@ class UI:
 
         Args:
             status_text: Status message to display
+
+        Returns:
+            Rectangle covered by the status box
         """
         text = self.status_font.render(status_text, True, (0, 0, 0))
         text_rect = text.get_rect(center=(SCREEN_WIDTH // 2, 30))
@@ -226,6 +341,13 @@ class UI:
         pygame.draw.rect(self.screen, (0, 0, 0), bg_rect, 2)
 
         self.screen.blit(text, text_rect)
+        return bg_rect
+
+    def _measure_status(self, status_text):
+        """Get the rectangle draw_status() covers for a message"""
+        text_rect = pygame.Rect((0, 0), self.status_font.size(status_text))
+        text_rect.center = (SCREEN_WIDTH // 2, 30)
+        return text_rect.inflate(20, 10)
 
     def screen_to_board(self, pos):
         """
@@ -262,12 +384,16 @@ class UI:
         y = BOARD_OFFSET_Y + row * SQUARE_SIZE
         return x, y
 
-    def draw_thinking_animation(self, frame):
+    def draw_thinking_animation(self, frame, progress=None):
         """
         Draw a creative thinking animation
 
         Args:
             frame: Animation frame number
+            progress: Optional progress line shown below the board
+
+        Returns:
+            List of rectangles covering everything drawn
         """
         import math
 
@@ -286,8 +412,8 @@ class UI:
         text_surface = self.status_font.render(full_text, True, (50, 50, 150))
         text_rect = text_surface.get_rect(center=(center_x, center_y))
 
-        # Background with pulse effect
-        bg_width = text_rect.width + 60
+        # Background with pulse effect (sized for the longest text so it does not jump)
+        bg_width = self.status_font.size(thinking_text + "...")[0] + 60
         bg_height = text_rect.height + 20
         bg_rect = pygame.Rect(
             center_x - bg_width // 2,
@@ -298,10 +424,13 @@ class UI:
 
         # Pulsing background
         bg_alpha = int(200 * pulse)
-        bg_surface = pygame.Surface((bg_width, bg_height))
+        bg_surface = self._thinking_background
+        if bg_surface is None or bg_surface.get_size() != (bg_width, bg_height):
+            bg_surface = pygame.Surface((bg_width, bg_height))
+            bg_surface.fill((200, 220, 255))
+            self._thinking_background = bg_surface
         bg_surface.set_alpha(bg_alpha)
-        bg_surface.fill((200, 220, 255))
-        self.screen.blit(bg_surface, bg_rect)
+        covered = self.screen.blit(bg_surface, bg_rect)
 
         # Border with animation
         pygame.draw.rect(self.screen, (50, 50, 150), bg_rect, 2)
@@ -323,19 +452,33 @@ class UI:
             fade = (math.sin(angle + frame * 0.1) + 1) / 2
             alpha = int(150 * fade)
 
-            # Create circle with transparency
-            circle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
-            color_with_alpha = (100, 100, 200, alpha)
-            pygame.draw.circle(circle_surface, color_with_alpha, (radius, radius), radius)
+            # Circle with transparency (one surface per alpha value)
+            circle_surface = self._circle_surfaces.get(alpha)
+            if circle_surface is None:
+                circle_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+                pygame.draw.circle(circle_surface, (100, 100, 200, alpha), (radius, radius), radius)
+                self._circle_surfaces[alpha] = circle_surface
 
-            self.screen.blit(circle_surface, (x - radius, y - radius))
+            covered.union_ip(self.screen.blit(circle_surface, (x - radius, y - radius)))
 
         # Draw brain/thought icon (stylized Chinese character for "thought" 思)
-        icon_font = pygame.font.Font(None, 36)
-        icon = icon_font.render("💭", True, (80, 80, 180))
-        if not icon.get_width() > 5:  # Fallback if emoji not supported
-            icon = icon_font.render("◎", True, (80, 80, 180))
+        icon = self._thinking_icon
+        if icon is None:
+            icon = self.river_font.render("💭", True, (80, 80, 180))
+            if not icon.get_width() > 5:  # Fallback if emoji not supported
+                icon = self.river_font.render("◎", True, (80, 80, 180))
+            self._thinking_icon = icon
 
         icon_x = center_x - bg_width // 2 - 30
         icon_rect = icon.get_rect(center=(icon_x, center_y))
-        self.screen.blit(icon, icon_rect)
+        covered.union_ip(self.screen.blit(icon, icon_rect))
+
+        rects = [covered.clip(self.screen.get_rect())]
+
+        # Live search progress
+        if progress:
+            progress_surface = self.progress_font.render(progress, True, (50, 50, 150))
+            progress_rect = progress_surface.get_rect(center=(center_x, SCREEN_HEIGHT - 30))
+            rects.append(self.screen.blit(progress_surface, progress_rect))
+
+        return rects
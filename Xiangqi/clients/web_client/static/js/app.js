@@ -1,6 +1,12 @@
 // Xiangqi Web Client
-// API configuration
-const API_BASE = window.location.origin + '/api';
+// WebSocket configuration: one persistent connection carries commands and game events
+const WS_URL = (window.location.protocol === 'https:' ? 'wss://' : 'ws://') + window.location.host + '/ws';
+const RECONNECT_DELAY = 1000;
+
+let socket = null;
+let socketReady = null;
+let nextRequestId = 1;
+const pendingRequests = new Map();  // request id -> {resolve, reject}
 
 // Game state
 let gameState = {
@@ -38,10 +44,58 @@ const PIECE_CHARS = {
 
 // Initialize game on load
 document.addEventListener('DOMContentLoaded', () => {
+    connect();
     initGame();
     setupEventListeners();
 });
 
+function connect() {
+    socket = new WebSocket(WS_URL);
+    socketReady = new Promise(resolve => socket.addEventListener('open', resolve, { once: true }));
+
+    socket.addEventListener('open', () => {
+        // Follow the current game again after a reconnect
+        if (gameState.gameId) {
+            sendCommand('join', { game_id: gameState.gameId }).catch(() => {});
+        }
+    });
+    socket.addEventListener('message', event => handleMessage(JSON.parse(event.data)));
+    socket.addEventListener('close', () => {
+        pendingRequests.forEach(request => request.reject(new Error('Connection lost')));
+        pendingRequests.clear();
+        setTimeout(connect, RECONNECT_DELAY);
+    });
+}
+
+async function sendCommand(type, payload = {}) {
+    await socketReady;
+    const id = nextRequestId++;
+    return new Promise((resolve, reject) => {
+        pendingRequests.set(id, { resolve, reject });
+        socket.send(JSON.stringify({ id, type, ...payload }));
+    });
+}
+
+function handleMessage(message) {
+    if (message.type === 'response') {
+        const request = pendingRequests.get(message.id);
+        if (request) {
+            pendingRequests.delete(message.id);
+            request.resolve(message);
+        }
+        return;
+    }
+
+    // Events pushed by the server (our own moves and those of other connections)
+    if (message.type === 'initial_state') {
+        updateGameState(message.data);
+    } else if (['move', 'ai_move', 'resign'].includes(message.type)) {
+        updateGameState(message.data.state);
+    } else if (message.type === 'game_deleted') {
+        updateStatus('Game was deleted');
+    }
+}
+
 function setupEventListeners() {
     document.getElementById('newGame').addEventListener('click', () => initGame());
     document.getElementById('aiMove').addEventListener('click', () => makeAIMove());
@@ -52,21 +106,15 @@ async function initGame() {
     try {
         updateStatus('Creating new game...');
 
-        const response = await fetch(`${API_BASE}/game/new`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                ai_enabled: true,
-                ai_color: 'black',
-                ai_depth: 3
-            })
+        const response = await sendCommand('new_game', {
+            ai_enabled: true,
+            ai_color: 'black',
+            ai_depth: 3
         });
 
-        const data = await response.json();
-
-        if (data.success) {
-            gameState.gameId = data.game_id;
-            updateGameState(data.state);
+        if (response.ok) {
+            gameState.gameId = response.data.game_id;
+            updateGameState(response.data.state);
             drawBoard();
         } else {
             updateStatus('Failed to create game');
@@ -302,13 +350,10 @@ async function handleSquareClick(row, col) {
 
 async function selectPiece(row, col) {
     try {
-        const response = await fetch(
-            `${API_BASE}/game/${gameState.gameId}/valid-moves?row=${row}&col=${col}`
-        );
-        const data = await response.json();
+        const response = await sendCommand('legal_moves', { row, col });
 
         gameState.selectedPiece = [row, col];
-        gameState.validMoves = data.valid_moves;
+        gameState.validMoves = response.ok ? response.data.valid_moves : [];
     } catch (error) {
         console.error('Error getting valid moves:', error);
     }
@@ -318,26 +363,21 @@ async function makeMove(fromPos, toPos) {
     try {
         updateStatus('Making move...');
 
-        const response = await fetch(`${API_BASE}/game/${gameState.gameId}/move`, {
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({
-                from_pos: fromPos,
-                to_pos: toPos
-            })
+        const response = await sendCommand('move', {
+            from_pos: fromPos,
+            to_pos: toPos
         });
 
-        const data = await response.json();
-
-        if (data.success) {
-            updateGameState(data.state);
+        if (response.ok) {
+            const state = response.data.state;
+            updateGameState(state);
 
-            // Automatically make AI move if game is not over
-            if (!data.state.board_state.is_game_over && gameState.currentPlayer === 'black') {
-                setTimeout(() => makeAIMove(), 500);
+            // Ask for the AI reply right away; the server pushes it when ready
+            if (!state.board_state.is_game_over && gameState.currentPlayer === 'black') {
+                makeAIMove();
             }
         } else {
-            updateStatus(`Error: ${data.error}`);
+            updateStatus(`Error: ${response.error}`);
         }
     } catch (error) {
         console.error('Error making move:', error);
@@ -350,16 +390,12 @@ async function makeAIMove() {
         updateStatus('AI is thinking...');
         document.getElementById('aiMove').disabled = true;
 
-        const response = await fetch(`${API_BASE}/game/${gameState.gameId}/ai-move`, {
-            method: 'POST'
-        });
-
-        const data = await response.json();
+        const response = await sendCommand('ai_move');
 
-        if (data.success) {
-            updateGameState(data.state);
+        if (response.ok) {
+            updateGameState(response.data.state);
         } else {
-            updateStatus(`AI Error: ${data.error}`);
+            updateStatus(`AI Error: ${response.error}`);
         }
     } catch (error) {
         console.error('Error making AI move:', error);
@@ -7,5 +7,11 @@ from .pieces import Piece
 from .board import Board
 from .ai_player import AIPlayer
 from .game_engine import GameEngine
+from .search_stats import SearchStats, SearchMetrics
+from .transposition import TranspositionTable
+from . import profiling
 
-__all__ = ['Piece', 'Board', 'AIPlayer', 'GameEngine']
+profiling.enable_from_env()
+
+__all__ = ['Piece', 'Board', 'AIPlayer', 'GameEngine', 'SearchStats', 'SearchMetrics',
+           'TranspositionTable']
@@ -3,20 +3,53 @@ Xiangqi AI Engine
 Implements minimax algorithm with alpha-beta pruning for computer opponent
 """
 
+import random
+import time
+
+from . import profiling
+from .search_stats import SearchStats
+from .transposition import TranspositionTable, zobrist_key, BLACK_VIEW_KEY, EXACT, LOWER, UPPER
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time limit is reached or the search is stopped"""
+
 
 class AIPlayer:
     """AI opponent using minimax with alpha-beta pruning"""
 
-    def __init__(self, depth=3, color='black'):
+    def __init__(self, depth=3, color='black', tt=None, time_limit=None, max_nodes=None, noise=0,
+                 multipv=1, seed=None):
         """
         Initialize the AI
 
         Args:
-            depth: Search depth for minimax algorithm
+            depth: Search depth for minimax algorithm (the maximum depth with a time or node budget)
             color: Color AI plays as ('red' or 'black')
+            tt: Optional TranspositionTable, may be shared between players
+            time_limit: Optional seconds per search; searches deepen iteratively until it runs out
+            max_nodes: Optional node budget per search; searches deepen iteratively until it runs out
+            noise: Random score margin used to pick among the multipv best moves
+            multipv: Number of best moves to choose from (1 always plays the best move)
+            seed: Optional seed of the random choice
         """
         self.depth = depth
         self.color = color
+        self.tt = tt
+        self.time_limit = time_limit
+        self.max_nodes = max_nodes
+        self.noise = noise
+        self.multipv = multipv
+        self.stats = SearchStats()  # Statistics of the current or last search
+        self.score = None  # Score of the best move found by the last search
+        self._random = random.Random(seed)
+        self._root_depth = depth
+        self._deadline = None
+        self._node_limit = None
+        self._stopped = False
+        self._move_now = False
+        self._root_best = (None, None)  # Best root move so far of the running search
+        self._root_lines = []  # Best lines so far of the running analyse() iteration
 
         # Piece values for evaluation
         self.piece_values = {
@@ -39,6 +72,261 @@ class AIPlayer:
         Returns:
             Tuple of (from_pos, to_pos) or None if no moves available
         """
+        move, _ = self.search(board)
+        return move
+
+    def search(self, board):
+        """
+        Search for the best move and collect search statistics
+
+        Args:
+            board: Current board state
+
+        Returns:
+            Tuple (move, stats) where move is (from_pos, to_pos) or None and stats is a SearchStats
+        """
+        self._move_now = False
+        self._root_best = (None, None)
+        if self.multipv > 1:
+            lines, stats = self.analyse(board, self.multipv)
+            return self._choose_line(lines), stats
+
+        self.stats = SearchStats()
+        self.score = None
+        start = time.perf_counter()
+        with profiling.profile_search():
+            if not self._has_budget():
+                try:
+                    result = self._search_root(board, self.depth)
+                except SearchTimeout:
+                    result = None  # Stopped or told to move now
+            else:
+                result = self._iterative_deepening(start, lambda depth: self._search_root(board, depth))
+            if result is None and not self._stopped:
+                result = self._root_best  # Told to move before an iteration completed
+            move, self.score = result or (None, None)
+        self.stats.elapsed = time.perf_counter() - start
+        return move, self.stats
+
+    def _has_budget(self):
+        """Check whether searches are limited by time or nodes (and deepen iteratively)"""
+        return self.time_limit is not None or self.max_nodes is not None
+
+    def _choose_line(self, lines):
+        """
+        Pick one of the best lines, each score shifted by random noise
+
+        Returns:
+            The chosen move or None without lines
+        """
+        if not lines:
+            return None
+        line = max(lines, key=lambda line: line['score'] + self._random.uniform(-self.noise, self.noise))
+        self.score = line['score']
+        return line['move']
+
+    def stop(self):
+        """
+        Stop a search running in another thread as soon as possible
+
+        The stopped search returns no move (or the result of the last completed
+        iteration when deepening iteratively). The player stays stopped, so it
+        should not be used for further searches.
+        """
+        self._stopped = True
+
+    @property
+    def stopped(self):
+        """True once stop() was called"""
+        return self._stopped
+
+    def move_now(self):
+        """
+        Make a search running in another thread return at once with the best move found so far
+
+        That is the deepest completed iteration when deepening iteratively,
+        else the best root move searched so far. Unlike stop(), the player
+        can be used again.
+        """
+        self._move_now = True
+
+    def progress(self):
+        """
+        Get the progress of the running (or last) search, for display from another thread
+
+        Returns:
+            Tuple (depth, nodes): depth of the current iteration and positions visited so far
+        """
+        return self._root_depth, self.stats.nodes + self.stats.qnodes
+
+    def expected_reply(self, board):
+        """
+        Get the opponent reply the last search expects
+
+        Args:
+            board: Position after the move chosen by the search
+
+        Returns:
+            Tuple (from_pos, to_pos) or None if unknown (needs a transposition table)
+        """
+        if self.tt is None:
+            return None
+        pv = self._principal_variation(board.copy(), 1)
+        return pv[0] if pv else None
+
+    def analyse(self, board, k=3):
+        """
+        Find the k best moves with their scores and principal variations (multi-PV)
+
+        All lines are searched with one transposition table (self.tt, or a
+        temporary one), which also provides the principal variations.
+
+        Args:
+            board: Current board state (the AI's color should be to move)
+            k: Number of moves to return
+
+        Returns:
+            Tuple (lines, stats): lines is a list of {'move', 'score', 'pv'}
+            dictionaries, best first, where pv is the list of moves starting with move
+
+        Raises:
+            ValueError: If k is less than 1
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        self.stats = SearchStats()
+        self.score = None
+        self._move_now = False
+        self._root_best = (None, None)
+        self._root_lines = []
+        start = time.perf_counter()
+        own_tt = self.tt
+        if own_tt is None:
+            self.tt = TranspositionTable(capacity=50000)
+        try:
+            with profiling.profile_search('analyse'):
+                if not self._has_budget():
+                    try:
+                        lines = self._analyse_root(board, self.depth, k)
+                    except SearchTimeout:
+                        lines = None  # Stopped or told to move now
+                else:
+                    lines = self._iterative_deepening(start, lambda depth: self._analyse_root(board, depth, k))
+                if lines is None:
+                    lines = self._root_lines  # Root moves completed before the first iteration ended
+        finally:
+            self.tt = own_tt
+        lines = lines or []
+        if lines:
+            self.score = lines[0]['score']
+        self.stats.elapsed = time.perf_counter() - start
+        return lines, self.stats
+
+    def _iterative_deepening(self, start, search_depth):
+        """
+        Call search_depth(1), search_depth(2), ... until the time or node budget or self.depth is reached
+
+        Each iteration starts with the best moves stored in the transposition
+        table by the previous one. The first iteration always completes.
+
+        Args:
+            start: perf_counter() value at the start of the search
+            search_depth: Callable searching to a given depth
+
+        Returns:
+            Result of the deepest completed iteration
+        """
+        deadline = start + self.time_limit if self.time_limit is not None else None
+        result = None
+        try:
+            for depth in range(1, self.depth + 1):
+                if depth > 1:
+                    self._deadline = deadline
+                    self._node_limit = self.max_nodes
+                result = search_depth(depth)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                if self.max_nodes is not None and self.stats.nodes >= self.max_nodes:
+                    break
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+            self._node_limit = None
+        return result
+
+    def _analyse_root(self, board, depth, k):
+        """
+        Search all root moves, keeping exact scores for the k best
+
+        A move only needs an exact score if it can enter the top k, so each
+        move is searched with alpha set to the k-th best score so far.
+
+        Returns:
+            List of line dictionaries as returned by analyse()
+        """
+        self._root_depth = depth
+        moves = self._get_all_moves(board, self.color)
+        key = self._tt_key(board)
+        entry = self.tt.probe(key)
+        if entry is not None:
+            self._order_first(moves, entry[3])
+
+        best = []  # (score, move, board after move), best first
+        for move in moves:
+            board_copy = board.copy()
+            board_copy.move_piece(*move)
+
+            alpha = best[-1][0] if len(best) >= k else float('-inf')
+            value = self._minimax(board_copy, depth - 1, alpha, float('inf'), False)
+            if len(best) < k or value > alpha:
+                best.append((value, move, board_copy))
+                best.sort(key=lambda line: line[0], reverse=True)
+                del best[k:]
+                # Partial result in case no iteration completes
+                self._root_lines = [{'move': move, 'score': value, 'pv': [move]} for value, move, _ in best]
+
+        if best:
+            self.tt.store(key, depth, best[0][0], EXACT, best[0][1])
+        return [
+            {'move': move, 'score': value, 'pv': [move] + self._principal_variation(after, depth - 1)}
+            for value, move, after in best
+        ]
+
+    def _principal_variation(self, board, depth):
+        """
+        Follow the best moves stored in the transposition table
+
+        Args:
+            board: Position to start from (it is modified)
+            depth: Maximum number of moves
+
+        Returns:
+            List of moves
+        """
+        pv = []
+        seen = set()
+        for _ in range(depth):
+            key = self._tt_key(board)
+            entry = self.tt.probe(key)
+            if entry is None or entry[3] is None or key in seen:
+                break
+            seen.add(key)
+            from_pos, to_pos = (tuple(entry[3][0]), tuple(entry[3][1]))
+            if to_pos not in board.get_valid_moves(*from_pos):
+                break
+            pv.append((from_pos, to_pos))
+            board.move_piece(from_pos, to_pos)
+        return pv
+
+    def _search_root(self, board, depth):
+        """
+        Search all root moves
+
+        Returns:
+            Tuple (best_move, best_value), best_move is None without legal moves
+        """
+        self._root_depth = depth
         best_move = None
         best_value = float('-inf')
         alpha = float('-inf')
@@ -48,7 +336,15 @@ class AIPlayer:
         moves = self._get_all_moves(board, self.color)
 
         if not moves:
-            return None
+            return None, None
+        self._root_best = (moves[0], None)
+
+        key = None
+        if self.tt is not None:
+            key = self._tt_key(board)
+            entry = self.tt.probe(key)
+            if entry is not None:
+                self._order_first(moves, entry[3])
 
         # Evaluate each move
         for move in moves:
@@ -59,16 +355,19 @@ class AIPlayer:
             board_copy.move_piece(from_pos, to_pos)
 
             # Evaluate the position
-            value = self._minimax(board_copy, self.depth - 1, alpha, beta, False)
+            value = self._minimax(board_copy, depth - 1, alpha, beta, False)
 
             # Update best move
             if value > best_value:
                 best_value = value
                 best_move = move
+                self._root_best = (best_move, best_value)
 
             alpha = max(alpha, value)
 
-        return best_move
+        if key is not None:
+            self.tt.store(key, depth, best_value, EXACT, best_move)
+        return best_move, best_value
 
     def _minimax(self, board, depth, alpha, beta, is_maximizing):
         """
@@ -84,31 +383,69 @@ class AIPlayer:
         Returns:
             Evaluation score
         """
+        stats = self.stats
+        stats.nodes += 1
+        stats.max_depth = max(stats.max_depth, self._root_depth - depth)
+        if (self._stopped or self._move_now
+                or (self._node_limit is not None and stats.nodes > self._node_limit)
+                or (self._deadline is not None and time.perf_counter() >= self._deadline)):
+            raise SearchTimeout()
+
+        # Reuse an earlier result for this position if it is deep enough
+        key = None
+        tt_move = None
+        if self.tt is not None:
+            key = self._tt_key(board)
+            stats.tt_probes += 1
+            entry = self.tt.probe(key)
+            if entry is not None:
+                entry_depth, score, bound, tt_move = entry
+                if entry_depth >= depth:
+                    if bound == LOWER:
+                        alpha = max(alpha, score)
+                    elif bound == UPPER:
+                        beta = min(beta, score)
+                    if bound == EXACT or alpha >= beta:
+                        stats.tt_hits += 1
+                        return score
+        alpha_orig, beta_orig = alpha, beta
+
         # Base case: depth is 0 or game is over
-        if depth == 0 or board.is_game_over():
-            return self._evaluate_board(board)
+        if depth == 0:
+            return self._store(key, depth, self._evaluate_board(board), EXACT)
+
+        start = time.perf_counter()
+        game_over = board.is_game_over()
+        stats.movegen_time += time.perf_counter() - start
+        if game_over:
+            return self._store(key, depth, self._evaluate_board(board), EXACT)
 
+        best_move = None
         if is_maximizing:
             max_eval = float('-inf')
             moves = self._get_all_moves(board, self.color)
 
             # If no legal moves, evaluate the position (checkmate or stalemate)
             if not moves:
-                return self._evaluate_board(board)
+                return self._store(key, depth, self._evaluate_board(board), EXACT)
+            self._order_first(moves, tt_move)
 
-            for move in moves:
+            for index, move in enumerate(moves):
                 from_pos, to_pos = move
                 board_copy = board.copy()
                 board_copy.move_piece(from_pos, to_pos)
 
                 eval_score = self._minimax(board_copy, depth - 1, alpha, beta, False)
-                max_eval = max(max_eval, eval_score)
+                if eval_score > max_eval:
+                    max_eval = eval_score
+                    best_move = move
                 alpha = max(alpha, eval_score)
 
                 if beta <= alpha:
+                    self._record_cutoff(index)
                     break  # Beta cutoff
 
-            return max_eval
+            result = max_eval
         else:
             min_eval = float('inf')
             opponent_color = 'red' if self.color == 'black' else 'black'
@@ -116,21 +453,60 @@ class AIPlayer:
 
             # If no legal moves, evaluate the position (checkmate or stalemate)
             if not moves:
-                return self._evaluate_board(board)
+                return self._store(key, depth, self._evaluate_board(board), EXACT)
+            self._order_first(moves, tt_move)
 
-            for move in moves:
+            for index, move in enumerate(moves):
                 from_pos, to_pos = move
                 board_copy = board.copy()
                 board_copy.move_piece(from_pos, to_pos)
 
                 eval_score = self._minimax(board_copy, depth - 1, alpha, beta, True)
-                min_eval = min(min_eval, eval_score)
+                if eval_score < min_eval:
+                    min_eval = eval_score
+                    best_move = move
                 beta = min(beta, eval_score)
 
                 if beta <= alpha:
+                    self._record_cutoff(index)
                     break  # Alpha cutoff
 
-            return min_eval
+            result = min_eval
+
+        if result <= alpha_orig:
+            bound = UPPER
+        elif result >= beta_orig:
+            bound = LOWER
+        else:
+            bound = EXACT
+        return self._store(key, depth, result, bound, best_move)
+
+    def _tt_key(self, board):
+        """Transposition table key of a position as seen by this AI's color"""
+        key = zobrist_key(board)
+        return key ^ BLACK_VIEW_KEY if self.color == 'black' else key
+
+    def _store(self, key, depth, score, bound, best_move=None):
+        """Store a result in the transposition table (if any) and return the score"""
+        if key is not None:
+            self.tt.store(key, depth, score, bound, best_move)
+        return score
+
+    @staticmethod
+    def _order_first(moves, move):
+        """Move a (transposition table) move to the front of the move list"""
+        if move is None:
+            return
+        move = (tuple(move[0]), tuple(move[1]))
+        if move in moves:
+            moves.remove(move)
+            moves.insert(0, move)
+
+    def _record_cutoff(self, move_index):
+        """Count a cutoff and whether the first move searched produced it"""
+        self.stats.beta_cutoffs += 1
+        if move_index == 0:
+            self.stats.first_move_cutoffs += 1
 
     def _get_all_moves(self, board, color):
         """
@@ -143,6 +519,7 @@ class AIPlayer:
         Returns:
             List of tuples (from_pos, to_pos)
         """
+        start = time.perf_counter()
         moves = []
         for row in range(10):
             for col in range(9):
@@ -152,6 +529,7 @@ class AIPlayer:
                     for to_pos in valid_moves:
                         moves.append(((row, col), to_pos))
 
+        self.stats.movegen_time += time.perf_counter() - start
         return moves
 
     def _evaluate_board(self, board):
@@ -164,6 +542,13 @@ class AIPlayer:
         Returns:
             Evaluation score (positive is good for AI, negative is good for opponent)
         """
+        start = time.perf_counter()
+        score = self._score_board(board)
+        self.stats.eval_time += time.perf_counter() - start
+        return score
+
+    def _score_board(self, board):
+        """Compute the evaluation score for _evaluate_board"""
         score = 0
 
         # Material evaluation
@@ -0,0 +1,163 @@
+"""
+Xiangqi Batch Analysis
+Searches many positions across a pool of worker processes
+"""
+
+import os
+import threading
+from multiprocessing import Pool
+
+from .board import Board
+from .ai_player import AIPlayer
+from .transposition import TranspositionTable
+
+# Maximum depth of a time-limited search (it normally stops on time much earlier)
+MAX_TIMED_DEPTH = 32
+
+# Transposition table of the current worker process, shared by all positions it analyses
+_worker_tt = None
+
+
+def analyse_position(fen, depth=None, time_limit=None, tt=None, max_nodes=None):
+    """
+    Search one position for the side to move
+
+    Args:
+        fen: Position in FEN
+        depth: Search depth (default 3 without time_limit)
+        time_limit: Optional seconds for an iteratively deepened search
+        tt: Optional TranspositionTable to use
+        max_nodes: Optional node budget of the search
+
+    Returns:
+        Dictionary with fen, move, score (for the side to move), depth and stats,
+        or fen and error if the FEN is invalid
+    """
+    try:
+        board = Board.from_fen(fen)
+    except ValueError as e:
+        return {'fen': fen, 'error': str(e)}
+
+    if depth is None:
+        depth = MAX_TIMED_DEPTH if time_limit else 3
+    ai = AIPlayer(depth=depth, color=board.current_player, tt=tt, time_limit=time_limit, max_nodes=max_nodes)
+    move, stats = ai.search(board)
+    return {
+        'fen': fen,
+        'move': [list(move[0]), list(move[1])] if move else None,
+        'score': ai.score,
+        'depth': stats.max_depth,
+        'stats': stats.to_dict()
+    }
+
+
+def _init_worker(tt_capacity):
+    """Give a worker process its own transposition table"""
+    global _worker_tt
+    _worker_tt = TranspositionTable(tt_capacity)
+
+
+def _analyse_task(task):
+    """Analyse one (index, fen, depth, time_limit, max_nodes) task in a worker process"""
+    index, fen, depth, time_limit, max_nodes = task
+    result = analyse_position(fen, depth, time_limit, _worker_tt, max_nodes)
+    result['index'] = index
+    return result
+
+
+def analyse_many(fens, depth=None, time_limit=None, workers=None, chunk_size=8, tt_capacity=200000):
+    """
+    Analyse many positions, yielding results as they complete
+
+    Positions are handed to the workers in chunks of consecutive positions.
+    Each worker keeps one transposition table for all positions it analyses,
+    so related positions (such as successive positions of one game) reuse
+    each other's results.
+
+    Args:
+        fens: Iterable of FEN strings
+        depth: Search depth per position (default 3 without time_limit)
+        time_limit: Optional seconds per position
+        workers: Number of worker processes (default: number of CPUs, 1 runs in this process)
+        chunk_size: Consecutive positions given to a worker at a time
+        tt_capacity: Transposition table size per worker
+
+    Yields:
+        Result dictionaries of analyse_position() with the index of the position
+        in the input, in completion order
+    """
+    tasks = ((index, fen, depth, time_limit, None) for index, fen in enumerate(fens))
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        _init_worker(tt_capacity)
+        for task in tasks:
+            yield _analyse_task(task)
+        return
+
+    with Pool(workers, initializer=_init_worker, initargs=(tt_capacity,)) as pool:
+        for result in pool.imap_unordered(_analyse_task, tasks, chunksize=chunk_size):
+            yield result
+
+
+class AnalysisPool:
+    """
+    Long-lived worker processes for analysing positions in a server
+
+    Unlike analyse_many(), the processes (and their transposition tables)
+    are started once and shared by every call, so a request does not pay
+    for starting a pool. analyse() blocks the calling thread while the
+    workers search, and may be called from several threads at once.
+    """
+
+    def __init__(self, workers=None, chunk_size=4, tt_capacity=200000):
+        """
+        Initialize the pool (the processes start on first use)
+
+        Args:
+            workers: Number of worker processes (default: number of CPUs, 1 runs in the calling thread)
+            chunk_size: Consecutive positions given to a worker at a time
+            tt_capacity: Transposition table size per worker
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.tt_capacity = tt_capacity
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def analyse(self, positions, depth=None, time_limit=None, max_nodes=None):
+        """
+        Analyse positions across the workers
+
+        Args:
+            positions: List of (index, fen) pairs
+            depth: Search depth per position (default 3 without time_limit)
+            time_limit: Optional seconds per position
+            max_nodes: Optional node budget per position
+
+        Returns:
+            List of result dictionaries of analyse_position() with their index,
+            in completion order
+        """
+        tasks = [(index, fen, depth, time_limit, max_nodes) for index, fen in positions]
+        if self.workers == 1:
+            with self._lock:  # One transposition table, used by one search at a time
+                if _worker_tt is None:
+                    _init_worker(self.tt_capacity)
+                return [_analyse_task(task) for task in tasks]
+        return list(self._get_pool().imap_unordered(_analyse_task, tasks, chunksize=self.chunk_size))
+
+    def close(self):
+        """Stop the worker processes"""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.terminate()
+                self._pool.join()
+                self._pool = None
+
+    def _get_pool(self):
+        """Start the worker processes if needed"""
+        with self._lock:
+            if self._pool is None:
+                self._pool = Pool(self.workers, initializer=_init_worker, initargs=(self.tt_capacity,))
+            return self._pool
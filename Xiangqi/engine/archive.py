@@ -0,0 +1,118 @@
+"""
+Xiangqi Game Archive
+Append-only file of finished games, written by a background thread
+"""
+
+import os
+import queue
+import threading
+
+from .notation import parse_game
+
+
+class GameArchive:
+    """
+    Appends game records to a file without blocking the caller
+
+    append() only queues the record; a writer thread appends it to the file
+    with a single write call on a file opened in append mode, so several
+    processes can share one archive without interleaving records.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the archive and start its writer thread
+
+        Args:
+            path: Archive file (created if missing)
+        """
+        self.path = path
+        self.written = 0
+        self.errors = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name='xiangqi-archive', daemon=True)
+        self._thread.start()
+
+    def append(self, record):
+        """
+        Queue a game record for writing
+
+        Args:
+            record: Record text from notation.export_game()
+        """
+        self._queue.put(record.rstrip('\n') + '\n\n')
+
+    def pending(self):
+        """Number of records waiting to be written"""
+        return self._queue.qsize()
+
+    def flush(self):
+        """Wait until every queued record is written"""
+        self._queue.join()
+
+    def close(self):
+        """Write the queued records and stop the writer thread"""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _write_loop(self):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            while True:
+                record = self._queue.get()
+                try:
+                    if record is None:
+                        return
+                    os.write(fd, record.encode('utf-8'))
+                    self.written += 1
+                except OSError:
+                    self.errors += 1
+                finally:
+                    self._queue.task_done()
+        finally:
+            os.close(fd)
+
+
+def iter_records(path):
+    """
+    Iterate over the raw records of an archive, reading one line at a time
+
+    Args:
+        path: Archive file
+
+    Yields:
+        Record text of each game
+    """
+    lines = []
+    in_moves = False
+    with open(path, encoding='utf-8') as archive:
+        for line in archive:
+            stripped = line.strip()
+            if stripped.startswith('[') and in_moves:
+                # Tags after movetext start the next game
+                yield ''.join(lines)
+                lines = []
+                in_moves = False
+            if stripped and not stripped.startswith('['):
+                in_moves = True
+            lines.append(line)
+    if any(line.strip() for line in lines):
+        yield ''.join(lines)
+
+
+def iter_games(path, validate=False):
+    """
+    Iterate over the games of an archive lazily
+
+    Only one game is held in memory at a time, so archives of any size can
+    be scanned for statistics.
+
+    Args:
+        path: Archive file
+        validate: Replay each game and raise on illegal moves
+
+    Yields:
+        Dictionaries with headers, start_fen, moves and result
+    """
+    for record in iter_records(path):
+        yield parse_game(record, validate=validate)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Xiangqi Self-Play Arena
+Plays matches between two AIPlayer configurations and estimates their Elo difference
+
+Usage:
+    PYTHONPATH=. python3 -m engine.arena --a depth=2 --b depth=1 --games 40
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from multiprocessing import Pool
+
+from .board import Board, START_FEN
+from .ai_player import AIPlayer
+from .skill import skill_settings, player_kwargs
+
+# Short opening lines played from the start position, as (from_pos, to_pos) moves
+OPENING_LINES = [
+    [],
+    [((7, 7), (7, 4))],                       # Central cannon
+    [((7, 7), (7, 4)), ((0, 7), (2, 6))],     # Central cannon vs screen horse
+    [((9, 2), (7, 4))],                       # Elephant opening
+    [((9, 1), (7, 2))],                       # Horse opening
+    [((6, 2), (5, 2))],                       # Pawn opening
+    [((7, 1), (7, 3))],                       # Palace corner cannon
+]
+
+
+def opening_fens():
+    """
+    Build the default opening FENs from the built-in opening lines
+
+    Returns:
+        List of FEN strings
+    """
+    fens = []
+    for line in OPENING_LINES:
+        board = Board.from_fen(START_FEN)
+        for from_pos, to_pos in line:
+            if to_pos not in board.get_valid_moves(*from_pos):
+                raise ValueError(f"Illegal opening move {from_pos} -> {to_pos}")
+            board.move_piece(from_pos, to_pos)
+        fens.append(board.to_fen())
+    return fens
+
+
+def load_openings(path):
+    """
+    Load opening FENs from a file (one FEN per line, '#' starts a comment)
+
+    Args:
+        path: Path to the openings file
+
+    Returns:
+        List of FEN strings
+    """
+    fens = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                Board.from_fen(line)  # Validate early, before spawning workers
+                fens.append(line)
+    return fens
+
+
+def parse_config(text):
+    """
+    Parse an AIPlayer configuration like 'depth=3', 'depth=2,max_nodes=500' or 'skill=easy'
+
+    A skill level expands to its settings; other keys override them.
+
+    Args:
+        text: Comma separated key=value pairs
+
+    Returns:
+        Dictionary of AIPlayer keyword arguments
+    """
+    config = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        if '=' not in item:
+            raise ValueError(f"Expected key=value, got {item!r}")
+        key, value = (part.strip() for part in item.split('=', 1))
+        for cast in (int, float):
+            try:
+                value = cast(value)
+                break
+            except ValueError:
+                continue
+        config[key] = value
+    config.pop('color', None)  # Colors are assigned by the arena
+    skill = config.pop('skill', None)
+    if skill is not None:
+        config = dict(player_kwargs(skill_settings(skill)), **config)
+    return config
+
+
+def play_game(task):
+    """
+    Play a single game between two configurations
+
+    Args:
+        task: Dictionary with 'index', 'fen', 'config_a', 'config_b', 'a_color' and 'max_plies'
+
+    Returns:
+        Dictionary describing the game, with 'score' from configuration A's point of view
+    """
+    board = Board.from_fen(task['fen'])
+    a_color = task['a_color']
+    b_color = 'black' if a_color == 'red' else 'red'
+    players = {
+        a_color: ('a', AIPlayer(color=a_color, **task['config_a'])),
+        b_color: ('b', AIPlayer(color=b_color, **task['config_b'])),
+    }
+    moves = {'a': [], 'b': []}
+
+    score = 0.5
+    reason = 'max_plies'
+    plies = 0
+    while plies < task['max_plies']:
+        if board.is_checkmate():
+            score = 0.0 if board.current_player == a_color else 1.0
+            reason = 'checkmate'
+            break
+        if board.is_stalemate():
+            reason = 'stalemate'
+            break
+
+        label, ai = players[board.current_player]
+        start = time.perf_counter()
+        move = ai.get_best_move(board)
+        elapsed = time.perf_counter() - start
+        if move is None:
+            reason = 'no_move'
+            break
+
+        moves[label].append({'time': elapsed, 'nodes': ai.stats.nodes})
+        board.move_piece(*move)
+        plies += 1
+
+    return {
+        'index': task['index'],
+        'fen': task['fen'],
+        'a_color': a_color,
+        'score': score,
+        'reason': reason,
+        'plies': plies,
+        'moves': moves,
+    }
+
+
+def elo_difference(wins, draws, losses, z=1.96):
+    """
+    Estimate the Elo difference from a match result
+
+    Args:
+        wins: Games won by configuration A
+        draws: Drawn games
+        losses: Games lost by configuration A
+        z: Normal quantile for the error bars (1.96 = 95%)
+
+    Returns:
+        Tuple (elo, lower, upper); infinite values mean a one-sided result
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, float('-inf'), float('inf')
+
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1.0 - score) ** 2 +
+                draws * (0.5 - score) ** 2 +
+                losses * (0.0 - score) ** 2) / games
+    margin = z * math.sqrt(variance / games)
+
+    return (_score_to_elo(score),
+            _score_to_elo(score - margin),
+            _score_to_elo(score + margin))
+
+
+def _score_to_elo(score):
+    """Convert an expected score to an Elo difference"""
+    if score <= 0.0:
+        return float('-inf')
+    if score >= 1.0:
+        return float('inf')
+    return -400.0 * math.log10(1.0 / score - 1.0) + 0.0  # Avoid printing -0.0
+
+
+def run_match(config_a, config_b, games=20, fens=None, workers=None, max_plies=200, on_result=None):
+    """
+    Play a match between two configurations in parallel worker processes
+
+    Args:
+        config_a: AIPlayer keyword arguments for configuration A
+        config_b: AIPlayer keyword arguments for configuration B
+        games: Number of games; each opening is played with both colors
+        fens: Opening FENs (defaults to the built-in openings)
+        workers: Number of worker processes (defaults to CPU count)
+        max_plies: Games reaching this many plies are scored as draws
+        on_result: Optional callback invoked with each finished game
+
+    Returns:
+        List of game records ordered by game index
+    """
+    fens = fens or opening_fens()
+    tasks = [{
+        'index': i,
+        'fen': fens[(i // 2) % len(fens)],
+        'config_a': config_a,
+        'config_b': config_b,
+        'a_color': 'red' if i % 2 == 0 else 'black',
+        'max_plies': max_plies,
+    } for i in range(games)]
+
+    workers = max(1, min(workers or os.cpu_count() or 1, games))
+    records = []
+    with Pool(processes=workers) as pool:
+        for record in pool.imap_unordered(play_game, tasks):
+            records.append(record)
+            if on_result:
+                on_result(record)
+
+    records.sort(key=lambda record: record['index'])
+    return records
+
+
+def summarize(records):
+    """
+    Summarize match records
+
+    Args:
+        records: Game records returned by run_match
+
+    Returns:
+        Dictionary with results, Elo estimate and per-configuration search statistics
+    """
+    wins = sum(1 for r in records if r['score'] == 1.0)
+    losses = sum(1 for r in records if r['score'] == 0.0)
+    draws = len(records) - wins - losses
+    elo, lower, upper = elo_difference(wins, draws, losses)
+
+    summary = {
+        'games': len(records),
+        'wins': wins,
+        'draws': draws,
+        'losses': losses,
+        'elo': elo,
+        'elo_lower': lower,
+        'elo_upper': upper,
+    }
+
+    for label in ('a', 'b'):
+        moves = [move for r in records for move in r['moves'][label]]
+        total_time = sum(move['time'] for move in moves)
+        total_nodes = sum(move['nodes'] for move in moves)
+        summary[label] = {
+            'moves': len(moves),
+            'avg_time': total_time / len(moves) if moves else 0.0,
+            'max_time': max((move['time'] for move in moves), default=0.0),
+            'avg_nodes': total_nodes / len(moves) if moves else 0.0,
+            'nps': total_nodes / total_time if total_time else 0.0,
+        }
+
+    return summary
+
+
+def format_summary(summary, config_a, config_b):
+    """Format a match summary for the console"""
+    lines = [
+        f"A: {config_a}",
+        f"B: {config_b}",
+        f"Games: {summary['games']}  +{summary['wins']} ={summary['draws']} -{summary['losses']} (A's view)",
+        f"Elo difference (A - B): {summary['elo']:+.1f}  "
+        f"95% CI [{summary['elo_lower']:+.1f}, {summary['elo_upper']:+.1f}]",
+    ]
+    for label in ('a', 'b'):
+        stats = summary[label]
+        lines.append(
+            f"{label.upper()}: {stats['moves']} moves, "
+            f"avg {stats['avg_time'] * 1000:.1f} ms/move (max {stats['max_time'] * 1000:.1f} ms), "
+            f"avg {stats['avg_nodes']:.0f} nodes/move, {stats['nps']:.0f} nps"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play AIPlayer configurations against each other")
+    parser.add_argument('--a', default='depth=2', help="Configuration A, e.g. 'depth=2'")
+    parser.add_argument('--b', default='depth=1', help="Configuration B, e.g. 'depth=1'")
+    parser.add_argument('--games', type=int, default=20, help="Number of games to play")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--openings', help="File with one opening FEN per line")
+    parser.add_argument('--max-plies', type=int, default=200, help="Plies before a game is scored as a draw")
+    parser.add_argument('--output', help="Write per-game records as JSON lines to this file")
+    args = parser.parse_args(argv)
+
+    config_a = parse_config(args.a)
+    config_b = parse_config(args.b)
+    fens = load_openings(args.openings) if args.openings else None
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else None
+
+    def on_result(record):
+        outcome = {1.0: 'A wins', 0.0: 'B wins'}.get(record['score'], 'draw')
+        print(f"Game {record['index'] + 1}: {outcome} ({record['reason']}, {record['plies']} plies)")
+        if output:
+            output.write(json.dumps(record) + '\n')
+            output.flush()
+
+    try:
+        records = run_match(config_a, config_b, games=args.games, fens=fens,
+                            workers=args.workers, max_plies=args.max_plies,
+                            on_result=on_result)
+    finally:
+        if output:
+            output.close()
+
+    print()
+    print(format_summary(summarize(records), config_a, config_b))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,6 +5,9 @@ Handles the game board, move validation, and game rules
 
 from .pieces import Piece
 
+# Standard starting position in FEN notation (row 0 / black side first)
+START_FEN = 'rnbakabnr/9/1c5c1/p1p1p1p1p/9/9/P1P1P1P1P/1C5C1/9/RNBAKABNR w'
+
 
 class Board:
     """Represents the Xiangqi game board"""
@@ -63,6 +66,72 @@ class Board:
         # General
         self.board[9][4] = Piece('general', 'red', (9, 4))
 
+    @classmethod
+    def from_fen(cls, fen):
+        """
+        Create a board from a FEN string
+
+        Args:
+            fen: Position in FEN notation; the side to move may be 'w'/'r' for red or 'b' for black
+
+        Returns:
+            Board object
+        """
+        fields = fen.split()
+        if not fields:
+            raise ValueError("Empty FEN string")
+
+        ranks = fields[0].split('/')
+        if len(ranks) != 10:
+            raise ValueError(f"FEN must have 10 ranks, got {len(ranks)}")
+
+        board = cls.__new__(cls)
+        board.board = [[None for _ in range(9)] for _ in range(10)]
+        board.move_history = []
+        board.captured_pieces = []
+
+        for row, rank in enumerate(ranks):
+            col = 0
+            for char in rank:
+                if char.isdigit():
+                    col += int(char)
+                else:
+                    if col >= 9:
+                        raise ValueError(f"FEN rank {row} is too long: {rank!r}")
+                    board.board[row][col] = Piece.from_fen_char(char, (row, col))
+                    col += 1
+            if col != 9:
+                raise ValueError(f"FEN rank {row} must cover 9 columns: {rank!r}")
+
+        side = fields[1].lower() if len(fields) > 1 else 'w'
+        if side not in ('w', 'r', 'b'):
+            raise ValueError(f"Invalid side to move in FEN: {fields[1]!r}")
+        board.current_player = 'black' if side == 'b' else 'red'
+
+        return board
+
+    def to_fen(self):
+        """Get the current position as a FEN string"""
+        ranks = []
+        for row in range(10):
+            rank = ''
+            empty = 0
+            for col in range(9):
+                piece = self.board[row][col]
+                if piece:
+                    if empty:
+                        rank += str(empty)
+                        empty = 0
+                    rank += piece.to_fen_char()
+                else:
+                    empty += 1
+            if empty:
+                rank += str(empty)
+            ranks.append(rank)
+
+        side = 'w' if self.current_player == 'red' else 'b'
+        return '/'.join(ranks) + ' ' + side
+
     def get_piece(self, row, col):
         """Get the piece at the specified position"""
         if self.is_valid_position(row, col):
@@ -489,7 +558,10 @@ class Board:
         return {
             'board': board_data,
             'current_player': self.current_player,
-            'move_history': self.move_history,
+            'move_history': [
+                (from_pos, to_pos, captured.to_dict() if captured else None)
+                for from_pos, to_pos, captured in self.move_history
+            ],
             'captured_pieces': [p.to_dict() for p in self.captured_pieces],
             'is_game_over': self.is_game_over(),
             'is_checkmate': self.is_checkmate(),
@@ -3,47 +3,227 @@ Xiangqi Game Engine
 Provides a clean API for game management and interaction
 """
 
+import time
 import uuid
-from .board import Board
-from .ai_player import AIPlayer
+from .board import Board, START_FEN
+from .search_stats import SearchStats, SearchMetrics
+from .session_store import SessionStore
+from .ponder import Ponderer
+from .archive import GameArchive
+from .notation import export_game, parse_game, replay, game_result
+from .position_cache import PositionCache, settings_key
+from .skill import skill_settings, apply_limits, create_player, estimated_search_time
+from .transposition import TranspositionTable
+from . import analysis, profiling
+
+# Transposition table size of a game's AI while pondering
+PONDER_TT_CAPACITY = 20000
 
 
 class GameEngine:
     """Main game engine managing game sessions"""
 
-    def __init__(self):
-        """Initialize the game engine"""
-        self.games = {}  # Map game_id -> game_state
+    def __init__(self, session_capacity=1024, session_ttl=None, session_db=None, session_retention=None,
+                 session_shared=False, ponder=False, max_ai_depth=None, max_ai_nodes=None, max_ai_time=None,
+                 position_cache_size=0, position_cache_db=None, archive_path=None, max_ponders=4):
+        """
+        Initialize the game engine
 
-    def new_game(self, ai_enabled=True, ai_color='black', ai_depth=3):
+        Args:
+            session_capacity: Maximum number of games kept in memory
+            session_ttl: Seconds of inactivity after which a game is moved out of memory (None to disable)
+            session_db: SQLite file for games moved out of memory (None for an in-memory database)
+            session_retention: Seconds after which untouched games are deleted from disk (None to keep them)
+            session_shared: Share games with other processes using the same session_db
+            ponder: After each AI move, keep searching the expected reply in the background
+            max_ai_depth: Server-wide limit on the AI search depth (None for no limit)
+            max_ai_nodes: Server-wide limit on nodes per AI search (None for no limit)
+            max_ai_time: Server-wide limit on seconds per AI search (None for no limit)
+            position_cache_size: AI results shared between games kept in memory (0 to disable)
+            position_cache_db: Optional SQLite file keeping shared AI results across restarts
+            archive_path: Optional file to which finished and deleted games are appended
+            max_ponders: Ponder searches running at once; further games do not ponder
+        """
+        # Map game_id -> game_state; idle games are spilled to SQLite and reloaded on access
+        self.games = SessionStore(
+            serialize=self._serialize_game,
+            deserialize=self._restore_game,
+            capacity=session_capacity,
+            idle_ttl=session_ttl,
+            path=session_db,
+            retention=session_retention,
+            shared=session_shared,
+            on_evict=self._drop_ponder
+        )
+        self.metrics = SearchMetrics()  # Totals over all AI searches
+
+        # Limits applied to every AI search, whatever a game asks for
+        self.ai_limits = {'max_depth': max_ai_depth, 'max_nodes': max_ai_nodes, 'max_time': max_ai_time}
+
+        # Pondering: game_id -> Ponderer of a game held in memory
+        self.ponder = ponder
+        self.max_ponders = max_ponders
+        self._ponders = {}
+        self.ponder_hits = 0
+        self.ponder_misses = 0
+        self.ponder_skipped = 0
+
+        # AI moves by position and settings, shared between games
+        self.position_cache = None
+        if position_cache_size:
+            self.position_cache = PositionCache(position_cache_size, path=position_cache_db)
+
+        # Records of finished games, appended by a background thread
+        self.archive = GameArchive(archive_path) if archive_path else None
+
+    def new_game(self, ai_enabled=True, ai_color='black', ai_depth=3, skill=None):
         """
         Create a new game session
 
         Args:
             ai_enabled: Whether to enable AI opponent
             ai_color: Color for AI player ('red' or 'black')
-            ai_depth: Search depth for AI
+            ai_depth: Search depth for AI (used without skill)
+            skill: Optional skill level (see engine.skill.SKILL_LEVELS)
 
         Returns:
             Game ID (string)
+
+        Raises:
+            ValueError: If the skill level is unknown
         """
         game_id = str(uuid.uuid4())
+        ai_settings = skill_settings(skill, ai_depth) if ai_enabled else None
 
         game_state = {
             'id': game_id,
             'board': Board(),
+            'start_fen': START_FEN,
             'ai_enabled': ai_enabled,
-            'ai': AIPlayer(depth=ai_depth, color=ai_color) if ai_enabled else None,
-            'ai_color': ai_color if ai_enabled else None
+            'ai': self._create_ai(ai_settings, ai_color) if ai_enabled else None,
+            'ai_settings': ai_settings,
+            'ai_color': ai_color if ai_enabled else None,
+            'resigned': None,
+            'archived': False
         }
 
-        self.games[game_id] = game_state
+        self.games.put(game_id, game_state)
         return game_id
 
     def get_game(self, game_id):
         """Get game state by ID"""
         return self.games.get(game_id)
 
+    def _create_ai(self, settings, color):
+        """Create an AI player with the requested settings within the server limits"""
+        return create_player(apply_limits(settings, **self.ai_limits), color)
+
+    def estimate_ai_time(self, game_id):
+        """
+        Estimate the seconds the next AI search of a game takes
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            Estimated seconds (0 if the game has no AI)
+        """
+        game = self.get_game(game_id)
+        if not game or not game['ai_enabled']:
+            return 0.0
+        return estimated_search_time(apply_limits(game['ai_settings'], **self.ai_limits))
+
+    def stop_ai(self, game_id):
+        """
+        Stop a running AI search of a game
+
+        The stopped search makes make_ai_move fail; the game gets a fresh AI
+        player (with the same transposition table) for later moves.
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            True if the game has an AI
+        """
+        self._stop_ponder(game_id)
+        game = self.get_game(game_id)
+        if not game or not game['ai_enabled']:
+            return False
+        stopped = game['ai']
+        stopped.stop()
+        game['ai'] = self._create_ai(game['ai_settings'], game['ai_color'])
+        game['ai'].tt = stopped.tt
+        return True
+
+    def force_ai_move(self, game_id):
+        """
+        Make a running AI search of a game play its best move so far
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            True if the game has an AI
+        """
+        game = self.get_game(game_id)
+        if not game or not game['ai_enabled']:
+            return False
+        game['ai'].move_now()
+        return True
+
+    def get_ai_progress(self, game_id):
+        """
+        Get the progress of a game's running AI search
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            Dictionary with depth and nodes, or None if the game has no AI
+        """
+        game = self.get_game(game_id)
+        if not game or not game['ai_enabled']:
+            return None
+        depth, nodes = game['ai'].progress()
+        return {'depth': depth, 'nodes': nodes}
+
+    def _serialize_game(self, game):
+        """Convert a game to a compact dictionary (start position + move list)"""
+        return {
+            'id': game['id'],
+            'start_fen': game['start_fen'],
+            'moves': [[list(from_pos), list(to_pos)]
+                      for from_pos, to_pos, _ in game['board'].move_history],
+            'ai_enabled': game['ai_enabled'],
+            'ai_color': game['ai_color'],
+            'ai_settings': game['ai_settings'],
+            'resigned': game.get('resigned'),
+            'archived': game.get('archived', False)
+        }
+
+    def _restore_game(self, data):
+        """Rebuild a game from a dictionary created by _serialize_game"""
+        board = Board.from_fen(data['start_fen'])
+        for from_pos, to_pos in data['moves']:
+            board.move_piece(tuple(from_pos), tuple(to_pos))
+
+        ai_enabled = data['ai_enabled']
+        ai_settings = data.get('ai_settings')
+        if ai_enabled and ai_settings is None:
+            ai_settings = skill_settings(None, data['ai_depth'])  # Stored before skill levels existed
+        return {
+            'id': data['id'],
+            'board': board,
+            'start_fen': data['start_fen'],
+            'ai_enabled': ai_enabled,
+            'ai': self._create_ai(ai_settings, data['ai_color']) if ai_enabled else None,
+            'ai_settings': ai_settings,
+            'ai_color': data['ai_color'],
+            'resigned': data.get('resigned'),
+            'archived': data.get('archived', False)
+        }
+
     def get_board(self, game_id):
         """Get the board for a game"""
         game = self.get_game(game_id)
@@ -64,13 +244,27 @@ class GameEngine:
             return None
 
         board = game['board']
+        board_state = board.to_dict()
+        if game.get('resigned'):
+            board_state['is_game_over'] = True
+            board_state['status'] = self._resigned_status(game['resigned'])
+
         return {
             'game_id': game_id,
-            'board_state': board.to_dict(),
+            'board_state': board_state,
+            'fen': board.to_fen(),
+            'start_fen': game['start_fen'],
             'ai_enabled': game['ai_enabled'],
-            'ai_color': game['ai_color']
+            'ai_color': game['ai_color'],
+            'skill': game['ai_settings']['skill'] if game['ai_settings'] else None,
+            'resigned': game.get('resigned')
         }
 
+    def _resigned_status(self, color):
+        """Status message for a resigned game"""
+        winner = 'Black' if color == 'red' else 'Red'
+        return f"{color.capitalize()} resigned! {winner} wins!"
+
     def make_move(self, game_id, from_pos, to_pos):
         """
         Make a move in the game
@@ -87,6 +281,9 @@ class GameEngine:
         if not game:
             return {'success': False, 'error': 'Game not found'}
 
+        if game.get('resigned'):
+            return {'success': False, 'error': 'Game is over'}
+
         board = game['board']
 
         # Validate move
@@ -101,8 +298,19 @@ class GameEngine:
         if to_pos not in valid_moves:
             return {'success': False, 'error': 'Invalid move'}
 
+        # Stop pondering at once if the reply was not the expected one
+        ponder = self._ponders.get(game_id)
+        if ponder and ponder.expected_move != (tuple(from_pos), tuple(to_pos)):
+            self._stop_ponder(game_id)
+            self.ponder_misses += 1
+
         # Make the move
         board.move_piece(from_pos, to_pos)
+        record = self._finished_record(game)
+        if not self.games.save(game_id, game):
+            return {'success': False, 'error': 'Game was changed by another request, please retry'}
+        if record:
+            self.archive.append(record)
 
         return {
             'success': True,
@@ -165,34 +373,261 @@ class GameEngine:
         if not game or not game['ai_enabled']:
             return {'success': False, 'error': 'AI not enabled'}
 
+        if game.get('resigned'):
+            return {'success': False, 'error': 'Game is over'}
+
         board = game['board']
 
         # Check if it's AI's turn
         if board.current_player != game['ai_color']:
             return {'success': False, 'error': 'Not AI turn'}
 
-        # Get AI move
-        ai_move = self.get_ai_move(game_id)
+        # Get AI move, from the ponder search if it searched this position,
+        # else from another game that reached it with the same settings
+        ai = game['ai']
+        ponder = self._ponders.pop(game_id, None)
+        ponder_hit = ponder is not None and ponder.matches(board)
+        cache_key = None
+        cached = None
+        if ponder_hit:
+            ai_move, stats = ponder.wait()
+            self.ponder_hits += 1
+        else:
+            if ponder:
+                ponder.stop()
+                self.ponder_misses += 1
+            cache_key = self._position_cache_key(game, board)
+            if cache_key:
+                cached = self.position_cache.get(cache_key)
+            if cached and cached[0][1] in board.get_valid_moves(*cached[0][0]):
+                ai_move, stats = cached[0], SearchStats()
+            else:
+                cached = None
+                if self.ponder and ai.tt is None:
+                    ai.tt = TranspositionTable(PONDER_TT_CAPACITY)
+                ai_move, stats = ai.search(board)
+        if not cached:
+            self.metrics.record(stats)
+        if ai.stopped:
+            return {'success': False, 'error': 'AI search was cancelled', 'stats': stats.to_dict()}
         if not ai_move:
-            return {'success': False, 'error': 'No valid AI move available'}
+            return {'success': False, 'error': 'No valid AI move available', 'stats': stats.to_dict()}
+
+        if cache_key and not cached:
+            self.position_cache.put(cache_key, ai_move, ai.score)
 
         # Make the move
         from_pos, to_pos = ai_move
         board.move_piece(from_pos, to_pos)
+        record = self._finished_record(game)
+        if not self.games.save(game_id, game):
+            return {'success': False, 'error': 'Game was changed by another request, please retry'}
+        if record:
+            self.archive.append(record)
+
+        if self.ponder:
+            self._start_ponder(game_id, ai, board)
 
         return {
             'success': True,
             'move': {'from': from_pos, 'to': to_pos},
+            'stats': stats.to_dict(),
+            'ponder_hit': ponder_hit,
+            'cache_hit': cached is not None,
+            'state': self.get_game_state(game_id)
+        }
+
+    def _position_cache_key(self, game, board):
+        """Get the position cache key of a game's AI move (None if the cache is off or the AI is randomized)"""
+        if self.position_cache is None:
+            return None
+        settings_id = settings_key(apply_limits(game['ai_settings'], **self.ai_limits))
+        if settings_id is None:
+            return None
+        return PositionCache.make_key(board, settings_id)
+
+    def _start_ponder(self, game_id, ai, board):
+        """Search the expected opponent reply in the background"""
+        reply = ai.expected_reply(board)
+        if reply is None:
+            return
+        if sum(ponder.is_running() for ponder in list(self._ponders.values())) >= self.max_ponders:
+            self.ponder_skipped += 1  # Pondering is spare work; never more than max_ponders threads
+            return
+        ponder = Ponderer(ai, board, reply)
+        self._ponders[game_id] = ponder
+        ponder.start()
+
+    def _stop_ponder(self, game_id):
+        """Stop pondering in a game (if it is)"""
+        ponder = self._ponders.pop(game_id, None)
+        if ponder:
+            ponder.stop()
+
+    def _drop_ponder(self, game_id):
+        """Stop pondering in a game that left memory, without waiting for the thread"""
+        ponder = self._ponders.pop(game_id, None)
+        if ponder:
+            ponder.stop(wait=False)
+
+    def resign(self, game_id, color=None):
+        """
+        Resign the game
+
+        Args:
+            game_id: Game ID
+            color: Color that resigns (defaults to the player to move)
+
+        Returns:
+            Dictionary with result and updated state
+        """
+        game = self.get_game(game_id)
+        if not game:
+            return {'success': False, 'error': 'Game not found'}
+
+        board = game['board']
+        if game.get('resigned') or board.is_game_over():
+            return {'success': False, 'error': 'Game is over'}
+
+        color = color or board.current_player
+        if color not in ('red', 'black'):
+            return {'success': False, 'error': 'Invalid color'}
+
+        game['resigned'] = color
+        self._stop_ponder(game_id)
+        record = self._finished_record(game)
+        if not self.games.save(game_id, game):
+            return {'success': False, 'error': 'Game was changed by another request, please retry'}
+        if record:
+            self.archive.append(record)
+
+        return {
+            'success': True,
             'state': self.get_game_state(game_id)
         }
 
+    def analyse(self, game_id, k=3, depth=2, time_limit=None):
+        """
+        Analyse the current position for the player to move (multi-PV)
+
+        Args:
+            game_id: Game ID
+            k: Number of best moves to return
+            depth: Search depth (the maximum depth when time_limit is set)
+            time_limit: Optional seconds for an iteratively deepened search
+
+        Returns:
+            Dictionary with the best lines (move, score, pv), best first; scores
+            are from the point of view of the player to move
+
+        Raises:
+            ValueError: If k is less than 1
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        game = self.get_game(game_id)
+        if not game:
+            return {'success': False, 'error': 'Game not found'}
+        if self.is_game_over(game_id):
+            return {'success': False, 'error': 'Game is over'}
+
+        board = game['board'].copy()  # The search must not see concurrent moves
+        ai = create_player(self.analysis_settings(depth, time_limit), board.current_player)
+        lines, stats = ai.analyse(board, k)
+        self.metrics.record(stats)
+
+        return {
+            'success': True,
+            'player': board.current_player,
+            'lines': lines,
+            'depth': stats.max_depth,
+            'stats': stats.to_dict()
+        }
+
+    def analysis_settings(self, depth=None, time_limit=None):
+        """
+        Get the search settings of an analysis within the server limits
+
+        Args:
+            depth: Search depth (default 3 without time_limit, the depth limit with it)
+            time_limit: Optional seconds for an iteratively deepened search
+
+        Returns:
+            Settings dictionary as returned by apply_limits()
+        """
+        if depth is None:
+            depth = analysis.MAX_TIMED_DEPTH if time_limit else 3
+        return apply_limits(dict(skill_settings(None, depth), time_limit=time_limit), **self.ai_limits)
+
+    def estimate_analysis_time(self, depth=None, time_limit=None):
+        """
+        Estimate the seconds an analysis takes (for scheduling)
+
+        Args:
+            depth: Search depth, as for analysis_settings()
+            time_limit: Optional seconds for an iteratively deepened search
+
+        Returns:
+            Estimated seconds
+        """
+        return estimated_search_time(self.analysis_settings(depth, time_limit))
+
+    def analyse_many(self, fens, depth=None, time_limit=None, workers=None):
+        """
+        Find the best move of many positions in parallel
+
+        Args:
+            fens: Iterable of positions in FEN
+            depth: Search depth per position (default 3 without time_limit)
+            time_limit: Optional seconds per position (iterative deepening)
+            workers: Number of worker processes (default: number of CPUs)
+
+        Returns:
+            Iterator of result dictionaries (index, fen, move, score, depth, stats)
+            in the order the searches complete
+        """
+        return analysis.analyse_many(fens, depth=depth, time_limit=time_limit, workers=workers)
+
+    def get_metrics(self, extra_gauges=None):
+        """
+        Get AI search metrics in Prometheus text format
+
+        Args:
+            extra_gauges: Optional list of (name, value, help) gauges from other components
+
+        Returns:
+            String in Prometheus text exposition format
+        """
+        gauges = [
+            ('xiangqi_ponder_active', len(self._ponders), 'Games with a running ponder search'),
+            ('xiangqi_ponder_hits', self.ponder_hits, 'AI moves answered from a ponder search'),
+            ('xiangqi_ponder_misses', self.ponder_misses, 'Ponder searches discarded for an unexpected reply'),
+            ('xiangqi_ponder_skipped', self.ponder_skipped, 'AI moves not pondered because max_ponders were running'),
+            ('xiangqi_games_active', self.games.resident_count(), 'Game sessions held in memory'),
+            ('xiangqi_games_spilled', self.games.spilled_count(), 'Game sessions stored on disk'),
+            ('xiangqi_session_spills', self.games.spills, 'Games moved out of memory since start'),
+            ('xiangqi_session_loads', self.games.loads, 'Games reloaded from disk since start'),
+        ]
+        if self.position_cache is not None:
+            gauges.extend(self.position_cache.get_gauges())
+        if self.archive is not None:
+            gauges.append(('xiangqi_archive_pending', self.archive.pending(), 'Game records waiting to be archived'))
+            gauges.append(('xiangqi_archive_written', self.archive.written, 'Game records archived since start'))
+        if profiling.is_enabled():
+            for name, counter in sorted(profiling.get_counters().items()):
+                gauges.append((f'xiangqi_profile_{name.strip("_")}_calls', counter['calls'],
+                               f'Profiled calls of {name}'))
+                gauges.append((f'xiangqi_profile_{name.strip("_")}_seconds', counter['seconds'],
+                               f'Profiled cumulative seconds in {name}'))
+        return self.metrics.to_prometheus(gauges=gauges + list(extra_gauges or []))
+
     def is_game_over(self, game_id):
         """Check if game is over"""
         game = self.get_game(game_id)
         if not game:
             return True
 
-        return game['board'].is_game_over()
+        return bool(game.get('resigned')) or game['board'].is_game_over()
 
     def get_game_status(self, game_id):
         """Get game status message"""
@@ -200,11 +635,83 @@ class GameEngine:
         if not game:
             return "Game not found"
 
+        if game.get('resigned'):
+            return self._resigned_status(game['resigned'])
         return game['board'].get_game_status()
 
+    def export_game(self, game_id):
+        """
+        Get the record of a game (ICCS moves with PGN tags)
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            Record text, or None if the game is unknown
+        """
+        game = self.get_game(game_id)
+        if not game:
+            return None
+        return self._game_record(game, game_result(game['board'], game.get('resigned')))
+
+    def import_game(self, record, ai_enabled=True, ai_color='black', ai_depth=3, skill=None):
+        """
+        Create a game from a record and continue it from its last position
+
+        Args:
+            record: Record text (see engine.notation)
+            ai_enabled: Whether to enable AI opponent
+            ai_color: Color for AI player ('red' or 'black')
+            ai_depth: Search depth for AI (used without skill)
+            skill: Optional skill level
+
+        Returns:
+            Game ID (string)
+
+        Raises:
+            ValueError: If the record is malformed, has illegal moves or the skill level is unknown
+        """
+        parsed = parse_game(record, validate=False)
+        board = replay(parsed['start_fen'], parsed['moves'])
+
+        game_id = self.new_game(ai_enabled=ai_enabled, ai_color=ai_color, ai_depth=ai_depth, skill=skill)
+        game = self.get_game(game_id)
+        game['board'] = board
+        game['start_fen'] = parsed['start_fen']
+        self.games.save(game_id, game)
+        return game_id
+
+    def _game_record(self, game, result):
+        """Write the record of a game"""
+        players = {'red': 'Human', 'black': 'Human'}
+        if game['ai_enabled']:
+            settings = game['ai_settings']
+            players[game['ai_color']] = f"AI ({settings['skill'] or 'depth ' + str(settings['depth'])})"
+        headers = {
+            'Event': 'Xiangqi',
+            'Date': time.strftime('%Y.%m.%d'),
+            'Red': players['red'],
+            'Black': players['black'],
+            'GameId': game['id'],
+        }
+        moves = [(from_pos, to_pos) for from_pos, to_pos, _ in game['board'].move_history]
+        return export_game(moves, game['start_fen'], headers, result)
+
+    def _finished_record(self, game):
+        """Mark a game that has just ended as archived and get its record (None if not archiving)"""
+        if self.archive is None or game.get('archived'):
+            return None
+        result = game_result(game['board'], game.get('resigned'))
+        if result == '*':
+            return None
+        game['archived'] = True
+        return self._game_record(game, result)
+
     def delete_game(self, game_id):
-        """Delete a game session"""
-        if game_id in self.games:
-            del self.games[game_id]
-            return True
-        return False
+        """Delete a game session (archiving it first if it has unarchived moves)"""
+        self._stop_ponder(game_id)
+        if self.archive is not None:
+            game = self.get_game(game_id)
+            if game and not game.get('archived') and game['board'].move_history:
+                self.archive.append(self._game_record(game, game_result(game['board'], game.get('resigned'))))
+        return self.games.delete(game_id)
@@ -0,0 +1,227 @@
+"""
+Xiangqi Game Notation
+ICCS move coordinates and PGN-style game records
+
+ICCS names files a-i from red's left and ranks 0-9 from red's side, so the
+central cannon opening is "h2e2". A game record has PGN tag pairs followed
+by numbered moves:
+
+    [Format "ICCS"]
+    [Red "Human"]
+    [Black "AI"]
+    [Result "1-0"]
+
+    1. h2e2 h9g7 2. h0g2 i9h9 1-0
+"""
+
+from .board import Board, START_FEN
+
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+
+def square_to_iccs(pos):
+    """
+    Convert a board position to an ICCS square
+
+    Args:
+        pos: Tuple (row, col) with row 0 on black's side
+
+    Returns:
+        Square such as "e2"
+    """
+    row, col = pos
+    return f"{chr(ord('a') + col)}{9 - row}"
+
+
+def iccs_to_square(text):
+    """
+    Convert an ICCS square to a board position
+
+    Args:
+        text: Square such as "e2"
+
+    Returns:
+        Tuple (row, col)
+
+    Raises:
+        ValueError: If the square is malformed
+    """
+    if len(text) != 2 or not 'a' <= text[0].lower() <= 'i' or not text[1].isdigit():
+        raise ValueError(f"Invalid ICCS square: {text}")
+    return 9 - int(text[1]), ord(text[0].lower()) - ord('a')
+
+
+def move_to_iccs(move):
+    """Convert a move (from_pos, to_pos) to ICCS such as "h2e2" """
+    from_pos, to_pos = move
+    return square_to_iccs(from_pos) + square_to_iccs(to_pos)
+
+
+def iccs_to_move(text):
+    """
+    Convert an ICCS move to (from_pos, to_pos)
+
+    Accepts the "h2-e2" form as well.
+
+    Raises:
+        ValueError: If the move is malformed
+    """
+    text = text.replace('-', '')
+    if len(text) != 4:
+        raise ValueError(f"Invalid ICCS move: {text}")
+    return iccs_to_square(text[:2]), iccs_to_square(text[2:])
+
+
+def game_result(board, resigned=None):
+    """
+    Get the PGN result of a game
+
+    Args:
+        board: Current position
+        resigned: Color that resigned, if any
+
+    Returns:
+        "1-0" (red won), "0-1" (black won), "1/2-1/2" (draw) or "*" (in progress)
+    """
+    if resigned:
+        return '0-1' if resigned == 'red' else '1-0'
+    if board.is_checkmate():
+        return '0-1' if board.current_player == 'red' else '1-0'
+    if board.is_stalemate():
+        return '1/2-1/2'
+    return '*'
+
+
+def export_game(moves, start_fen=START_FEN, headers=None, result='*'):
+    """
+    Write a game record
+
+    Args:
+        moves: List of moves (from_pos, to_pos)
+        start_fen: Starting position (written as a FEN tag unless standard)
+        headers: Optional dictionary of extra tags (Event, Date, Red, Black, ...)
+        result: PGN result ("1-0", "0-1", "1/2-1/2" or "*")
+
+    Returns:
+        Record text ending with a newline
+    """
+    tags = {'Game': 'Chinese Chess', 'Format': 'ICCS'}
+    tags.update(headers or {})
+    tags['Result'] = result
+    if start_fen != START_FEN:
+        tags['FEN'] = start_fen
+
+    lines = [f'[{name} "{str(value).replace(chr(34), chr(39))}"]' for name, value in tags.items()]
+    lines.append('')
+
+    # Numbered move pairs; a game from a black-to-move FEN starts with "1..."
+    tokens = []
+    black_first = start_fen.split()[-1] == 'b'
+    for index, move in enumerate(moves):
+        ply = index + black_first
+        if ply % 2 == 0:
+            tokens.append(f'{ply // 2 + 1}.')
+        elif index == 0:
+            tokens.append('1...')
+        tokens.append(move_to_iccs(move))
+    tokens.append(result)
+
+    # Wrap the movetext at about 80 characters
+    line = ''
+    for token in tokens:
+        if line and len(line) + len(token) + 1 > 80:
+            lines.append(line)
+            line = token
+        else:
+            line = f'{line} {token}' if line else token
+    lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def parse_game(text, validate=True):
+    """
+    Read a game record
+
+    Args:
+        text: Record text (tag pairs and movetext)
+        validate: Replay the moves and reject illegal ones
+
+    Returns:
+        Dictionary with headers, start_fen, moves and result
+
+    Raises:
+        ValueError: If the record is malformed or (when validating) a move is illegal
+    """
+    headers = {}
+    movetext = []
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith(';'):
+            continue
+        if line.startswith('['):
+            name, _, value = line[1:].rstrip(']').partition(' ')
+            headers[name] = value.strip().strip('"')
+        else:
+            movetext.append(line)
+
+    fmt = headers.get('Format', 'ICCS')
+    if fmt != 'ICCS':
+        raise ValueError(f"Unsupported move format: {fmt}")
+
+    moves = []
+    result = headers.get('Result', '*')
+    for token in ' '.join(_strip_comments(' '.join(movetext))).split():
+        if token in RESULTS:
+            result = token
+            continue
+        token = token.rpartition('.')[2]  # Drop a move number ("1." or "1...")
+        if token:
+            moves.append(iccs_to_move(token))
+
+    start_fen = headers.get('FEN', START_FEN)
+    if validate:
+        replay(start_fen, moves)
+
+    return {'headers': headers, 'start_fen': start_fen, 'moves': moves, 'result': result}
+
+
+def replay(start_fen, moves):
+    """
+    Play moves from a position, checking that each one is legal
+
+    Args:
+        start_fen: Starting position
+        moves: List of moves (from_pos, to_pos)
+
+    Returns:
+        Board after the moves
+
+    Raises:
+        ValueError: If a move is illegal
+    """
+    board = Board.from_fen(start_fen)
+    for number, (from_pos, to_pos) in enumerate(moves, 1):
+        piece = board.get_piece(*from_pos)
+        if (not piece or piece.color != board.current_player
+                or to_pos not in board.get_valid_moves(*from_pos)):
+            raise ValueError(f"Illegal move {number}: {move_to_iccs((from_pos, to_pos))}")
+        board.move_piece(from_pos, to_pos)
+    return board
+
+
+def _strip_comments(movetext):
+    """Remove {...} comments from movetext"""
+    parts = []
+    depth = 0
+    start = 0
+    for index, char in enumerate(movetext):
+        if char == '{':
+            if depth == 0:
+                parts.append(movetext[start:index])
+            depth += 1
+        elif char == '}' and depth:
+            depth -= 1
+            start = index + 1
+    if depth == 0:
+        parts.append(movetext[start:])
+    return parts
@@ -3,6 +3,13 @@ Xiangqi Piece Representation
 Defines the Piece class and piece types
 """
 
+# FEN letters for each piece type (upper case for red, lower case for black)
+FEN_PIECE_CHARS = {
+    'general': 'k', 'advisor': 'a', 'elephant': 'b', 'horse': 'n',
+    'chariot': 'r', 'cannon': 'c', 'soldier': 'p'
+}
+FEN_CHAR_PIECES = {char: piece_type for piece_type, char in FEN_PIECE_CHARS.items()}
+
 
 class Piece:
     """Represents a Xiangqi piece"""
@@ -42,6 +49,20 @@ class Piece:
             'position': self.position
         }
 
+    def to_fen_char(self):
+        """Get the FEN letter for this piece"""
+        char = FEN_PIECE_CHARS[self.piece_type]
+        return char.upper() if self.color == 'red' else char
+
+    @classmethod
+    def from_fen_char(cls, char, position):
+        """Create piece from a FEN letter"""
+        piece_type = FEN_CHAR_PIECES.get(char.lower())
+        if piece_type is None:
+            raise ValueError(f"Invalid FEN piece letter: {char!r}")
+        color = 'red' if char.isupper() else 'black'
+        return cls(piece_type, color, position)
+
     @classmethod
     def from_dict(cls, data):
         """Create piece from dictionary"""
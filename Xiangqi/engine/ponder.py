@@ -0,0 +1,73 @@
+"""
+Xiangqi Pondering
+Searches on the opponent's time, assuming they play the expected reply
+"""
+
+import threading
+
+from .ai_player import AIPlayer
+
+
+class Ponderer:
+    """
+    Background search of the position after the expected opponent reply
+
+    The search uses its own AIPlayer with the same settings and transposition
+    table as the game's AI. If the opponent plays the expected move, its
+    result is the AI's answer; otherwise the search is stopped and the
+    entries it stored in the table still speed up the real search.
+    """
+
+    def __init__(self, ai, board, expected_move):
+        """
+        Initialize the ponder search (call start() to run it)
+
+        Args:
+            ai: The game's AIPlayer (its transposition table is shared)
+            board: Position after the AI's move
+            expected_move: Expected opponent reply (from_pos, to_pos)
+        """
+        self.expected_move = expected_move
+        self.board = board.copy()
+        self.board.move_piece(*expected_move)
+        self.fen = self.board.to_fen()
+        self.ai = AIPlayer(depth=ai.depth, color=ai.color, tt=ai.tt, time_limit=ai.time_limit,
+                           max_nodes=ai.max_nodes, noise=ai.noise, multipv=ai.multipv)
+        self.result = None
+        self._thread = threading.Thread(target=self._run, name='xiangqi-ponder', daemon=True)
+
+    def start(self):
+        """Start searching in a background thread"""
+        self._thread.start()
+
+    def matches(self, board):
+        """Check whether a position is the one being pondered"""
+        return board.to_fen() == self.fen
+
+    def wait(self):
+        """
+        Wait for the search to finish
+
+        Returns:
+            Tuple (move, stats) as returned by AIPlayer.search()
+        """
+        self._thread.join()
+        return self.result
+
+    def stop(self, wait=True):
+        """
+        Stop the search
+
+        Args:
+            wait: Wait for the thread to exit
+        """
+        self.ai.stop()
+        if wait:
+            self._thread.join()
+
+    def is_running(self):
+        """Check whether the search is still running"""
+        return self._thread.is_alive()
+
+    def _run(self):
+        self.result = self.ai.search(self.board)
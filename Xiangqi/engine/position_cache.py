@@ -0,0 +1,203 @@
+"""
+Xiangqi Position Cache
+AI results shared between games, with an optional SQLite tier
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .transposition import zobrist_key
+
+
+def settings_key(settings):
+    """
+    Get the part of the search settings that decides the AI's move
+
+    Args:
+        settings: Settings from skill_settings() after apply_limits()
+
+    Returns:
+        String identifying the settings, or None if the search is randomized
+        (noisy levels must not replay the same move in every game)
+    """
+    if settings.get('noise') or settings.get('multipv', 1) > 1:
+        return None
+    return f"d{settings['depth']}:n{settings['max_nodes']}:t{settings['time_limit']}"
+
+
+class PositionCache:
+    """
+    Bounded LRU map from (position, side to move, settings) to the AI's move
+
+    Games started from the usual openings reach the same positions, so a move
+    searched in one game answers the same position in all others. The most
+    recently used `capacity` results are kept in memory; with a database file
+    every result is also written to SQLite, where it survives restarts and is
+    shared with the other worker processes.
+    """
+
+    # Stores between trims of the database to `disk_capacity` rows
+    TRIM_INTERVAL = 1000
+
+    def __init__(self, capacity=100000, path=None, disk_capacity=1000000):
+        """
+        Initialize the cache
+
+        Args:
+            capacity: Maximum number of results kept in memory
+            path: SQLite database file (None for memory only)
+            disk_capacity: Maximum number of results kept in the database
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+
+        self.capacity = capacity
+        self.path = path
+        self.disk_capacity = disk_capacity
+        self._entries = OrderedDict()  # key -> (move, score), oldest first
+        self._lock = threading.Lock()
+        self._stores_since_trim = 0
+
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS positions ('
+                ' key TEXT PRIMARY KEY,'
+                ' move TEXT NOT NULL,'
+                ' score REAL,'
+                ' updated_at REAL NOT NULL)'
+            )
+            self._db.commit()
+
+        # Counters for monitoring
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @staticmethod
+    def make_key(board, settings_id):
+        """
+        Build the cache key of a position
+
+        Args:
+            board: Position the AI moves in
+            settings_id: Value of settings_key()
+
+        Returns:
+            Key string
+        """
+        return f"{zobrist_key(board):016x}:{board.current_player}:{settings_id}"
+
+    def get(self, key):
+        """
+        Look up the AI's move in a position
+
+        Args:
+            key: Key from make_key()
+
+        Returns:
+            Tuple (move, score) or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry
+
+            if self._db is not None:
+                row = self._db.execute('SELECT move, score FROM positions WHERE key = ?', (key,)).fetchone()
+                if row is not None:
+                    from_pos, to_pos = json.loads(row[0])
+                    entry = ((tuple(from_pos), tuple(to_pos)), row[1])
+                    self._admit(key, entry)
+                    self.disk_hits += 1
+                    return entry
+
+            self.misses += 1
+            return None
+
+    def put(self, key, move, score=None):
+        """
+        Store the AI's move in a position
+
+        Args:
+            key: Key from make_key()
+            move: Tuple (from_pos, to_pos)
+            score: Score of the move (for information)
+        """
+        entry = ((tuple(move[0]), tuple(move[1])), score)
+        with self._lock:
+            self._admit(key, entry)
+            self.stores += 1
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO positions (key, move, score, updated_at) VALUES (?, ?, ?, ?)',
+                    (key, json.dumps(entry[0]), score, time.time())
+                )
+                self._db.commit()
+                self._stores_since_trim += 1
+                if self._stores_since_trim >= self.TRIM_INTERVAL:
+                    self._trim_disk()
+
+    def clear(self):
+        """Remove all results from memory and disk"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute('DELETE FROM positions')
+                self._db.commit()
+
+    def hit_rate(self):
+        """Fraction of lookups answered from memory or disk"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        if not lookups:
+            return 0.0
+        return (self.memory_hits + self.disk_hits) / lookups
+
+    def get_gauges(self):
+        """
+        Get monitoring values
+
+        Returns:
+            List of (name, value, help) tuples
+        """
+        return [
+            ('xiangqi_position_cache_entries', len(self._entries), 'AI results held in memory'),
+            ('xiangqi_position_cache_memory_hits', self.memory_hits, 'AI moves answered from memory'),
+            ('xiangqi_position_cache_disk_hits', self.disk_hits, 'AI moves answered from disk'),
+            ('xiangqi_position_cache_misses', self.misses, 'AI moves that needed a search'),
+            ('xiangqi_position_cache_hit_rate', self.hit_rate(), 'Fraction of AI moves answered from the cache'),
+        ]
+
+    def close(self):
+        """Close the database"""
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _admit(self, key, entry):
+        """Add an entry to memory, evicting the least recently used one"""
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.capacity:
+            self._entries.popitem(last=False)
+
+    def _trim_disk(self):
+        """Delete the oldest results beyond disk_capacity"""
+        self._stores_since_trim = 0
+        self._db.execute(
+            'DELETE FROM positions WHERE key IN ('
+            ' SELECT key FROM positions ORDER BY updated_at DESC LIMIT -1 OFFSET ?)',
+            (self.disk_capacity,)
+        )
+        self._db.commit()
+
+    def __len__(self):
+        return len(self._entries)
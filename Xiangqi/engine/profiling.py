@@ -0,0 +1,236 @@
+"""
+Xiangqi Profiling Hooks
+Opt-in counters, timers and per-search profiles for the engine hot paths
+
+Profiling is off by default. Enable it with the XIANGQI_PROFILE=1 environment
+variable or by calling enable(). Set XIANGQI_PROFILE_DIR (or pass output_dir)
+to write a cProfile .pstats file and a flamegraph-compatible .collapsed file
+for every AI search.
+
+While disabled the engine classes are left untouched, so the hot paths run
+their original code without any extra cost.
+"""
+
+import cProfile
+import functools
+import itertools
+import os
+import threading
+import time
+
+# (module, class name, method name) of the instrumented hot paths
+HOOKED_METHODS = [
+    ('board', 'Board', 'get_valid_moves'),
+    ('board', 'Board', '_is_in_check'),
+    ('board', 'Board', '_is_legal_move'),
+    ('ai_player', 'AIPlayer', '_minimax'),
+    ('ai_player', 'AIPlayer', '_evaluate_board'),
+]
+
+_enabled = False
+_output_dir = None
+_originals = {}  # (class, method name) -> original function
+_lock = threading.Lock()
+_local = threading.local()
+_search_ids = itertools.count(1)
+
+# Totals over all profiled calls: method name -> [calls, seconds]
+_counters = {}
+
+
+class _Recorder:
+    """Collects timings for one profiled search"""
+
+    def __init__(self):
+        self.counters = {}   # method name -> [calls, seconds]
+        self.collapsed = {}  # 'frame;frame;frame' -> self seconds
+        self.stack = []      # [name, child seconds] frames of the running calls
+
+
+class _NullContext:
+    """Context manager that does nothing (used while profiling is disabled)"""
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_CONTEXT = _NullContext()
+
+
+def is_enabled():
+    """Check whether profiling hooks are installed"""
+    return _enabled
+
+
+def enable(output_dir=None):
+    """
+    Install the profiling hooks
+
+    Args:
+        output_dir: Optional directory for per-search .pstats and .collapsed files
+    """
+    global _enabled, _output_dir
+    from . import board, ai_player
+
+    modules = {'board': board, 'ai_player': ai_player}
+    with _lock:
+        _output_dir = output_dir
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        if _enabled:
+            return
+
+        for module_name, class_name, method_name in HOOKED_METHODS:
+            cls = getattr(modules[module_name], class_name)
+            original = cls.__dict__[method_name]
+            _originals[(cls, method_name)] = original
+            setattr(cls, method_name, _make_hook(method_name, original))
+        _enabled = True
+
+
+def disable():
+    """Remove the profiling hooks and restore the original methods"""
+    global _enabled
+    with _lock:
+        for (cls, method_name), original in _originals.items():
+            setattr(cls, method_name, original)
+        _originals.clear()
+        _enabled = False
+
+
+def enable_from_env():
+    """Enable profiling if the XIANGQI_PROFILE environment variable is set"""
+    if os.environ.get('XIANGQI_PROFILE', '').lower() in ('1', 'true', 'yes', 'on'):
+        enable(output_dir=os.environ.get('XIANGQI_PROFILE_DIR') or None)
+
+
+def get_counters():
+    """
+    Get call counts and cumulative time of the hooked methods
+
+    Time of recursive calls (such as _minimax) is counted at every level,
+    use the collapsed-stack files for self time.
+
+    Returns:
+        Dictionary mapping method name -> {'calls': int, 'seconds': float}
+    """
+    with _lock:
+        return {name: {'calls': calls, 'seconds': seconds}
+                for name, (calls, seconds) in _counters.items()}
+
+
+def reset():
+    """Clear the accumulated counters"""
+    with _lock:
+        _counters.clear()
+
+
+def profile_search(label='search'):
+    """
+    Profile one AI search
+
+    Returns a context manager. While profiling is disabled it does nothing.
+    Otherwise it records hook timings for the search, merges them into the
+    global counters and, if an output directory is configured, writes
+    <label>-<pid>-<n>.pstats and .collapsed files.
+
+    Args:
+        label: Name of the root frame and prefix of the output files
+    """
+    if not _enabled:
+        return _NULL_CONTEXT
+    return _SearchProfile(label)
+
+
+class _SearchProfile:
+    """Context manager behind profile_search() when profiling is enabled"""
+
+    def __init__(self, label):
+        self.label = label
+        self.recorder = _Recorder()
+        self.profiler = cProfile.Profile() if _output_dir else None
+        self.previous = None
+        self.start = 0.0
+
+    def __enter__(self):
+        self.previous = getattr(_local, 'recorder', None)
+        _local.recorder = self.recorder
+        self.recorder.stack.append([self.label, 0.0])
+        if self.profiler:
+            self.profiler.enable()
+        self.start = time.perf_counter()
+        return self.recorder
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        if self.profiler:
+            self.profiler.disable()
+
+        recorder = self.recorder
+        _, child_time = recorder.stack.pop()
+        recorder.collapsed[self.label] = recorder.collapsed.get(self.label, 0.0) + elapsed - child_time
+        _local.recorder = self.previous
+
+        with _lock:
+            for name, (calls, seconds) in recorder.counters.items():
+                totals = _counters.setdefault(name, [0, 0.0])
+                totals[0] += calls
+                totals[1] += seconds
+            output_dir = _output_dir
+
+        if output_dir:
+            self._write(output_dir)
+        return False
+
+    def _write(self, output_dir):
+        """Write the .pstats and .collapsed files for this search"""
+        base = os.path.join(output_dir, f"{self.label}-{os.getpid()}-{next(_search_ids)}")
+        self.profiler.dump_stats(base + '.pstats')
+        with open(base + '.collapsed', 'w', encoding='utf-8') as f:
+            for stack, seconds in sorted(self.recorder.collapsed.items()):
+                # Collapsed-stack format: frames separated by ';' and a sample count (microseconds)
+                f.write(f"{stack} {max(1, int(seconds * 1e6))}\n")
+
+
+def _make_hook(name, func):
+    """Wrap a method with a counter and timer"""
+
+    @functools.wraps(func)
+    def hook(*args, **kwargs):
+        recorder = getattr(_local, 'recorder', None)
+        if recorder is None:
+            # Outside a profiled search: only count calls and time
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with _lock:
+                    totals = _counters.setdefault(name, [0, 0.0])
+                    totals[0] += 1
+                    totals[1] += elapsed
+
+        stack = recorder.stack
+        stack.append([name, 0.0])
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            child_time = stack[-1][1]
+            path = ';'.join(frame[0] for frame in stack)
+            stack.pop()
+            stack[-1][1] += elapsed
+
+            collapsed = recorder.collapsed
+            collapsed[path] = collapsed.get(path, 0.0) + elapsed - child_time
+            counter = recorder.counters.get(name)
+            if counter is None:
+                counter = recorder.counters[name] = [0, 0.0]
+            counter[0] += 1
+            counter[1] += elapsed
+
+    return hook
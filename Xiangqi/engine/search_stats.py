@@ -0,0 +1,129 @@
+"""
+Xiangqi Search Statistics
+Per-search counters for the AI and server-wide aggregation for monitoring
+"""
+
+import threading
+
+
+class SearchStats:
+    """Counters collected during a single AI search"""
+
+    def __init__(self):
+        """Initialize all counters to zero"""
+        self.nodes = 0               # Positions visited by the main search
+        self.qnodes = 0              # Positions visited by quiescence search
+        self.max_depth = 0           # Deepest ply reached
+        self.beta_cutoffs = 0        # Alpha-beta cutoffs
+        self.first_move_cutoffs = 0  # Cutoffs produced by the first move searched
+        self.tt_probes = 0           # Transposition table lookups
+        self.tt_hits = 0             # Lookups that found a usable entry
+        self.movegen_time = 0.0      # Seconds spent generating moves
+        self.eval_time = 0.0         # Seconds spent evaluating positions
+        self.elapsed = 0.0           # Wall clock seconds for the whole search
+
+    @property
+    def nps(self):
+        """Nodes per second over the whole search"""
+        if self.elapsed <= 0:
+            return 0.0
+        return (self.nodes + self.qnodes) / self.elapsed
+
+    @property
+    def first_move_cutoff_rate(self):
+        """Fraction of cutoffs produced by the first move (a move ordering quality measure)"""
+        if not self.beta_cutoffs:
+            return 0.0
+        return self.first_move_cutoffs / self.beta_cutoffs
+
+    @property
+    def tt_hit_rate(self):
+        """Fraction of transposition table lookups that hit"""
+        if not self.tt_probes:
+            return 0.0
+        return self.tt_hits / self.tt_probes
+
+    def to_dict(self):
+        """Convert statistics to dictionary for serialization"""
+        return {
+            'nodes': self.nodes,
+            'qnodes': self.qnodes,
+            'nps': round(self.nps),
+            'max_depth': self.max_depth,
+            'beta_cutoffs': self.beta_cutoffs,
+            'first_move_cutoff_rate': round(self.first_move_cutoff_rate, 4),
+            'tt_probes': self.tt_probes,
+            'tt_hits': self.tt_hits,
+            'tt_hit_rate': round(self.tt_hit_rate, 4),
+            'movegen_time': round(self.movegen_time, 6),
+            'eval_time': round(self.eval_time, 6),
+            'elapsed': round(self.elapsed, 6),
+        }
+
+
+class SearchMetrics:
+    """Thread-safe running totals over many searches, exportable in Prometheus text format"""
+
+    # (metric name, SearchStats attribute, help text)
+    COUNTERS = [
+        ('xiangqi_ai_nodes_total', 'nodes', 'Positions visited by the main search'),
+        ('xiangqi_ai_qnodes_total', 'qnodes', 'Positions visited by quiescence search'),
+        ('xiangqi_ai_beta_cutoffs_total', 'beta_cutoffs', 'Alpha-beta cutoffs'),
+        ('xiangqi_ai_first_move_cutoffs_total', 'first_move_cutoffs', 'Cutoffs produced by the first move searched'),
+        ('xiangqi_ai_tt_probes_total', 'tt_probes', 'Transposition table lookups'),
+        ('xiangqi_ai_tt_hits_total', 'tt_hits', 'Transposition table hits'),
+        ('xiangqi_ai_movegen_seconds_total', 'movegen_time', 'Seconds spent generating moves'),
+        ('xiangqi_ai_eval_seconds_total', 'eval_time', 'Seconds spent evaluating positions'),
+        ('xiangqi_ai_search_seconds_total', 'elapsed', 'Wall clock seconds spent searching'),
+    ]
+
+    def __init__(self):
+        """Initialize empty totals"""
+        self._lock = threading.Lock()
+        self.searches = 0
+        self.totals = {attr: 0 for _, attr, _ in self.COUNTERS}
+        self.max_elapsed = 0.0
+
+    def record(self, stats):
+        """
+        Add a finished search to the totals
+
+        Args:
+            stats: SearchStats of the search
+        """
+        with self._lock:
+            self.searches += 1
+            for _, attr, _ in self.COUNTERS:
+                self.totals[attr] += getattr(stats, attr)
+            self.max_elapsed = max(self.max_elapsed, stats.elapsed)
+
+    def to_prometheus(self, gauges=None):
+        """
+        Render the totals in Prometheus text exposition format
+
+        Args:
+            gauges: Optional list of extra (name, value, help) gauges to include
+
+        Returns:
+            String in Prometheus text format
+        """
+        with self._lock:
+            lines = [
+                '# HELP xiangqi_ai_searches_total Completed AI searches',
+                '# TYPE xiangqi_ai_searches_total counter',
+                f'xiangqi_ai_searches_total {self.searches}',
+            ]
+            for name, attr, help_text in self.COUNTERS:
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                lines.append(f'{name} {self.totals[attr]}')
+            lines.append('# HELP xiangqi_ai_search_seconds_max Longest single AI search')
+            lines.append('# TYPE xiangqi_ai_search_seconds_max gauge')
+            lines.append(f'xiangqi_ai_search_seconds_max {self.max_elapsed}')
+
+        for name, value, help_text in gauges or []:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            lines.append(f'{name} {value}')
+
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,303 @@
+"""
+Xiangqi Session Store
+Keeps recently used games in memory and spills idle games to SQLite
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class SessionStore:
+    """
+    Bounded LRU cache of live game sessions backed by SQLite
+
+    At most `capacity` games are kept in memory as full objects. The least
+    recently used game is written to SQLite when the limit is reached, and games
+    idle for longer than `idle_ttl` seconds are spilled as well. A spilled game
+    is rehydrated transparently the next time it is requested.
+
+    In shared mode several processes can use the same database file. Every
+    change is written through with a version number, cached games are
+    reloaded when another process has updated them, and save() detects
+    conflicting concurrent updates.
+    """
+
+    # Seconds between automatic purges of expired games on disk
+    PURGE_INTERVAL = 3600
+
+    def __init__(self, serialize, deserialize, capacity=1024, idle_ttl=None, path=None, retention=None,
+                 shared=False, on_evict=None):
+        """
+        Initialize the store
+
+        Args:
+            serialize: Callable turning a game into a JSON-serializable dictionary
+            deserialize: Callable turning such a dictionary back into a game
+            capacity: Maximum number of games kept in memory
+            idle_ttl: Seconds after which an unused game is spilled (None to disable)
+            path: SQLite database file (None for a private in-memory database)
+            retention: Seconds after which untouched games on disk are deleted (None to keep them)
+            shared: Write every change through so other processes using the same file see it
+            on_evict: Optional callable receiving the ID of a game that leaves memory other than by delete()
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if shared and not path:
+            raise ValueError("shared mode needs a database file")
+
+        self.serialize = serialize
+        self.deserialize = deserialize
+        self.capacity = capacity
+        self.idle_ttl = idle_ttl
+        self.path = path or ':memory:'
+        self.retention = retention
+        self.shared = shared
+        self.on_evict = on_evict
+        self._last_purge = time.monotonic()
+
+        self._resident = OrderedDict()  # game_id -> [game, last access time, version], oldest first
+        self._lock = threading.RLock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            ' game_id TEXT PRIMARY KEY,'
+            ' data TEXT NOT NULL,'
+            ' updated_at REAL NOT NULL,'
+            ' version INTEGER NOT NULL DEFAULT 0)'
+        )
+        columns = [row[1] for row in self._db.execute('PRAGMA table_info(sessions)')]
+        if 'version' not in columns:
+            self._db.execute('ALTER TABLE sessions ADD COLUMN version INTEGER NOT NULL DEFAULT 0')
+        self._db.commit()
+
+        # Counters for monitoring
+        self.spills = 0
+        self.loads = 0
+
+    def get(self, game_id):
+        """
+        Get a game, loading it from disk if it was spilled
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            The game or None if unknown
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._resident.get(game_id)
+            if entry is not None and self.shared:
+                row = self._db.execute(
+                    'SELECT version FROM sessions WHERE game_id = ?', (game_id,)
+                ).fetchone()
+                if row is None or row[0] != entry[2]:
+                    # Deleted or updated by another process
+                    del self._resident[game_id]
+                    self._evicted(game_id)
+                    entry = None
+
+            if entry is not None:
+                entry[1] = now
+                self._resident.move_to_end(game_id)
+                self._expire_idle(now)
+                return entry[0]
+
+            row = self._db.execute(
+                'SELECT data, version FROM sessions WHERE game_id = ?', (game_id,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            game = self.deserialize(json.loads(row[0]))
+            self.loads += 1
+            self._admit(game_id, game, now, row[1])
+            return game
+
+    def put(self, game_id, game):
+        """
+        Add or replace a game
+
+        Args:
+            game_id: Game ID
+            game: Game to store
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.retention is not None and now - self._last_purge >= self.PURGE_INTERVAL:
+                self._last_purge = now
+                self.purge(self.retention)
+            self._resident.pop(game_id, None)
+            version = 0
+            if self.shared:
+                version = self._write(game_id, game)
+            self._admit(game_id, game, now, version)
+
+    def save(self, game_id, game):
+        """
+        Record that a game was changed
+
+        In shared mode the game is written through so other processes see the
+        change. If another process updated the game since it was loaded, the
+        local copy is dropped and False is returned.
+
+        Otherwise a game that was spilled (or spilled and reloaded as another
+        object) while the caller held it is admitted again, so the change is
+        not lost. A game deleted in the meantime stays deleted.
+
+        Args:
+            game_id: Game ID
+            game: The changed game
+
+        Returns:
+            True if the change was stored
+        """
+        with self._lock:
+            entry = self._resident.get(game_id)
+            if not self.shared:
+                if entry is not None and entry[0] is game:
+                    return True
+                if entry is None and self._db.execute(
+                        'SELECT 1 FROM sessions WHERE game_id = ?', (game_id,)).fetchone() is None:
+                    return False
+                self._resident.pop(game_id, None)
+                self._admit(game_id, game, time.monotonic())
+                return True
+
+            if entry is None or entry[0] is not game:
+                return False
+            cursor = self._db.execute(
+                'UPDATE sessions SET data = ?, updated_at = ?, version = version + 1'
+                ' WHERE game_id = ? AND version = ?',
+                (json.dumps(self.serialize(game)), time.time(), game_id, entry[2])
+            )
+            self._db.commit()
+            if cursor.rowcount == 0:
+                del self._resident[game_id]
+                self._evicted(game_id)
+                return False
+            entry[2] += 1
+            return True
+
+    def delete(self, game_id):
+        """
+        Delete a game from memory and disk
+
+        Args:
+            game_id: Game ID
+
+        Returns:
+            True if the game existed
+        """
+        with self._lock:
+            resident = self._resident.pop(game_id, None) is not None
+            cursor = self._db.execute('DELETE FROM sessions WHERE game_id = ?', (game_id,))
+            self._db.commit()
+            return resident or cursor.rowcount > 0
+
+    def flush(self):
+        """Write every resident game to disk (they stay in memory)"""
+        with self._lock:
+            for game_id, entry in self._resident.items():
+                entry[2] = self._write(game_id, entry[0])
+            self._db.commit()
+
+    def purge(self, older_than):
+        """
+        Permanently delete spilled games not touched for a while
+
+        Args:
+            older_than: Age in seconds
+
+        Returns:
+            Number of deleted games
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                'DELETE FROM sessions WHERE updated_at < ?', (time.time() - older_than,)
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def __contains__(self, game_id):
+        with self._lock:
+            if game_id in self._resident:
+                return True
+            return self._db.execute(
+                'SELECT 1 FROM sessions WHERE game_id = ?', (game_id,)
+            ).fetchone() is not None
+
+    def resident_count(self):
+        """Number of games currently held in memory"""
+        with self._lock:
+            return len(self._resident)
+
+    def spilled_count(self):
+        """Number of games stored on disk (including resident games written by flush)"""
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM sessions').fetchone()[0]
+
+    def close(self):
+        """Flush resident games and close the database"""
+        with self._lock:
+            self.flush()
+            self._db.close()
+
+    def _admit(self, game_id, game, now, version=0):
+        """Insert a game as most recently used and enforce the limits"""
+        self._resident[game_id] = [game, now, version]
+        self._expire_idle(now)
+        while len(self._resident) > self.capacity:
+            self._spill(*self._resident.popitem(last=False))
+        self._db.commit()
+
+    def _expire_idle(self, now):
+        """Spill games that have been idle for longer than idle_ttl (never the most recent one)"""
+        if self.idle_ttl is None:
+            return
+        spilled = False
+        while len(self._resident) > 1:
+            game_id, entry = next(iter(self._resident.items()))
+            if now - entry[1] < self.idle_ttl:
+                break
+            self._resident.popitem(last=False)
+            self._spill(game_id, entry)
+            spilled = True
+        if spilled:
+            self._db.commit()
+
+    def _spill(self, game_id, entry):
+        """Write an evicted game to disk"""
+        if not self.shared:
+            # In shared mode every change is already on disk
+            self._write(game_id, entry[0])
+        self.spills += 1
+        self._evicted(game_id)
+
+    def _evicted(self, game_id):
+        """Tell the owner that a game left memory"""
+        if self.on_evict is not None:
+            self.on_evict(game_id)
+
+    def _write(self, game_id, game):
+        """
+        Serialize a game into the sessions table, bumping its version
+
+        Returns:
+            The new version number
+        """
+        self._db.execute(
+            'INSERT INTO sessions (game_id, data, updated_at, version) VALUES (?, ?, ?, 1)'
+            ' ON CONFLICT(game_id) DO UPDATE SET data = excluded.data,'
+            ' updated_at = excluded.updated_at, version = sessions.version + 1',
+            (game_id, json.dumps(self.serialize(game)), time.time())
+        )
+        if self.shared:
+            self._db.commit()
+        return self._db.execute(
+            'SELECT version FROM sessions WHERE game_id = ?', (game_id,)
+        ).fetchone()[0]
@@ -0,0 +1,111 @@
+"""
+Xiangqi Skill Levels
+Named AI strengths defined by search budgets and controlled randomness
+
+A level limits the search by depth, nodes and time, so a weaker AI is also
+a cheaper one. Weaker levels choose among their best moves with random
+score noise instead of always playing the best one.
+"""
+
+from .ai_player import AIPlayer
+
+# Rough search speed (nodes per second) and branching factor used for cost estimates
+ESTIMATED_NPS = 1000
+ESTIMATED_BRANCHING = 20
+
+# Level name -> search settings
+SKILL_LEVELS = {
+    'beginner': {'depth': 2, 'max_nodes': 300, 'time_limit': 0.5, 'noise': 60, 'multipv': 4},
+    'easy': {'depth': 2, 'max_nodes': 2000, 'time_limit': 1.0, 'noise': 25, 'multipv': 3},
+    'medium': {'depth': 3, 'max_nodes': 10000, 'time_limit': 2.0, 'noise': 8, 'multipv': 2},
+    'hard': {'depth': 4, 'max_nodes': 50000, 'time_limit': 5.0, 'noise': 0, 'multipv': 1},
+    'expert': {'depth': 6, 'max_nodes': 250000, 'time_limit': 10.0, 'noise': 0, 'multipv': 1},
+}
+
+
+def skill_settings(skill=None, depth=3):
+    """
+    Get the search settings of a skill level, or of a plain fixed depth
+
+    Args:
+        skill: Level name from SKILL_LEVELS (None for a fixed-depth search)
+        depth: Search depth used when skill is None
+
+    Returns:
+        Settings dictionary (skill, depth, max_nodes, time_limit, noise, multipv)
+
+    Raises:
+        ValueError: If the level is unknown
+    """
+    if skill is None:
+        return {'skill': None, 'depth': depth, 'max_nodes': None, 'time_limit': None, 'noise': 0, 'multipv': 1}
+    if skill not in SKILL_LEVELS:
+        raise ValueError(f"Unknown skill level: {skill} (choose from {', '.join(SKILL_LEVELS)})")
+    settings = dict(SKILL_LEVELS[skill])
+    settings['skill'] = skill
+    return settings
+
+
+def apply_limits(settings, max_depth=None, max_nodes=None, max_time=None):
+    """
+    Clamp search settings to server-wide limits
+
+    A limit also applies to settings that leave it open, so a plain depth
+    search gets a node and time budget when the server sets one.
+
+    Args:
+        settings: Settings from skill_settings()
+        max_depth: Maximum depth (None for no limit)
+        max_nodes: Maximum nodes per search (None for no limit)
+        max_time: Maximum seconds per search (None for no limit)
+
+    Returns:
+        New settings dictionary
+    """
+    settings = dict(settings)
+    if max_depth is not None:
+        settings['depth'] = min(settings['depth'], max_depth)
+    if max_nodes is not None:
+        settings['max_nodes'] = min(settings['max_nodes'] or max_nodes, max_nodes)
+    if max_time is not None:
+        settings['time_limit'] = min(settings['time_limit'] or max_time, max_time)
+    return settings
+
+
+def estimated_search_time(settings):
+    """
+    Estimate the seconds a search with these settings takes (for scheduling)
+
+    Args:
+        settings: Settings from skill_settings() or apply_limits()
+
+    Returns:
+        Estimated seconds (the smallest of the depth, node and time budgets)
+    """
+    nodes = ESTIMATED_BRANCHING ** settings['depth']
+    if settings['max_nodes'] is not None:
+        nodes = min(nodes, settings['max_nodes'])
+    seconds = nodes / ESTIMATED_NPS
+    if settings['time_limit'] is not None:
+        seconds = min(seconds, settings['time_limit'])
+    return seconds
+
+
+def player_kwargs(settings):
+    """Get the AIPlayer keyword arguments of a settings dictionary"""
+    return {key: settings[key] for key in ('depth', 'max_nodes', 'time_limit', 'noise', 'multipv')}
+
+
+def create_player(settings, color, tt=None):
+    """
+    Create an AIPlayer with the given settings
+
+    Args:
+        settings: Settings from skill_settings() or apply_limits()
+        color: Color the AI plays
+        tt: Optional TranspositionTable
+
+    Returns:
+        AIPlayer
+    """
+    return AIPlayer(color=color, tt=tt, **player_kwargs(settings))
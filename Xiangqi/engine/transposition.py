@@ -0,0 +1,111 @@
+"""
+Xiangqi Transposition Table
+Zobrist hashing of positions and a bounded table of search results
+"""
+
+import random
+import threading
+from collections import OrderedDict
+
+from .pieces import FEN_PIECE_CHARS
+
+# Bound types of stored scores
+EXACT = 0
+LOWER = 1  # Score is at least the stored value (search failed high)
+UPPER = 2  # Score is at most the stored value (search failed low)
+
+# Fixed seed so keys are the same in every process
+_random = random.Random(0x58514E47)
+
+# (piece type, color) -> 90 random keys, one per square
+PIECE_KEYS = {
+    (piece_type, color): [_random.getrandbits(64) for _ in range(90)]
+    for piece_type in FEN_PIECE_CHARS
+    for color in ('red', 'black')
+}
+BLACK_TO_MOVE_KEY = _random.getrandbits(64)
+
+# Mixed in by the search so scores from different points of view never mix
+BLACK_VIEW_KEY = _random.getrandbits(64)
+
+
+def zobrist_key(board):
+    """
+    Compute the Zobrist hash of a position
+
+    Args:
+        board: Board to hash
+
+    Returns:
+        64-bit integer identifying the placement of pieces and the side to move
+    """
+    key = BLACK_TO_MOVE_KEY if board.current_player == 'black' else 0
+    for row in range(10):
+        for col in range(9):
+            piece = board.board[row][col]
+            if piece:
+                key ^= PIECE_KEYS[(piece.piece_type, piece.color)][row * 9 + col]
+    return key
+
+
+class TranspositionTable:
+    """
+    Bounded map from position key to (depth, score, bound, best move)
+
+    The least recently stored entries are dropped when the table is full. A
+    table can be shared by several AIPlayer instances in the same process,
+    so lookups and updates are locked.
+    """
+
+    def __init__(self, capacity=200000):
+        """
+        Initialize the table
+
+        Args:
+            capacity: Maximum number of stored positions
+        """
+        self.capacity = capacity
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def probe(self, key):
+        """
+        Look up a position
+
+        Args:
+            key: Position key
+
+        Returns:
+            Tuple (depth, score, bound, best_move) or None
+        """
+        with self._lock:
+            return self._entries.get(key)
+
+    def store(self, key, depth, score, bound, best_move):
+        """
+        Store a search result, keeping a deeper result for the same position
+
+        Args:
+            key: Position key
+            depth: Remaining depth the position was searched to
+            score: Score found
+            bound: EXACT, LOWER or UPPER
+            best_move: Best move found or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > depth:
+                    return
+                self._entries.move_to_end(key)
+            self._entries[key] = (depth, score, bound, best_move)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
 """
 Generate Xiangqi piece images
-Creates PNG images for all pieces with traditional styling
+Creates PNG images for all pieces with traditional styling, and a texture
+atlas holding every piece at several sizes (loaded by the pygame client)
 """
 
+import json
 import pygame
 import os
 
@@ -14,6 +16,10 @@ pygame.init()
 PIECE_SIZE = 80
 PIECE_RADIUS = 35
 
+# Sizes rendered into the atlas (one row per size)
+ATLAS_SIZES = (40, 60, 80, 120)
+ATLAS_NAME = "pieces_atlas"
+
 # Colors
 RED_COLOR = (200, 0, 0)
 BLACK_COLOR = (0, 0, 0)
@@ -62,36 +68,82 @@ def find_chinese_font():
     return pygame.font.match_font('notosanscjk,notoserifcjk,wqy,droid')
 
 
-def create_piece_image(piece_char, color_rgb, filename, font):
-    """Create a single piece image"""
+def draw_piece(piece_char, color_rgb, font, size=PIECE_SIZE):
+    """Draw a single piece on a transparent surface of the given size"""
+    scale = size / PIECE_SIZE
+    center = (size // 2, size // 2)
+    radius = round(PIECE_RADIUS * scale)
+
     # Create surface with transparency
-    surface = pygame.Surface((PIECE_SIZE, PIECE_SIZE), pygame.SRCALPHA)
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
 
     # Draw piece background circle (lighter color)
-    pygame.draw.circle(surface, CIRCLE_BG,
-                      (PIECE_SIZE // 2, PIECE_SIZE // 2),
-                      PIECE_RADIUS)
+    pygame.draw.circle(surface, CIRCLE_BG, center, radius)
 
     # Draw piece border circle
-    pygame.draw.circle(surface, color_rgb,
-                      (PIECE_SIZE // 2, PIECE_SIZE // 2),
-                      PIECE_RADIUS, 3)
+    pygame.draw.circle(surface, color_rgb, center, radius, max(1, round(3 * scale)))
 
     # Draw inner circle (for decorative effect)
-    pygame.draw.circle(surface, color_rgb,
-                      (PIECE_SIZE // 2, PIECE_SIZE // 2),
-                      PIECE_RADIUS - 5, 1)
+    pygame.draw.circle(surface, color_rgb, center, radius - round(5 * scale), 1)
 
     # Draw piece character
     text = font.render(piece_char, True, color_rgb)
-    text_rect = text.get_rect(center=(PIECE_SIZE // 2, PIECE_SIZE // 2))
+    text_rect = text.get_rect(center=center)
     surface.blit(text, text_rect)
+    return surface
+
+
+def create_piece_image(piece_char, color_rgb, filename, font):
+    """Create a single piece image"""
+    surface = draw_piece(piece_char, color_rgb, font)
 
     # Save the image
     pygame.image.save(surface, filename)
     print(f"Created: {filename}")
 
 
+def piece_keys():
+    """Image keys of all pieces in atlas order"""
+    return [f"{color}_{piece_type}" for color, pieces in (('red', pieces_red), ('black', pieces_black))
+            for piece_type in pieces]
+
+
+def create_atlas(render, output_dir, sizes=ATLAS_SIZES):
+    """
+    Create the texture atlas and its manifest
+
+    Row i holds every piece at sizes[i], in piece_keys() order.
+
+    Args:
+        render: Callable (key, size) -> Surface of that piece
+        output_dir: Directory for pieces_atlas.png and pieces_atlas.json
+        sizes: Piece sizes to include
+    """
+    keys = piece_keys()
+    atlas = pygame.Surface((len(keys) * max(sizes), sum(sizes)), pygame.SRCALPHA)
+    variants = []
+    y = 0
+    for size in sizes:
+        for index, key in enumerate(keys):
+            atlas.blit(render(key, size), (index * size, y))
+        variants.append({'size': size, 'y': y})
+        y += size
+
+    image_path = os.path.join(output_dir, f"{ATLAS_NAME}.png")
+    pygame.image.save(atlas, image_path)
+    with open(os.path.join(output_dir, f"{ATLAS_NAME}.json"), 'w') as manifest:
+        json.dump({'image': f"{ATLAS_NAME}.png", 'pieces': keys, 'variants': variants}, manifest, indent=2)
+    print(f"Created: {image_path} (sizes {', '.join(map(str, sizes))})")
+
+
+def atlas_from_images(output_dir):
+    """Create the atlas from existing piece images (when no Chinese font is available)"""
+    images = {key: pygame.image.load(os.path.join(output_dir, f"{key}.png")) for key in piece_keys()}
+    source_size = min(image.get_width() for image in images.values())
+    sizes = [size for size in ATLAS_SIZES if size <= source_size]
+    create_atlas(lambda key, size: pygame.transform.smoothscale(images[key], (size, size)), output_dir, sizes)
+
+
 def main():
     """Generate all piece images"""
     # Create output directory
@@ -100,17 +152,27 @@ def main():
 
     # Find and load Chinese font
     font_path = find_chinese_font()
+    if not font_path and all(os.path.exists(os.path.join(output_dir, f"{key}.png")) for key in piece_keys()):
+        print("No Chinese font found, building the atlas from the existing images")
+        atlas_from_images(output_dir)
+        pygame.quit()
+        return
+
+    def load_font(size):
+        if font_path:
+            try:
+                return pygame.font.Font(font_path, size)
+            except Exception as e:
+                print(f"Error loading font {font_path}: {e}")
+                print("Falling back to system font")
+                return pygame.font.SysFont('notosanscjk,notoserifcjk,wqy,droid,sans', size)
+        return pygame.font.SysFont('sans', size)
+
     if font_path:
         print(f"Using font: {font_path}")
-        try:
-            font = pygame.font.Font(font_path, 48)
-        except Exception as e:
-            print(f"Error loading font {font_path}: {e}")
-            print("Falling back to system font")
-            font = pygame.font.SysFont('notosanscjk,notoserifcjk,wqy,droid,sans', 48)
     else:
         print("No Chinese font found, using system default")
-        font = pygame.font.SysFont('sans', 48)
+    font = load_font(48)
 
     # Generate red pieces
     print("\nGenerating red pieces...")
@@ -124,6 +186,13 @@ def main():
         filename = os.path.join(output_dir, f"black_{piece_type}.png")
         create_piece_image(piece_char, BLACK_COLOR, filename, font)
 
+    # Generate the atlas, rendering each size with a matching font size
+    print("\nGenerating atlas...")
+    fonts = {size: load_font(round(48 * size / PIECE_SIZE)) for size in ATLAS_SIZES}
+    chars = {f"red_{piece_type}": (char, RED_COLOR) for piece_type, char in pieces_red.items()}
+    chars.update({f"black_{piece_type}": (char, BLACK_COLOR) for piece_type, char in pieces_black.items()})
+    create_atlas(lambda key, size: draw_piece(chars[key][0], chars[key][1], fonts[size], size), output_dir)
+
     print(f"\nAll pieces generated successfully in {output_dir}/")
     pygame.quit()
 
@@ -3,16 +3,35 @@ FastAPI server for Xiangqi game
 Provides REST API and WebSocket support for web clients
 """
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 from typing import Optional, List, Tuple
-import json
+import asyncio
+import functools
+import itertools
+import logging
+import os
 
+from engine.board import Board
 from engine.game_engine import GameEngine
+from engine.skill import SKILL_LEVELS, skill_settings, apply_limits
+from engine.analysis import AnalysisPool
+from server import wire
+from server.broadcast import Broadcaster
+from server.event_log import EventLog
+from server.scheduler import AIScheduler, SchedulerFull, JobCancelled
 
-app = FastAPI(title="Xiangqi API", version="1.0.0")
+try:
+    from clients.pygame_client.headless import BoardImageRenderer
+except ImportError:  # pygame is only needed for board images
+    BoardImageRenderer = None
+
+logger = logging.getLogger(__name__)
+
+app = FastAPI(title="Xiangqi API", version="1.0.0", default_response_class=wire.FastJSONResponse)
 
 # Enable CORS for web clients
 app.add_middleware(
@@ -23,11 +42,80 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Game engine instance
-engine = GameEngine()
 
-# Active WebSocket connections
-active_connections: dict[str, WebSocket] = {}
+def _env_float(name, default):
+    """Read an optional number from the environment"""
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+# Share games and WebSocket events between processes (uvicorn --workers N)
+SHARED_STATE = os.environ.get('XIANGQI_SHARED_STATE', '').lower() in ('1', 'true', 'yes', 'on')
+if SHARED_STATE and not os.environ.get('XIANGQI_SESSION_DB'):
+    raise RuntimeError("XIANGQI_SHARED_STATE requires XIANGQI_SESSION_DB to point to a database file")
+
+# Seconds between polls of the shared event log
+EVENT_POLL_INTERVAL = _env_float('XIANGQI_EVENT_POLL_INTERVAL', 0.05)
+
+# Per-request CPU budget: limits applied to every AI search whatever a client asks for
+AI_MAX_DEPTH = int(_env_float('XIANGQI_AI_MAX_DEPTH', 4))
+AI_MAX_NODES = int(_env_float('XIANGQI_AI_MAX_NODES', 50000))
+AI_MAX_TIME = _env_float('XIANGQI_AI_MAX_TIME', 5.0)
+
+# Game engine instance; idle games are moved to SQLite to keep memory bounded
+engine = GameEngine(
+    session_capacity=int(_env_float('XIANGQI_SESSION_CAPACITY', 1024)),
+    session_ttl=_env_float('XIANGQI_SESSION_TTL', 1800),
+    session_db=os.environ.get('XIANGQI_SESSION_DB'),
+    session_retention=_env_float('XIANGQI_SESSION_RETENTION', 7 * 24 * 3600),
+    session_shared=SHARED_STATE,
+    ponder=os.environ.get('XIANGQI_PONDER', '').lower() in ('1', 'true', 'yes', 'on'),
+    max_ponders=int(_env_float('XIANGQI_PONDER_MAX', 4)),
+    max_ai_depth=AI_MAX_DEPTH,
+    max_ai_nodes=AI_MAX_NODES,
+    max_ai_time=AI_MAX_TIME,
+    position_cache_size=int(_env_float('XIANGQI_POSITION_CACHE_SIZE', 100000)),
+    position_cache_db=os.environ.get('XIANGQI_POSITION_CACHE_DB'),
+    archive_path=os.environ.get('XIANGQI_ARCHIVE')
+)
+
+# Events published by any worker, delivered to the WebSocket clients of every worker
+event_log = EventLog(os.environ['XIANGQI_SESSION_DB']) if SHARED_STATE else None
+
+# Analysis: limits per position (within the AI limits) and positions per batch request
+ANALYSIS_MAX_DEPTH = int(_env_float('XIANGQI_ANALYSIS_MAX_DEPTH', AI_MAX_DEPTH))
+ANALYSIS_MAX_TIME = _env_float('XIANGQI_ANALYSIS_MAX_TIME', AI_MAX_TIME)
+ANALYSIS_MAX_POSITIONS = int(_env_float('XIANGQI_ANALYSIS_MAX_POSITIONS', 200))
+
+# Batch analysis: worker processes shared by all requests, each keeping a transposition table
+ANALYSIS_WORKERS = int(_env_float('XIANGQI_ANALYSIS_WORKERS', os.cpu_count() or 1))
+ANALYSIS_CHUNK_SIZE = 4  # Consecutive positions a worker analyses per scheduler job
+analysis_pool = AnalysisPool(ANALYSIS_WORKERS, chunk_size=ANALYSIS_CHUNK_SIZE)
+
+# Admission control for AI searches (moves and hints) on this worker
+scheduler = AIScheduler(
+    max_concurrent=int(_env_float('XIANGQI_AI_CONCURRENCY', os.cpu_count() or 1)),
+    per_client=int(_env_float('XIANGQI_AI_PER_CLIENT', 1)),
+    max_queue=int(_env_float('XIANGQI_AI_QUEUE_SIZE', 256)),
+    per_client_queue=int(_env_float('XIANGQI_AI_CLIENT_QUEUE', 4))
+)
+
+# Reverse proxies whose X-Forwarded-For header is believed when identifying clients
+TRUSTED_PROXIES = {
+    host.strip() for host in os.environ.get('XIANGQI_TRUSTED_PROXIES', '127.0.0.1,::1').split(',') if host.strip()
+}
+
+# Board thumbnails, cached by position
+BOARD_IMAGE_MAX_WIDTH = 1080
+board_images = BoardImageRenderer(
+    cache_size=int(_env_float('XIANGQI_BOARD_IMAGE_CACHE', 2048))
+) if BoardImageRenderer else None
+
+# WebSocket subscribers (players and spectators) of each game on this worker
+broadcaster = Broadcaster(
+    max_queue=int(_env_float('XIANGQI_WS_QUEUE_SIZE', 16)),
+    send_timeout=_env_float('XIANGQI_WS_SEND_TIMEOUT', 5.0)
+)
 
 
 # Request/Response Models
@@ -35,6 +123,7 @@ class NewGameRequest(BaseModel):
     ai_enabled: bool = True
     ai_color: str = "black"
     ai_depth: int = 3
+    skill: Optional[str] = None
 
 
 class MoveRequest(BaseModel):
@@ -42,6 +131,20 @@ class MoveRequest(BaseModel):
     to_pos: Tuple[int, int]
 
 
+class ImportGameRequest(BaseModel):
+    record: str
+    ai_enabled: bool = True
+    ai_color: str = "black"
+    ai_depth: int = 3
+    skill: Optional[str] = None
+
+
+class BatchAnalysisRequest(BaseModel):
+    fens: List[str]
+    depth: Optional[int] = None
+    time_limit: Optional[float] = None
+
+
 class MoveResponse(BaseModel):
     success: bool
     error: Optional[str] = None
@@ -49,6 +152,132 @@ class MoveResponse(BaseModel):
     state: Optional[dict] = None
 
 
+def notify(game_id, message):
+    """Queue a game event for the WebSocket subscribers of this game on every worker"""
+    if event_log:
+        event_log.publish(game_id, message)  # Delivered by _relay_events on each worker
+    else:
+        _deliver(game_id, message)
+
+
+def _deliver(game_id, message):
+    """Queue a message for the subscribers connected to this worker (does not wait for them)"""
+    broadcaster.publish(game_id, message, close=message.get("type") == "game_deleted")
+
+
+async def _relay_events():
+    """Deliver events published by any worker to this worker's WebSocket clients"""
+    last_id = event_log.latest_id()
+    last_trim = asyncio.get_running_loop().time()
+    while True:
+        await asyncio.sleep(EVENT_POLL_INTERVAL)
+        try:
+            for event_id, game_id, message in event_log.read_since(last_id):
+                last_id = event_id
+                if broadcaster.has_subscribers(game_id):
+                    _deliver(game_id, message)
+
+            now = asyncio.get_running_loop().time()
+            if now - last_trim > event_log.retention:
+                last_trim = now
+                event_log.trim()
+        except Exception:
+            logger.exception("Event relay error")
+
+
+def client_id(connection):
+    """
+    Identify the client of a request or WebSocket
+
+    X-Forwarded-For is only believed from a trusted proxy. Clients can send
+    the header themselves, so the address used is the rightmost one that was
+    not added by a trusted proxy.
+    """
+    host = connection.client.host if connection.client else None
+    forwarded = connection.headers.get("x-forwarded-for")
+    if not forwarded or host not in TRUSTED_PROXIES:
+        return host
+    for address in reversed(forwarded.split(",")):
+        address = address.strip()
+        if address and address not in TRUSTED_PROXIES:
+            return address
+    return host
+
+
+async def schedule_ai_move(game_id, client):
+    """Make the AI's move through the scheduler (stopped if the game is deleted)"""
+    return await scheduler.submit(
+        engine.make_ai_move, game_id,
+        client=client,
+        key=game_id,
+        cost=engine.estimate_ai_time(game_id),
+        on_cancel=lambda: engine.stop_ai(game_id)
+    )
+
+
+async def schedule_analysis(game_id, client, k, time_limit, depth=None):
+    """Analyse a game's position through the scheduler"""
+    depth = depth or ANALYSIS_MAX_DEPTH
+    return await scheduler.submit(
+        functools.partial(engine.analyse, game_id, k=k, depth=depth, time_limit=time_limit),
+        client=client,
+        key=game_id,
+        cost=engine.estimate_analysis_time(depth, time_limit)
+    )
+
+
+async def scheduled_batch_results(fens, client, depth, time_limit):
+    """
+    Analyse positions through the scheduler, yielding NDJSON lines as chunks complete
+
+    Each scheduler job hands ANALYSIS_CHUNK_SIZE consecutive positions to every
+    worker process. Up to the client's queue quota of jobs are submitted at once.
+    """
+    settings = engine.analysis_settings(depth, time_limit)
+    size = analysis_pool.workers * ANALYSIS_CHUNK_SIZE
+    positions = list(enumerate(fens))
+    chunks = iter([positions[start:start + size] for start in range(0, len(positions), size)])
+    cost = engine.estimate_analysis_time(depth, time_limit) * ANALYSIS_CHUNK_SIZE
+
+    async def run(chunk):
+        try:
+            return await scheduler.submit(
+                functools.partial(analysis_pool.analyse, chunk, settings['depth'],
+                                  settings['time_limit'], settings['max_nodes']),
+                client=client,
+                cost=cost
+            )
+        except SchedulerFull as e:
+            return [{'index': index, 'fen': fen, 'error': str(e)} for index, fen in chunk]
+
+    pending = {asyncio.ensure_future(run(chunk)) for chunk in itertools.islice(chunks, scheduler.per_client_queue)}
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                for result in task.result():
+                    yield wire.dumps_json(result) + "\n"
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    pending.add(asyncio.ensure_future(run(chunk)))
+    finally:
+        for task in pending:
+            task.cancel()  # The client went away: drop the queued chunks
+
+
+@app.on_event("startup")
+async def start_event_relay():
+    """Start polling the shared event log when running with shared state"""
+    if event_log:
+        asyncio.create_task(_relay_events())
+
+
+@app.on_event("shutdown")
+def stop_analysis_pool():
+    """Stop the batch analysis worker processes"""
+    analysis_pool.close()
+
+
 # API Endpoints
 @app.get("/api")
 async def root():
@@ -58,46 +287,123 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "POST /api/game/new": "Create a new game",
+            "POST /api/game/import": "Continue a game from a record (ICCS moves with PGN tags)",
+            "GET /api/game/{game_id}/record": "Game record (ICCS moves with PGN tags)",
+            "GET /api/game/{game_id}/image.png": "Board image (PNG thumbnail)",
             "GET /api/game/{game_id}/state": "Get game state",
             "POST /api/game/{game_id}/move": "Make a move",
             "GET /api/game/{game_id}/valid-moves": "Get valid moves for a position",
             "POST /api/game/{game_id}/ai-move": "Make AI move",
+            "POST /api/game/{game_id}/resign": "Resign the game",
             "DELETE /api/game/{game_id}": "Delete a game",
-            "WebSocket /ws/{game_id}": "Connect to game updates"
+            "GET /api/game/{game_id}/analyse": "Best moves with scores and lines (hints)",
+            "POST /api/analyse/batch": "Analyse many positions (NDJSON stream)",
+            "GET /api/skills": "Available AI skill levels",
+            "GET /metrics": "AI search metrics (Prometheus text format)",
+            "WebSocket /ws/{game_id}": "Connect to game updates",
+            "WebSocket /ws": "Play over one connection (commands: " + ", ".join(sorted(WS_COMMANDS)) + ")"
         }
     }
 
 
+def state_response(request, content):
+    """Encode a result containing game state in the format the client accepts"""
+    return wire.response(content, wire.negotiate(request.headers.get("accept")))
+
+
+@app.get("/api/skills")
+async def skills():
+    """Available AI skill levels with their search settings (after server limits)"""
+    return {
+        name: apply_limits(skill_settings(name), AI_MAX_DEPTH, AI_MAX_NODES, AI_MAX_TIME)
+        for name in SKILL_LEVELS
+    }
+
+
 @app.post("/api/game/new")
-async def create_game(request: NewGameRequest):
+async def create_game(request: NewGameRequest, http_request: Request):
     """Create a new game"""
     try:
         game_id = engine.new_game(
             ai_enabled=request.ai_enabled,
             ai_color=request.ai_color,
-            ai_depth=request.ai_depth
+            ai_depth=request.ai_depth,
+            skill=request.skill
         )
         state = engine.get_game_state(game_id)
-        return {
+        return state_response(http_request, {
             "success": True,
             "game_id": game_id,
             "state": state
-        }
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/api/game/import")
+async def import_game(request: ImportGameRequest, http_request: Request):
+    """Create a game from a record, continuing from its last position"""
+    try:
+        game_id = engine.import_game(
+            request.record,
+            ai_enabled=request.ai_enabled,
+            ai_color=request.ai_color,
+            ai_depth=request.ai_depth,
+            skill=request.skill
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return state_response(http_request, {
+        "success": True,
+        "game_id": game_id,
+        "state": engine.get_game_state(game_id)
+    })
+
+
+@app.get("/api/game/{game_id}/record", response_class=PlainTextResponse)
+async def game_record(game_id: str):
+    """Get the game record (ICCS moves with PGN tags)"""
+    record = engine.export_game(game_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+    return record
+
+
+@app.get("/api/game/{game_id}/image.png")
+async def game_image(game_id: str, request: Request, width: int = 360):
+    """Board image of the current position with the last move highlighted"""
+    if board_images is None:
+        raise HTTPException(status_code=501, detail="Board images need pygame")
+    if not 60 <= width <= BOARD_IMAGE_MAX_WIDTH:
+        raise HTTPException(status_code=400, detail=f"width must be between 60 and {BOARD_IMAGE_MAX_WIDTH}")
+    board = engine.get_board(game_id)
+    if board is None:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    # Draw a snapshot so a concurrent move cannot change the board while it is drawn
+    snapshot = Board.from_fen(board.to_fen())
+    snapshot.move_history = board.move_history[-1:]
+    etag = f'"{BoardImageRenderer.image_key(snapshot)}-{width}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    png = await asyncio.to_thread(board_images.render_png, snapshot, width)
+    return Response(png, media_type="image/png", headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+
 @app.get("/api/game/{game_id}/state")
-async def get_game_state(game_id: str):
+async def get_game_state(game_id: str, request: Request):
     """Get the current game state"""
     state = engine.get_game_state(game_id)
     if not state:
         raise HTTPException(status_code=404, detail="Game not found")
-    return state
+    return state_response(request, state)
 
 
 @app.post("/api/game/{game_id}/move")
-async def make_move(game_id: str, move: MoveRequest):
+async def make_move(game_id: str, move: MoveRequest, request: Request):
     """Make a move in the game"""
     result = engine.make_move(game_id, move.from_pos, move.to_pos)
 
@@ -105,16 +411,12 @@ async def make_move(game_id: str, move: MoveRequest):
         return result
 
     # Notify WebSocket clients
-    if game_id in active_connections:
-        try:
-            await active_connections[game_id].send_json({
-                "type": "move",
-                "data": result
-            })
-        except:
-            pass
+    notify(game_id, {
+        "type": "move",
+        "data": result
+    })
 
-    return result
+    return state_response(request, result)
 
 
 @app.get("/api/game/{game_id}/valid-moves")
@@ -128,71 +430,309 @@ async def get_valid_moves(game_id: str, row: int, col: int):
 
 
 @app.post("/api/game/{game_id}/ai-move")
-async def make_ai_move(game_id: str):
-    """Make the AI's move"""
-    result = engine.make_ai_move(game_id)
+async def make_ai_move(game_id: str, request: Request):
+    """Make the AI's move (queued by the scheduler)"""
+    try:
+        result = await schedule_ai_move(game_id, client_id(request))
+    except SchedulerFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except JobCancelled as e:
+        return {"success": False, "error": str(e)}
 
     if not result['success']:
         return result
 
     # Notify WebSocket clients
-    if game_id in active_connections:
-        try:
-            await active_connections[game_id].send_json({
-                "type": "ai_move",
-                "data": result
-            })
-        except:
-            pass
+    notify(game_id, {
+        "type": "ai_move",
+        "data": result
+    })
+
+    return state_response(request, result)
 
-    return result
+
+@app.post("/api/game/{game_id}/resign")
+async def resign(game_id: str, request: Request):
+    """Resign the game for the player to move"""
+    result = engine.resign(game_id)
+
+    if not result['success']:
+        return result
+
+    notify(game_id, {
+        "type": "resign",
+        "data": result
+    })
+
+    return state_response(request, result)
 
 
 @app.delete("/api/game/{game_id}")
 async def delete_game(game_id: str):
     """Delete a game session"""
+    scheduler.cancel(game_id)  # Drop queued searches and stop a running one
     success = engine.delete_game(game_id)
     if not success:
         raise HTTPException(status_code=404, detail="Game not found")
 
-    # Close WebSocket if exists
-    if game_id in active_connections:
-        try:
-            await active_connections[game_id].close()
-        except:
-            pass
-        del active_connections[game_id]
+    # Tell subscribers and close their connections
+    notify(game_id, {"type": "game_deleted", "data": {"game_id": game_id}})
 
     return {"success": True, "message": "Game deleted"}
 
 
-@app.websocket("/ws/{game_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: str):
-    """WebSocket endpoint for real-time game updates"""
-    await websocket.accept()
-    active_connections[game_id] = websocket
+# Analysis settings of hints: at most HINT_MAX_LINES lines, searched for HINT_TIME_LIMIT seconds by default
+HINT_MAX_LINES = 10
+HINT_TIME_LIMIT = _env_float('XIANGQI_HINT_TIME_LIMIT', 0.2)
+
+
+@app.get("/api/game/{game_id}/analyse")
+async def analyse(request: Request, game_id: str, k: int = 3, depth: Optional[int] = None,
+                  time_limit: Optional[float] = None):
+    """Best moves of the current position with scores and principal variations"""
+    if not 1 <= k <= HINT_MAX_LINES:
+        raise HTTPException(status_code=400, detail=f"k must be between 1 and {HINT_MAX_LINES}")
+    if depth is not None and not 1 <= depth <= ANALYSIS_MAX_DEPTH:
+        raise HTTPException(status_code=400, detail=f"depth must be between 1 and {ANALYSIS_MAX_DEPTH}")
+    if time_limit is not None and not 0 < time_limit <= ANALYSIS_MAX_TIME:
+        raise HTTPException(status_code=400, detail=f"time_limit must be between 0 and {ANALYSIS_MAX_TIME}")
+    if depth is None and time_limit is None:
+        time_limit = HINT_TIME_LIMIT
 
     try:
-        # Send initial game state
-        state = engine.get_game_state(game_id)
-        if state:
-            await websocket.send_json({
-                "type": "initial_state",
-                "data": state
-            })
+        result = await schedule_analysis(game_id, client_id(request), k, time_limit, depth)
+    except SchedulerFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except JobCancelled as e:
+        return {"success": False, "error": str(e)}
+    if not result['success'] and result['error'] == 'Game not found':
+        raise HTTPException(status_code=404, detail="Game not found")
+    return result
+
+
+@app.post("/api/analyse/batch")
+async def analyse_batch(request: BatchAnalysisRequest, http_request: Request):
+    """Analyse many positions, streaming one JSON result per line (NDJSON) as they complete"""
+    if not request.fens or len(request.fens) > ANALYSIS_MAX_POSITIONS:
+        raise HTTPException(status_code=400, detail=f"fens must hold between 1 and {ANALYSIS_MAX_POSITIONS} positions")
+    if request.depth is not None and not 1 <= request.depth <= ANALYSIS_MAX_DEPTH:
+        raise HTTPException(status_code=400, detail=f"depth must be between 1 and {ANALYSIS_MAX_DEPTH}")
+    if request.time_limit is not None and not 0 < request.time_limit <= ANALYSIS_MAX_TIME:
+        raise HTTPException(status_code=400, detail=f"time_limit must be between 0 and {ANALYSIS_MAX_TIME}")
+
+    return StreamingResponse(
+        scheduled_batch_results(request.fens, client_id(http_request), request.depth, request.time_limit),
+        media_type="application/x-ndjson"
+    )
+
 
-        # Keep connection alive and handle messages
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """AI search metrics in Prometheus text format"""
+    return PlainTextResponse(
+        engine.get_metrics(extra_gauges=broadcaster.get_gauges() + scheduler.get_gauges()
+                           + (board_images.get_gauges() if board_images else [])),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
+@app.websocket("/ws")
+@app.websocket("/ws/{game_id}")
+async def websocket_endpoint(websocket: WebSocket, game_id: Optional[str] = None):
+    """
+    WebSocket endpoint for real-time games (any number of players and spectators)
+
+    Besides receiving game events, clients can play over the connection by
+    sending commands as JSON: {"id": 1, "type": "move", "from_pos": [6, 0], "to_pos": [5, 0]}.
+    Each command is answered with {"id": 1, "type": "response", "ok": true, "data": {...}}
+    or {"id": 1, "type": "response", "ok": false, "error": "..."}.
+    Plain text messages are echoed back as "pong".
+
+    The subprotocols xiangqi.compact and xiangqi.msgpack select a compact
+    encoding of game states (see server.wire); with xiangqi.msgpack messages
+    are binary in both directions.
+    """
+    subprotocol, fmt = wire.select_subprotocol(websocket.scope.get("subprotocols"))
+    await websocket.accept(subprotocol=subprotocol)
+    session = GameSocket(websocket, fmt)
+    if game_id:
+        session.join(game_id)
+
+    try:
         while True:
-            data = await websocket.receive_text()
-            # Echo back or handle client messages if needed
-            await websocket.send_json({
-                "type": "pong",
-                "data": data
-            })
+            received = await websocket.receive()
+            if received["type"] == "websocket.disconnect":
+                break
+            data = received.get("text")
+            if data is None:
+                data = received.get("bytes")
+            message = wire.decode(data)
+
+            if isinstance(message, dict) and 'type' in message:
+                await session.handle(message)
+            else:
+                # Keep-alive: echo back plain messages
+                session.send({
+                    "type": "pong",
+                    "data": data if isinstance(data, str) else None
+                })
 
     except WebSocketDisconnect:
-        if game_id in active_connections:
-            del active_connections[game_id]
+        pass
+    finally:
+        session.close()
+
+
+class GameSocket:
+    """One WebSocket connection following (and optionally playing) a game"""
+
+    def __init__(self, websocket, fmt=wire.JSON):
+        self.websocket = websocket
+        self.game_id = None
+        self.subscriber = broadcaster.subscribe(None, websocket, fmt)
+        self.client = client_id(websocket)
+        self.ai_task = None
+
+    def join(self, game_id):
+        """Follow a game: subscribe to its events and send its current state (None if it does not exist)"""
+        state = engine.get_game_state(game_id)
+        if state is None:
+            return None
+        self.game_id = game_id
+        broadcaster.follow(self.subscriber, game_id)
+        self.send({
+            "type": "initial_state",
+            "data": state
+        })
+        return state
+
+    def send(self, message):
+        """Queue a message for this connection only"""
+        broadcaster.send(self.subscriber, message)
+
+    def close(self):
+        """Stop following the game and cancel a running AI request"""
+        if self.ai_task:
+            self.ai_task.cancel()
+        broadcaster.unsubscribe(self.subscriber)
+
+    async def handle(self, message):
+        """Run a command and send the response"""
+        command_type = message.get('type')
+        command = WS_COMMANDS.get(command_type) if isinstance(command_type, str) else None
+        if command is None:
+            self._respond(message, error=f"Unknown command: {command_type!r}")
+            return
+        if command is not GameSocket.cmd_new_game and command is not GameSocket.cmd_join and not self.game_id:
+            self._respond(message, error="No game selected")
+            return
+
+        try:
+            await command(self, message)
+        except (KeyError, TypeError, ValueError) as e:
+            self._respond(message, error=f"Invalid command: {e}")
+
+    def _respond(self, message, data=None, error=None):
+        """Send the response to a command"""
+        response = {"id": message.get("id"), "type": "response", "ok": error is None}
+        if error is None:
+            response["data"] = data
+        else:
+            response["error"] = error
+        self.send(response)
+
+    def _respond_result(self, message, result, event_type, game_id=None):
+        """Respond with an engine result and notify the game's subscribers on success"""
+        if result['success']:
+            notify(game_id or self.game_id, {"type": event_type, "data": result})
+            self._respond(message, result)
+        else:
+            self._respond(message, error=result['error'])
+
+    async def cmd_new_game(self, message):
+        game_id = engine.new_game(
+            ai_enabled=bool(message.get('ai_enabled', True)),
+            ai_color=message.get('ai_color', 'black'),
+            ai_depth=int(message.get('ai_depth', 3)),
+            skill=message.get('skill')
+        )
+        self._respond(message, {"game_id": game_id, "state": self.join(game_id)})
+
+    async def cmd_join(self, message):
+        state = self.join(message['game_id'])
+        if state is None:
+            self._respond(message, error="Game not found")
+        else:
+            self._respond(message, {"game_id": self.game_id, "state": state})
+
+    async def cmd_sync(self, message):
+        state = engine.get_game_state(self.game_id)
+        if state is None:
+            self._respond(message, error="Game not found")
+        else:
+            self._respond(message, {"game_id": self.game_id, "state": state})
+
+    async def cmd_legal_moves(self, message):
+        row, col = int(message['row']), int(message['col'])
+        self._respond(message, {
+            "position": [row, col],
+            "valid_moves": engine.get_valid_moves(self.game_id, row, col)
+        })
+
+    async def cmd_move(self, message):
+        from_pos = tuple(int(v) for v in message['from_pos'])
+        to_pos = tuple(int(v) for v in message['to_pos'])
+        result = engine.make_move(self.game_id, from_pos, to_pos)
+        self._respond_result(message, result, "move")
+
+    async def cmd_ai_move(self, message):
+        if self.ai_task and not self.ai_task.done():
+            self._respond(message, error="AI is already thinking")
+            return
+
+        # Search in the background so this connection keeps answering other commands
+        async def run(game_id):
+            try:
+                result = await schedule_ai_move(game_id, self.client)
+            except (SchedulerFull, JobCancelled) as e:
+                self._respond(message, error=str(e))
+                return
+            self._respond_result(message, result, "ai_move", game_id)
+
+        self.ai_task = asyncio.create_task(run(self.game_id))
+
+    async def cmd_analyse(self, message):
+        time_limit = min(float(message.get('time_limit', HINT_TIME_LIMIT)), ANALYSIS_MAX_TIME)
+        k = int(message.get('k', 3))
+        if not 1 <= k <= HINT_MAX_LINES:
+            self._respond(message, error=f"k must be between 1 and {HINT_MAX_LINES}")
+            return
+        try:
+            result = await schedule_analysis(self.game_id, self.client, k, time_limit)
+        except (SchedulerFull, JobCancelled) as e:
+            self._respond(message, error=str(e))
+            return
+        if result['success']:
+            self._respond(message, result)
+        else:
+            self._respond(message, error=result['error'])
+
+    async def cmd_resign(self, message):
+        result = engine.resign(self.game_id, message.get('color'))
+        self._respond_result(message, result, "resign")
+
+
+# WebSocket command name -> handler
+WS_COMMANDS = {
+    'new_game': GameSocket.cmd_new_game,
+    'join': GameSocket.cmd_join,
+    'sync': GameSocket.cmd_sync,
+    'legal_moves': GameSocket.cmd_legal_moves,
+    'move': GameSocket.cmd_move,
+    'ai_move': GameSocket.cmd_ai_move,
+    'resign': GameSocket.cmd_resign,
+    'analyse': GameSocket.cmd_analyse,
+}
 
 
 # Mount static files (web client) - must be last
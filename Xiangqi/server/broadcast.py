@@ -0,0 +1,226 @@
+"""
+WebSocket fan-out
+Delivers game events to every player and spectator of a game without blocking the request path
+"""
+
+import asyncio
+
+from server import wire
+
+
+class Subscriber:
+    """One WebSocket connection with its own outbound queue"""
+
+    def __init__(self, game_id, websocket, max_queue, fmt=wire.JSON):
+        """
+        Initialize the subscriber
+
+        Args:
+            game_id: Game the connection follows (None for none yet)
+            websocket: Accepted WebSocket connection
+            max_queue: Maximum number of replaceable messages waiting to be sent
+            fmt: Wire format of the connection (see server.wire)
+        """
+        self.game_id = game_id
+        self.websocket = websocket
+        self.fmt = fmt
+        self.max_queue = max_queue
+        self.queue = asyncio.Queue()  # (payload, close, replaceable)
+        self.replaceable = 0  # Queued messages a newer state message supersedes
+        self.task = None
+        self.coalesced = 0  # Messages dropped because newer state superseded them
+
+    def enqueue(self, payload, close=False, replaceable=False):
+        """
+        Queue an encoded message without waiting
+
+        Game events carry the full game state, so when max_queue of them are
+        waiting the pending ones are dropped in favour of the newest. Other
+        messages (command responses, initial state) are never dropped.
+
+        Args:
+            payload: Encoded message (str is sent as text, bytes as binary)
+            close: Close the connection after this message
+            replaceable: A newer game event supersedes this message
+
+        Returns:
+            Number of messages dropped to make room
+        """
+        dropped = 0
+        if replaceable and self.replaceable >= self.max_queue:
+            kept = []
+            while not self.queue.empty():
+                item = self.queue.get_nowait()
+                if item[2]:
+                    dropped += 1
+                else:
+                    kept.append(item)
+            for item in kept:
+                self.queue.put_nowait(item)
+            self.replaceable = 0
+            self.coalesced += dropped
+        self.queue.put_nowait((payload, close, replaceable))
+        if replaceable:
+            self.replaceable += 1
+        return dropped
+
+    async def dequeue(self):
+        """
+        Wait for the next message to send
+
+        Returns:
+            Tuple (payload, close)
+        """
+        payload, close, replaceable = await self.queue.get()
+        if replaceable:
+            self.replaceable -= 1
+        return payload, close
+
+
+class Broadcaster:
+    """Fans out game events to all WebSocket subscribers of a game"""
+
+    def __init__(self, max_queue=16, send_timeout=5.0):
+        """
+        Initialize the broadcaster
+
+        Args:
+            max_queue: Game events queued per connection before older ones are dropped
+            send_timeout: Seconds a single send may take before the connection is dropped
+        """
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.games = {}  # game_id -> set of Subscriber
+
+        # Counters for monitoring
+        self.messages_published = 0
+        self.messages_coalesced = 0
+        self.slow_disconnects = 0
+
+    def subscribe(self, game_id, websocket, fmt=wire.JSON):
+        """
+        Register a connection and start its sender task
+
+        Args:
+            game_id: Game ID to follow (None to follow no game yet)
+            websocket: Accepted WebSocket connection
+            fmt: Wire format of the connection (see server.wire)
+
+        Returns:
+            Subscriber
+        """
+        subscriber = Subscriber(None, websocket, self.max_queue, fmt)
+        subscriber.task = asyncio.create_task(self._sender(subscriber))
+        self.follow(subscriber, game_id)
+        return subscriber
+
+    def follow(self, subscriber, game_id):
+        """
+        Switch a connection to another game, keeping its pending messages
+
+        Args:
+            subscriber: Subscriber returned by subscribe()
+            game_id: Game ID to follow (None to follow no game)
+        """
+        self._remove(subscriber)
+        subscriber.game_id = game_id
+        if game_id is not None:
+            self.games.setdefault(game_id, set()).add(subscriber)
+
+    def unsubscribe(self, subscriber):
+        """
+        Remove a connection and stop its sender task
+
+        Args:
+            subscriber: Subscriber returned by subscribe()
+        """
+        self._remove(subscriber)
+        if subscriber.task and subscriber.task is not asyncio.current_task():
+            subscriber.task.cancel()
+
+    def _remove(self, subscriber):
+        """Remove a connection from its game's subscriber set"""
+        subscribers = self.games.get(subscriber.game_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self.games[subscriber.game_id]
+
+    def has_subscribers(self, game_id):
+        """Check whether any connection follows a game"""
+        return game_id in self.games
+
+    def publish(self, game_id, message, close=False):
+        """
+        Queue a message for every subscriber of a game (never waits for the network)
+
+        Args:
+            game_id: Game ID
+            message: JSON-serializable message
+            close: Close the connections after delivering this message
+        """
+        subscribers = self.games.get(game_id)
+        if not subscribers:
+            return
+
+        encoded = {}  # Encode once per wire format for all subscribers
+        self.messages_published += 1
+        for subscriber in subscribers:
+            payload = encoded.get(subscriber.fmt)
+            if payload is None:
+                payload = encoded[subscriber.fmt] = wire.encode(message, subscriber.fmt)
+            self.messages_coalesced += subscriber.enqueue(payload, close, replaceable=not close)
+
+    def send(self, subscriber, message):
+        """
+        Queue a message for a single subscriber (never dropped for a slow client)
+
+        Args:
+            subscriber: Subscriber returned by subscribe()
+            message: JSON-serializable message
+        """
+        self.messages_coalesced += subscriber.enqueue(wire.encode(message, subscriber.fmt))
+
+    def subscriber_count(self):
+        """Total number of connections"""
+        return sum(len(subscribers) for subscribers in self.games.values())
+
+    def get_gauges(self):
+        """
+        Get monitoring values
+
+        Returns:
+            List of (name, value, help) tuples
+        """
+        return [
+            ('xiangqi_ws_games', len(self.games), 'Games with at least one WebSocket subscriber'),
+            ('xiangqi_ws_subscribers', self.subscriber_count(), 'Connected WebSocket subscribers'),
+            ('xiangqi_ws_messages_published', self.messages_published, 'Events published to subscribers'),
+            ('xiangqi_ws_messages_coalesced', self.messages_coalesced, 'Queued messages dropped for slow subscribers'),
+            ('xiangqi_ws_slow_disconnects', self.slow_disconnects, 'Subscribers dropped for not reading'),
+        ]
+
+    async def _sender(self, subscriber):
+        """Send queued messages to one connection"""
+        websocket = subscriber.websocket
+        try:
+            while True:
+                payload, close = await subscriber.dequeue()
+                if isinstance(payload, bytes):
+                    send = websocket.send_bytes(payload)
+                else:
+                    send = websocket.send_text(payload)
+                try:
+                    await asyncio.wait_for(send, self.send_timeout)
+                except asyncio.TimeoutError:
+                    self.slow_disconnects += 1
+                    close = True
+                if close:
+                    await asyncio.wait_for(websocket.close(), self.send_timeout)
+                    break
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            pass  # Connection is gone; the endpoint notices on its next receive
+        finally:
+            self.unsubscribe(subscriber)
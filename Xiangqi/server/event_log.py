@@ -0,0 +1,89 @@
+"""
+Cross-worker event log
+Shares game events between uvicorn worker processes through SQLite
+"""
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class EventLog:
+    """
+    Append-only log of game events in a SQLite database (WAL mode)
+
+    Every worker appends the events it produces and polls for new ones, so a
+    WebSocket client receives updates no matter which worker handled the move.
+    """
+
+    def __init__(self, path, retention=60):
+        """
+        Initialize the log
+
+        Args:
+            path: SQLite database file shared by all workers
+            retention: Seconds events are kept before trim() removes them
+        """
+        self.path = path
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS events ('
+            ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+            ' game_id TEXT NOT NULL,'
+            ' payload TEXT NOT NULL,'
+            ' created_at REAL NOT NULL)'
+        )
+        self._db.commit()
+
+    def publish(self, game_id, message):
+        """
+        Append an event
+
+        Args:
+            game_id: Game the event belongs to
+            message: JSON-serializable message
+        """
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO events (game_id, payload, created_at) VALUES (?, ?, ?)',
+                (game_id, json.dumps(message), time.time())
+            )
+            self._db.commit()
+
+    def latest_id(self):
+        """Get the ID of the newest event (0 if the log is empty)"""
+        with self._lock:
+            return self._db.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+    def read_since(self, last_id, limit=1000):
+        """
+        Read events newer than last_id
+
+        Args:
+            last_id: ID of the last event already processed
+            limit: Maximum number of events to return
+
+        Returns:
+            List of (event_id, game_id, message) tuples in order
+        """
+        with self._lock:
+            rows = self._db.execute(
+                'SELECT id, game_id, payload FROM events WHERE id > ? ORDER BY id LIMIT ?',
+                (last_id, limit)
+            ).fetchall()
+        return [(event_id, game_id, json.loads(payload)) for event_id, game_id, payload in rows]
+
+    def trim(self):
+        """Delete events older than the retention period"""
+        with self._lock:
+            self._db.execute('DELETE FROM events WHERE created_at < ?', (time.time() - self.retention,))
+            self._db.commit()
+
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,215 @@
+"""
+AI compute scheduler
+Admission control, fair queuing and cancellation for AI searches
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+
+
+class SchedulerFull(Exception):
+    """Raised when a search cannot be queued (global or per-client queue limit)"""
+
+
+class JobCancelled(Exception):
+    """Raised to the submitter of a job cancelled with AIScheduler.cancel()"""
+
+
+class _Job:
+    """One queued or running search"""
+
+    def __init__(self, func, args, client, key, cost, on_cancel, seq):
+        self.func = func
+        self.args = args
+        self.client = client
+        self.key = key
+        self.cost = cost
+        self.on_cancel = on_cancel
+        self.seq = seq
+        self.future = asyncio.get_running_loop().create_future()
+        self.submitted = time.monotonic()
+        self.started = None
+        self.cancelled = False
+
+
+class AIScheduler:
+    """
+    Runs AI searches in worker threads with bounded concurrency
+
+    Jobs wait in one queue. A free slot goes to the cheapest job (by estimated
+    seconds) whose client is below its concurrency limit; waiting lowers a
+    job's priority value by `aging` per second so expensive jobs still run.
+    A job can be cancelled while queued, or while running through its
+    on_cancel callback (which should stop the search).
+    """
+
+    def __init__(self, max_concurrent=4, per_client=1, max_queue=256, per_client_queue=4, aging=1.0):
+        """
+        Initialize the scheduler
+
+        Args:
+            max_concurrent: Searches running at the same time
+            per_client: Searches running at the same time for one client
+            max_queue: Jobs waiting in total before new ones are rejected
+            per_client_queue: Jobs waiting or running for one client before new ones are rejected
+            aging: Priority gained per second of waiting (in estimated seconds)
+        """
+        self.max_concurrent = max_concurrent
+        self.per_client = per_client
+        self.max_queue = max_queue
+        self.per_client_queue = per_client_queue
+        self.aging = aging
+
+        self._queue = []  # Waiting jobs in submission order
+        self._running = set()
+        self._running_by_client = defaultdict(int)
+        self._jobs_by_client = defaultdict(int)  # Waiting + running
+        self._seq = 0
+
+        # Counters for monitoring
+        self.completed = 0
+        self.rejected = 0
+        self.cancelled = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    async def submit(self, func, *args, client=None, key=None, cost=1.0, on_cancel=None):
+        """
+        Queue a search and wait for its result
+
+        Cancelling the awaiting task cancels the job.
+
+        Args:
+            func: Blocking callable run in a worker thread
+            *args: Arguments of func
+            client: Client identity for the per-client limits
+            key: Optional key for cancel() (such as the game ID)
+            cost: Estimated seconds of the search (shorter searches run first)
+            on_cancel: Optional callable stopping the search if it is cancelled while running
+
+        Returns:
+            Return value of func
+
+        Raises:
+            SchedulerFull: If the queue or the client's quota is full
+            JobCancelled: If the job was cancelled with cancel()
+        """
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise SchedulerFull("AI is busy, please retry")
+        if self._jobs_by_client[client] >= self.per_client_queue:
+            self.rejected += 1
+            raise SchedulerFull("Too many AI requests from this client")
+
+        self._seq += 1
+        job = _Job(func, args, client, key, cost, on_cancel, self._seq)
+        self._queue.append(job)
+        self._jobs_by_client[client] += 1
+        self._dispatch()
+
+        try:
+            return await job.future
+        except asyncio.CancelledError:
+            self._cancel_job(job)
+            raise
+
+    def cancel(self, key):
+        """
+        Cancel every queued or running job with a key
+
+        Args:
+            key: Key given to submit()
+
+        Returns:
+            Number of cancelled jobs
+        """
+        jobs = [job for job in self._queue + list(self._running) if job.key == key]
+        for job in jobs:
+            self._cancel_job(job)
+            if not job.future.done():
+                job.future.set_exception(JobCancelled("AI search was cancelled"))
+        return len(jobs)
+
+    def queue_depth(self):
+        """Number of waiting jobs"""
+        return len(self._queue)
+
+    def running_count(self):
+        """Number of running jobs"""
+        return len(self._running)
+
+    def get_gauges(self):
+        """
+        Get monitoring values
+
+        Returns:
+            List of (name, value, help) tuples
+        """
+        now = time.monotonic()
+        oldest = max((now - job.submitted for job in self._queue), default=0.0)
+        return [
+            ('xiangqi_ai_queue_depth', len(self._queue), 'AI searches waiting for a slot'),
+            ('xiangqi_ai_running', len(self._running), 'AI searches running'),
+            ('xiangqi_ai_queue_oldest_wait_seconds', oldest, 'Wait time of the oldest queued AI search'),
+            ('xiangqi_ai_jobs_completed', self.completed, 'AI searches completed by the scheduler'),
+            ('xiangqi_ai_jobs_rejected', self.rejected, 'AI searches rejected by queue limits'),
+            ('xiangqi_ai_jobs_cancelled', self.cancelled, 'AI searches cancelled'),
+            ('xiangqi_ai_queue_wait_seconds_total', self.wait_seconds_total, 'Total time AI searches waited in the queue'),
+            ('xiangqi_ai_queue_wait_seconds_max', self.wait_seconds_max, 'Longest time an AI search waited in the queue'),
+        ]
+
+    def _dispatch(self):
+        """Start queued jobs while slots are free"""
+        while self._queue and len(self._running) < self.max_concurrent:
+            now = time.monotonic()
+            eligible = [job for job in self._queue if self._running_by_client.get(job.client, 0) < self.per_client]
+            if not eligible:
+                return
+            job = min(eligible, key=lambda queued: (queued.cost - self.aging * (now - queued.submitted), queued.seq))
+            self._queue.remove(job)
+
+            job.started = now
+            wait = now - job.submitted
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+            self._running.add(job)
+            self._running_by_client[job.client] += 1
+            asyncio.get_running_loop().create_task(self._run(job))
+
+    async def _run(self, job):
+        """Run a job in a worker thread and hand over its result"""
+        try:
+            result = await asyncio.to_thread(job.func, *job.args)
+            if not job.future.done():
+                job.future.set_result(result)
+        except Exception as e:
+            if not job.future.done():
+                job.future.set_exception(e)
+        finally:
+            self._running.discard(job)
+            self._running_by_client[job.client] -= 1
+            if not self._running_by_client[job.client]:
+                del self._running_by_client[job.client]
+            self._release(job)
+            if not job.cancelled:
+                self.completed += 1
+            self._dispatch()
+
+    def _cancel_job(self, job):
+        """Remove a waiting job or stop a running one (only once)"""
+        if job.cancelled or (job.future.done() and not job.future.cancelled()):
+            return
+        job.cancelled = True
+        self.cancelled += 1
+        if job in self._queue:
+            self._queue.remove(job)
+            self._release(job)
+        elif job.started is not None and job.on_cancel:
+            job.on_cancel()
+
+    def _release(self, job):
+        """Drop a finished or removed job from its client's count"""
+        self._jobs_by_client[job.client] -= 1
+        if not self._jobs_by_client[job.client]:
+            del self._jobs_by_client[job.client]
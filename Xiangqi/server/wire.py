@@ -0,0 +1,249 @@
+"""
+Wire formats for game state
+Chooses and applies the encoding of API responses and WebSocket messages
+
+Three formats are supported:
+- json: the full state (default), encoded with orjson when it is installed
+- compact: JSON with the position as FEN and the moves packed into one string
+- msgpack: the compact state as MessagePack (needs the msgpack package)
+
+REST clients select a format with the Accept header, WebSocket clients with
+a subprotocol.
+"""
+
+import json
+
+from starlette.responses import Response
+
+from engine.board import START_FEN
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON = 'json'
+COMPACT = 'compact'
+MSGPACK = 'msgpack'
+
+# Format -> response media type
+MEDIA_TYPES = {
+    JSON: 'application/json',
+    COMPACT: 'application/vnd.xiangqi.compact+json',
+    MSGPACK: 'application/msgpack',
+}
+
+# Accepted media type -> format
+ACCEPT_TYPES = {
+    'application/vnd.xiangqi.compact+json': COMPACT,
+    'application/msgpack': MSGPACK,
+    'application/x-msgpack': MSGPACK,
+}
+
+# WebSocket subprotocol -> format
+SUBPROTOCOLS = {
+    'xiangqi.json': JSON,
+    'xiangqi.compact': COMPACT,
+    'xiangqi.msgpack': MSGPACK,
+}
+
+
+def available_formats():
+    """Formats that can be produced with the installed packages"""
+    formats = [JSON, COMPACT]
+    if msgpack is not None:
+        formats.append(MSGPACK)
+    return formats
+
+
+def negotiate(accept):
+    """
+    Choose a format from an Accept header
+
+    Args:
+        accept: Value of the Accept header (may be None)
+
+    Returns:
+        Format name (JSON unless a supported compact type is listed)
+    """
+    for media_range in (accept or '').split(','):
+        fmt = ACCEPT_TYPES.get(media_range.split(';')[0].strip().lower())
+        if fmt in available_formats():
+            return fmt
+    return JSON
+
+
+def select_subprotocol(requested):
+    """
+    Choose a WebSocket subprotocol
+
+    Args:
+        requested: Subprotocols offered by the client, in order of preference
+
+    Returns:
+        Tuple (subprotocol to accept or None, format)
+    """
+    for subprotocol in requested or []:
+        fmt = SUBPROTOCOLS.get(subprotocol)
+        if fmt in available_formats():
+            return subprotocol, fmt
+    return None, JSON
+
+
+def pack_moves(move_history):
+    """
+    Pack a move history into one string of four digits per move
+
+    Args:
+        move_history: List of (from_pos, to_pos, ...) entries
+
+    Returns:
+        String like '60502191' (from row, from col, to row, to col per move)
+    """
+    return ''.join(f"{fr}{fc}{tr}{tc}" for (fr, fc), (tr, tc), *_ in move_history)
+
+
+def unpack_moves(packed):
+    """
+    Reverse pack_moves()
+
+    Args:
+        packed: String produced by pack_moves()
+
+    Returns:
+        List of ((from_row, from_col), (to_row, to_col)) tuples
+    """
+    return [((int(packed[i]), int(packed[i + 1])), (int(packed[i + 2]), int(packed[i + 3])))
+            for i in range(0, len(packed), 4)]
+
+
+def compact_state(state):
+    """
+    Convert a full game state into its compact form
+
+    The board is replaced by its FEN and the move history by a packed string.
+    Captured pieces can be recovered by replaying the moves from the start
+    position, which is only included (as start_fen) when it is not the
+    standard one.
+
+    Args:
+        state: Dictionary returned by GameEngine.get_game_state()
+
+    Returns:
+        Compact state dictionary
+    """
+    board_state = state['board_state']
+    compact = {
+        'game_id': state['game_id'],
+        'fen': state['fen'],
+        'moves': pack_moves(board_state['move_history']),
+        'status': board_state['status'],
+        'is_game_over': board_state['is_game_over'],
+        'is_checkmate': board_state['is_checkmate'],
+        'is_stalemate': board_state['is_stalemate'],
+        'ai_enabled': state['ai_enabled'],
+        'ai_color': state['ai_color'],
+        'resigned': state['resigned'],
+    }
+    if state['start_fen'] != START_FEN:
+        compact['start_fen'] = state['start_fen']
+    return compact
+
+
+def compact_message(message):
+    """
+    Replace every full game state inside a message with its compact form
+
+    Args:
+        message: JSON-serializable value (API result or WebSocket event)
+
+    Returns:
+        A new value with the states converted; other values are shared
+    """
+    if isinstance(message, dict):
+        if 'board_state' in message:
+            return compact_state(message)
+        return {key: compact_message(value) for key, value in message.items()}
+    if isinstance(message, list):
+        return [compact_message(value) for value in message]
+    return message
+
+
+def dumps_json(value):
+    """Encode a value as JSON text (orjson when available)"""
+    if orjson is not None:
+        return orjson.dumps(value).decode()
+    return json.dumps(value, separators=(',', ':'))
+
+
+def encode(message, fmt=JSON):
+    """
+    Encode a message in a wire format
+
+    Args:
+        message: JSON-serializable value
+        fmt: Format name
+
+    Returns:
+        str for the JSON formats, bytes for MessagePack
+    """
+    if fmt == JSON:
+        return dumps_json(message)
+    message = compact_message(message)
+    if fmt == MSGPACK:
+        return msgpack.packb(message)
+    return dumps_json(message)
+
+
+def decode(data):
+    """
+    Decode an incoming WebSocket message
+
+    Args:
+        data: JSON text or MessagePack bytes
+
+    Returns:
+        The decoded value, or None if it cannot be decoded
+    """
+    try:
+        if isinstance(data, bytes):
+            if msgpack is not None:
+                return msgpack.unpackb(data)
+            data = data.decode()
+        return json.loads(data)
+    except ValueError:
+        return None
+
+
+def response(content, fmt=JSON, status_code=200):
+    """
+    Build an HTTP response in a wire format
+
+    Returning a Response directly also skips FastAPI's generic encoder.
+
+    Args:
+        content: JSON-serializable value
+        fmt: Format name
+        status_code: HTTP status code
+
+    Returns:
+        Response
+    """
+    body = encode(content, fmt)
+    return Response(body, status_code=status_code, media_type=MEDIA_TYPES[fmt])
+
+
+class FastJSONResponse(Response):
+    """Default response class: compact JSON encoded with orjson when available"""
+
+    media_type = 'application/json'
+
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content)
+        return dumps_json(content).encode('utf-8')
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for batch analysis and the transposition table
+Uses shallow searches to keep the run short
+"""
+
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from engine.ai_player import AIPlayer
+from engine.analysis import AnalysisPool, analyse_many
+from engine.arena import opening_fens
+from engine.board import Board
+from engine.game_engine import GameEngine
+from engine.transposition import TranspositionTable, zobrist_key
+from server.api import app
+
+
+def test_zobrist_key_follows_position():
+    """Equal positions hash equally, a move or the side to move changes the key"""
+    board = Board()
+    assert zobrist_key(board) == zobrist_key(Board.from_fen(board.to_fen()))
+
+    moved = board.copy()
+    moved.move_piece((6, 0), (5, 0))
+    assert zobrist_key(moved) != zobrist_key(board)
+
+    other_side = Board.from_fen(board.to_fen().replace(' w', ' b'))
+    assert zobrist_key(other_side) != zobrist_key(board)
+
+
+def test_transposition_table_keeps_search_result():
+    """A search with a transposition table finds the same score as without"""
+    fen = opening_fens()[1]
+    plain = AIPlayer(depth=2, color='black')
+    plain.search(Board.from_fen(fen))
+
+    tt = TranspositionTable()
+    cached = AIPlayer(depth=2, color='black', tt=tt)
+    cached.search(Board.from_fen(fen))
+    assert cached.score == plain.score
+    assert len(tt) > 0
+
+    # Searching again answers from the table
+    _, stats = cached.search(Board.from_fen(fen))
+    assert cached.score == plain.score
+    assert stats.tt_hits > 0
+
+
+def test_multi_pv_lines():
+    """The best line matches a normal search and lines are ordered by score"""
+    board = Board.from_fen(opening_fens()[1])
+    plain = AIPlayer(depth=2, color='black')
+    plain.search(board)
+
+    lines, _ = AIPlayer(depth=2, color='black').analyse(board, k=3)
+    assert len(lines) == 3
+    assert lines[0]['score'] == plain.score
+    assert [line['score'] for line in lines] == sorted((line['score'] for line in lines), reverse=True)
+    for line in lines:
+        assert line['pv'][0] == line['move']
+        assert len(line['pv']) == 2
+
+    engine = GameEngine()
+    game_id = engine.new_game(ai_enabled=False)
+    result = engine.analyse(game_id, k=2, depth=1)
+    assert result['success'] and result['player'] == 'red'
+    assert len(result['lines']) == 2
+
+
+def test_analyse_stopped_without_budget():
+    """Stopping an unbudgeted analysis returns the lines finished so far"""
+    board = Board()
+    for stop in (False, True):
+        ai = AIPlayer(depth=3, color='red')
+        result = []
+        thread = threading.Thread(target=lambda: result.append(ai.analyse(board, 2)))
+        thread.start()
+        deadline = time.perf_counter() + 20
+        while not ai._root_lines and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        ai.stop() if stop else ai.move_now()
+        thread.join(5)
+        assert not thread.is_alive() and result
+        lines, _ = result[0]
+        assert 1 <= len(lines) <= 2
+        for line in lines:
+            assert line['move'][1] in board.get_valid_moves(*line['move'][0])
+
+
+def test_analyse_rejects_bad_k():
+    """k below 1 is an error for library callers and WebSocket clients alike"""
+    engine = GameEngine()
+    game_id = engine.new_game(ai_enabled=False)
+    for k in (0, -2):
+        for call in (lambda: AIPlayer(depth=1, color='red').analyse(Board(), k),
+                     lambda: engine.analyse(game_id, k=k, depth=1)):
+            try:
+                call()
+                assert False, f"k={k} accepted"
+            except ValueError:
+                pass
+
+    with TestClient(app).websocket_connect('/ws') as websocket:
+        websocket.send_json({'id': 1, 'type': 'new_game', 'ai_enabled': False})
+        while websocket.receive_json()['type'] != 'response':
+            pass
+        for message_id, k in enumerate((0, -1, 11), 2):
+            websocket.send_json({'id': message_id, 'type': 'analyse', 'k': k})
+            response = websocket.receive_json()
+            assert response['id'] == message_id and not response['ok']
+            assert 'k must be between' in response['error']
+
+        # The connection is still usable
+        websocket.send_json({'id': 9, 'type': 'analyse', 'k': 1, 'time_limit': 0.1})
+        response = websocket.receive_json()
+        assert response['ok'] and len(response['data']['lines']) == 1
+
+
+def test_analyse_many():
+    """Every position gets a result with its index, invalid FENs an error"""
+    fens = opening_fens()[:3] + ['not a fen']
+    results = sorted(analyse_many(fens, depth=1, workers=1), key=lambda r: r['index'])
+
+    assert [r['index'] for r in results] == [0, 1, 2, 3]
+    for result, fen in zip(results[:3], fens):
+        assert result['fen'] == fen
+        assert result['move'] is not None
+        assert result['stats']['nodes'] > 0
+    assert 'error' in results[3]
+
+    timed = next(analyse_many(fens[:1], time_limit=0.5, workers=1))
+    assert timed['move'] is not None and timed['depth'] >= 1
+
+
+def test_analysis_pool_and_batch_endpoint():
+    """The shared pool and the batch endpoint return one result per position"""
+    fens = opening_fens()[:5] + ['not a fen']
+    for workers in (1, 2):
+        pool = AnalysisPool(workers, chunk_size=2)
+        try:
+            results = sorted(pool.analyse(list(enumerate(fens)), depth=1, max_nodes=500), key=lambda r: r['index'])
+        finally:
+            pool.close()
+        assert [r['index'] for r in results] == list(range(6))
+        assert all(r['move'] is not None for r in results[:5])
+        assert 'error' in results[5]
+
+    with TestClient(app) as client:
+        response = client.post('/api/analyse/batch', json={'fens': fens, 'depth': 1})
+        assert response.status_code == 200
+        results = [json.loads(line) for line in response.text.splitlines()]
+        assert sorted(r['index'] for r in results) == list(range(6))
+        assert sum('error' in r for r in results) == 1
+        assert client.post('/api/analyse/batch', json={'fens': []}).status_code == 400
+
+
+def main():
+    print("Testing batch analysis")
+    print("=" * 60)
+    test_zobrist_key_follows_position()
+    test_transposition_table_keeps_search_result()
+    test_multi_pv_lines()
+    test_analyse_stopped_without_budget()
+    test_analyse_rejects_bad_k()
+    test_analyse_many()
+    test_analysis_pool_and_batch_endpoint()
+    print("✓ All analysis tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the self-play arena
+Covers FEN round trips, Elo estimation and a short headless match
+"""
+
+from engine.board import Board, START_FEN
+from engine.arena import opening_fens, elo_difference, run_match, summarize
+
+
+def test_fen_round_trip():
+    """Board positions survive a FEN round trip"""
+    board = Board()
+    assert board.to_fen() == START_FEN
+
+    board.move_piece((7, 7), (7, 4))
+    restored = Board.from_fen(board.to_fen())
+    assert restored.to_fen() == board.to_fen()
+    assert restored.current_player == 'black'
+    assert restored.get_piece(7, 4).piece_type == 'cannon'
+
+
+def test_opening_fens_are_valid():
+    """Built-in openings produce distinct, loadable positions"""
+    fens = opening_fens()
+    assert len(set(fens)) == len(fens)
+    for fen in fens:
+        Board.from_fen(fen)
+
+
+def test_elo_difference():
+    """Elo estimate is symmetric and brackets the point estimate"""
+    elo, lower, upper = elo_difference(10, 0, 10)
+    assert elo == 0.0
+    assert lower < 0.0 < upper
+
+    elo, lower, upper = elo_difference(15, 2, 3)
+    assert elo > 0.0
+    assert lower < elo < upper
+    assert elo_difference(3, 2, 15)[0] == -elo
+
+
+def test_short_match():
+    """A short match runs in worker processes and produces a summary"""
+    records = run_match({'depth': 1}, {'depth': 1}, games=2, workers=2, max_plies=4)
+    assert [r['index'] for r in records] == [0, 1]
+    assert {r['a_color'] for r in records} == {'red', 'black'}
+
+    summary = summarize(records)
+    assert summary['games'] == 2
+    assert summary['a']['moves'] > 0
+    assert summary['a']['avg_nodes'] > 0
+
+
+def main():
+    print("Testing self-play arena")
+    print("=" * 60)
+    test_fen_round_trip()
+    test_opening_fens_are_valid()
+    test_elo_difference()
+    test_short_match()
+    print("✓ All arena tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
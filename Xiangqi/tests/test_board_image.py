@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Tests for headless board images
+"""
+
+from engine.board import Board
+
+try:
+    from clients.pygame_client.headless import BoardImageRenderer
+except ImportError:  # pygame not installed
+    BoardImageRenderer = None
+
+
+def test_render_png_is_cached_by_position():
+    """Boards render to PNG without a display; the same position is drawn once"""
+    if BoardImageRenderer is None:
+        print("pygame not installed, skipped")
+        return
+    renderer = BoardImageRenderer(width=180)
+    board = Board()
+    png = renderer.render_png(board)
+    assert png.startswith(b'\x89PNG')
+    assert renderer.render_fen(board.to_fen()) == png
+    assert (renderer.misses, renderer.hits) == (1, 1)
+
+    board.move_piece((7, 7), (7, 4))
+    assert renderer.render_png(board) != png
+    assert renderer.render_png(board, width=90) != renderer.render_png(board)
+    assert renderer.misses == 3
+
+
+def main():
+    print("Testing board images")
+    print("=" * 60)
+    test_render_png_is_cached_by_position()
+    print("✓ All board image tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Tests for WebSocket fan-out
+Uses a stand-in socket so the broadcaster can be tested without a server
+"""
+
+import asyncio
+import json
+
+from server.broadcast import Broadcaster, Subscriber
+
+
+class FakeWebSocket:
+    """Records sent messages; can be made to stall like a slow client"""
+
+    def __init__(self, stalled=False):
+        self.sent = []
+        self.closed = False
+        self.stalled = stalled
+
+    async def send_text(self, text):
+        if self.stalled:
+            await asyncio.sleep(3600)
+        self.sent.append(json.loads(text))
+
+    async def close(self):
+        self.closed = True
+
+
+def test_many_subscribers_receive_events():
+    """Every subscriber of a game gets each published event"""
+    async def scenario():
+        broadcaster = Broadcaster()
+        sockets = [FakeWebSocket() for _ in range(50)]
+        for websocket in sockets:
+            broadcaster.subscribe('game', websocket)
+
+        broadcaster.publish('game', {'type': 'move', 'n': 1})
+        broadcaster.publish('game', {'type': 'game_deleted'}, close=True)
+        await asyncio.sleep(0.05)
+
+        for websocket in sockets:
+            assert [m['type'] for m in websocket.sent] == ['move', 'game_deleted']
+            assert websocket.closed
+        assert broadcaster.subscriber_count() == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_is_coalesced_and_dropped():
+    """A stalled client neither blocks publishing nor other subscribers"""
+    async def scenario():
+        broadcaster = Broadcaster(max_queue=2, send_timeout=0.05)
+        slow = FakeWebSocket(stalled=True)
+        fast = FakeWebSocket()
+        broadcaster.subscribe('game', slow)
+        broadcaster.subscribe('game', fast)
+
+        for n in range(10):
+            broadcaster.publish('game', {'type': 'move', 'n': n})
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.2)
+
+        assert fast.sent[-1]['n'] == 9
+        assert broadcaster.messages_coalesced > 0
+        assert broadcaster.slow_disconnects == 1
+        assert slow.closed
+        assert broadcaster.subscriber_count() == 1
+
+    asyncio.run(scenario())
+
+
+def test_responses_survive_coalescing():
+    """A full queue drops older events but keeps direct messages like responses"""
+    async def scenario():
+        broadcaster = Broadcaster(max_queue=2)
+        subscriber = Subscriber(None, FakeWebSocket(), broadcaster.max_queue)
+        broadcaster.follow(subscriber, 'game')  # No sender task, so the queue fills up
+
+        broadcaster.send(subscriber, {'type': 'initial_state'})
+        for n in range(5):
+            broadcaster.publish('game', {'type': 'move', 'n': n})
+            broadcaster.send(subscriber, {'type': 'response', 'id': n})
+
+        queued = []
+        while not subscriber.queue.empty():
+            payload, _ = await subscriber.dequeue()
+            queued.append(json.loads(payload))
+        assert [m['type'] for m in queued if m['type'] != 'move'] == ['initial_state'] + ['response'] * 5
+        assert [m['id'] for m in queued if m['type'] == 'response'] == list(range(5))
+        assert [m['n'] for m in queued if m['type'] == 'move'] == [4]
+        assert broadcaster.messages_coalesced == 4
+        assert subscriber.replaceable == 0
+
+    asyncio.run(scenario())
+
+
+def main():
+    print("Testing WebSocket fan-out")
+    print("=" * 60)
+    test_many_subscribers_receive_events()
+    test_slow_subscriber_is_coalesced_and_dropped()
+    test_responses_survive_coalescing()
+    print("✓ All broadcast tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for game records and the game archive
+"""
+
+import os
+import tempfile
+
+from engine.archive import iter_games
+from engine.game_engine import GameEngine
+from engine.notation import move_to_iccs, iccs_to_move, export_game, parse_game
+
+
+def test_iccs_round_trip():
+    """ICCS squares map to board rows and columns both ways"""
+    assert move_to_iccs(((7, 7), (7, 4))) == 'h2e2'  # Central cannon
+    assert iccs_to_move('h9-g7') == ((0, 7), (2, 6))
+
+    moves = [((7, 7), (7, 4)), ((0, 7), (2, 6)), ((9, 7), (7, 6))]
+    record = export_game(moves, headers={'Red': 'Alice'}, result='*')
+    assert '1. h2e2 h9g7 2. h0g2 *' in record
+    parsed = parse_game(record)
+    assert parsed['moves'] == moves and parsed['headers']['Red'] == 'Alice'
+
+    try:
+        parse_game('1. h2e2 h2e3 *')
+        assert False, "illegal move accepted"
+    except ValueError:
+        pass
+
+
+def test_archive_and_import():
+    """Resigned and deleted games are archived, read back lazily and can be continued"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'games.pgn')
+        engine = GameEngine(archive_path=path)
+
+        resigned = engine.new_game(ai_enabled=False)
+        assert engine.make_move(resigned, (7, 7), (7, 4))['success']
+        assert engine.resign(resigned)['success']  # Black resigns
+
+        deleted = engine.new_game(ai_enabled=False)
+        assert engine.make_move(deleted, (6, 0), (5, 0))['success']
+        record = engine.export_game(deleted)
+        engine.delete_game(deleted)
+        engine.delete_game(resigned)  # Already archived, not written twice
+        engine.archive.flush()
+
+        games = list(iter_games(path, validate=True))
+        assert [game['result'] for game in games] == ['1-0', '*']
+        assert games[1]['moves'] == [((6, 0), (5, 0))]
+
+        game_id = engine.import_game(record, ai_enabled=False)
+        board = engine.get_board(game_id)
+        assert board.current_player == 'black' and board.get_piece(5, 0).piece_type == 'soldier'
+        engine.archive.close()
+
+
+def main():
+    print("Testing game records")
+    print("=" * 60)
+    test_iccs_round_trip()
+    test_archive_and_import()
+    print("✓ All notation tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for pondering
+Checks that the expected reply is answered from the background search
+"""
+
+import threading
+import time
+
+from engine.ai_player import AIPlayer
+from engine.board import Board
+from engine.game_engine import GameEngine
+
+
+def test_ponder_hit_and_miss():
+    """The expected reply reuses the ponder search, another reply stops it"""
+    engine = GameEngine(ponder=True)
+    game_id = engine.new_game(ai_enabled=True, ai_color='black', ai_depth=2)
+    assert engine.make_move(game_id, (6, 0), (5, 0))['success']
+    assert engine.make_ai_move(game_id)['ponder_hit'] is False
+
+    # Play the reply the AI expects
+    expected = engine._ponders[game_id].expected_move
+    assert engine.make_move(game_id, *expected)['success']
+    result = engine.make_ai_move(game_id)
+    assert result['success'] and result['ponder_hit']
+    assert engine.ponder_hits == 1
+
+    # Play something else: the ponder search is stopped right away
+    expected = engine._ponders[game_id].expected_move
+    board = engine.get_board(game_id)
+    other = next(((row, col), to_pos)
+                 for row in range(10) for col in range(9)
+                 if board.get_piece(row, col) and board.get_piece(row, col).color == 'red'
+                 for to_pos in board.get_valid_moves(row, col)
+                 if ((row, col), to_pos) != expected)
+    assert engine.make_move(game_id, *other)['success']
+    assert game_id not in engine._ponders
+    assert engine.ponder_misses == 1
+
+    result = engine.make_ai_move(game_id)
+    assert result['success'] and not result['ponder_hit']
+    engine.delete_game(game_id)
+    assert not engine._ponders
+
+
+def test_move_now_returns_best_so_far():
+    """A search told to move now returns a legal move at once, stop() returns none"""
+    board = Board()
+    for stop in (False, True):
+        ai = AIPlayer(depth=4, color='red')
+        result = []
+        thread = threading.Thread(target=lambda: result.append(ai.search(board)))
+        thread.start()
+        time.sleep(0.2)
+        ai.stop() if stop else ai.move_now()
+        thread.join(5)
+        assert not thread.is_alive()
+        move, _ = result[0]
+        if stop:
+            assert move is None
+        else:
+            assert move[1] in board.get_valid_moves(*move[0])
+            assert ai.progress()[1] > 0
+
+
+def test_move_now_does_not_stick_with_multipv():
+    """A move_now() on a multi-PV player only ends the search it interrupted"""
+    board = Board()
+    ai = AIPlayer(depth=3, color='red', multipv=2, time_limit=5)
+    result = []
+    thread = threading.Thread(target=lambda: result.append(ai.search(board)))
+    thread.start()
+    time.sleep(0.2)
+    ai.move_now()
+    thread.join(10)
+    assert not thread.is_alive()
+
+    move, _ = ai.search(board)
+    assert move is not None and move[1] in board.get_valid_moves(*move[0])
+
+
+def test_ponder_dropped_with_game():
+    """Evicted games and stopped AIs leave no ponder behind, and ponders are capped"""
+    engine = GameEngine(ponder=True, session_capacity=1)
+    game_id = engine.new_game(ai_enabled=True, ai_color='black', ai_depth=2)
+    assert engine.make_move(game_id, (6, 0), (5, 0))['success']
+    assert engine.make_ai_move(game_id)['success']
+    ponder = engine._ponders[game_id]
+
+    # A second game spills the first out of memory
+    engine.new_game()
+    assert game_id not in engine._ponders
+    ponder.wait()
+    assert not ponder.is_running()
+
+    # stop_ai ends the ponder of a resident game
+    assert engine.make_move(game_id, (6, 2), (5, 2))['success']
+    assert engine.make_ai_move(game_id)['success']
+    assert game_id in engine._ponders
+    assert engine.stop_ai(game_id)
+    assert game_id not in engine._ponders
+
+    # No new ponder starts while max_ponders are running
+    engine = GameEngine(ponder=True, max_ponders=0)
+    game_id = engine.new_game(ai_enabled=True, ai_color='black', ai_depth=2)
+    assert engine.make_move(game_id, (6, 0), (5, 0))['success']
+    assert engine.make_ai_move(game_id)['success']
+    assert not engine._ponders and engine.ponder_skipped == 1
+
+
+def main():
+    print("Testing pondering")
+    print("=" * 60)
+    test_ponder_hit_and_miss()
+    test_ponder_dropped_with_game()
+    test_move_now_returns_best_so_far()
+    test_move_now_does_not_stick_with_multipv()
+    print("✓ All ponder tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
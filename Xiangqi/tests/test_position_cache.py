@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the cross-game position cache
+"""
+
+import os
+import tempfile
+
+from engine.board import Board
+from engine.game_engine import GameEngine
+from engine.position_cache import PositionCache, settings_key
+from engine.skill import skill_settings
+
+
+def test_games_share_ai_results():
+    """A second game reaching the same position gets the AI move without searching"""
+    engine = GameEngine(position_cache_size=100)
+    first = engine.new_game(ai_color='black', ai_depth=2)
+    second = engine.new_game(ai_color='black', ai_depth=2)
+    for game_id in (first, second):
+        assert engine.make_move(game_id, (6, 0), (5, 0))['success']
+
+    searched = engine.make_ai_move(first)
+    cached = engine.make_ai_move(second)
+    assert not searched['cache_hit'] and cached['cache_hit']
+    assert cached['move'] == searched['move']
+    assert cached['stats']['nodes'] == 0
+    assert engine.position_cache.hit_rate() == 0.5
+
+    # Other settings and randomized levels do not share results
+    deeper = engine.new_game(ai_color='black', ai_depth=1)
+    assert engine.make_move(deeper, (6, 0), (5, 0))['success']
+    assert not engine.make_ai_move(deeper)['cache_hit']
+    assert settings_key(skill_settings('beginner')) is None
+
+
+def test_disk_tier_survives_restart():
+    """Results written to the database are found by a new cache"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'positions.db')
+        key = PositionCache.make_key(Board(), settings_key(skill_settings(None, 2)))
+
+        cache = PositionCache(capacity=10, path=path)
+        cache.put(key, ((9, 1), (7, 2)), 12.0)
+        cache.close()
+
+        cache = PositionCache(capacity=10, path=path)
+        assert cache.get(key) == (((9, 1), (7, 2)), 12.0)
+        assert cache.get(key) is not None
+        assert (cache.disk_hits, cache.memory_hits) == (1, 1)
+        cache.close()
+
+
+def main():
+    print("Testing position cache")
+    print("=" * 60)
+    test_games_share_ai_results()
+    test_disk_tier_survives_restart()
+    print("✓ All position cache tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
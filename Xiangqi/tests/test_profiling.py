@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the profiling hooks
+Checks that hooks come off cleanly and that a profiled search leaves its output files
+"""
+
+import glob
+import os
+import pstats
+import tempfile
+
+from engine import profiling
+from engine.ai_player import AIPlayer
+from engine.board import Board
+
+
+def hooked_methods():
+    """Current function of every hooked method"""
+    from engine import ai_player, board
+    modules = {'board': board, 'ai_player': ai_player}
+    return {(class_name, method_name): getattr(modules[module_name], class_name).__dict__[method_name]
+            for module_name, class_name, method_name in profiling.HOOKED_METHODS}
+
+
+def test_enable_disable_restores_methods():
+    """disable() puts back the exact original functions, also after enabling twice"""
+    originals = hooked_methods()
+    profiling.enable()
+    profiling.enable()
+    try:
+        assert profiling.is_enabled()
+        for key, func in hooked_methods().items():
+            assert func is not originals[key], key
+    finally:
+        profiling.disable()
+    assert not profiling.is_enabled()
+    assert hooked_methods() == originals
+    assert profiling.profile_search() is profiling._NULL_CONTEXT
+
+
+def test_profiled_search_output():
+    """A profiled search updates the counters and writes .pstats and .collapsed files"""
+    profiling.reset()
+    with tempfile.TemporaryDirectory() as tmp:
+        profiling.enable(output_dir=tmp)
+        try:
+            move, stats = AIPlayer(depth=2, color='red').search(Board())
+        finally:
+            profiling.disable()
+        assert move is not None
+
+        counters = profiling.get_counters()
+        assert counters['_minimax']['calls'] >= stats.nodes
+        assert counters['get_valid_moves']['calls'] > 0
+        assert all(counter['seconds'] >= 0 for counter in counters.values())
+
+        collapsed, = glob.glob(os.path.join(tmp, 'search-*.collapsed'))
+        with open(collapsed, encoding='utf-8') as f:
+            lines = [line.rsplit(' ', 1) for line in f.read().splitlines()]
+        assert all(stack.startswith('search') and int(samples) >= 1 for stack, samples in lines)
+        assert any(stack.startswith('search;_minimax;_minimax') for stack, _ in lines)
+
+        pstats_file, = glob.glob(os.path.join(tmp, 'search-*.pstats'))
+        assert pstats.Stats(pstats_file).total_calls > 0
+    profiling.reset()
+    assert profiling.get_counters() == {}
+
+
+def main():
+    print("Testing profiling hooks")
+    print("=" * 60)
+    test_enable_disable_restores_methods()
+    test_profiled_search_output()
+    print("✓ All profiling tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the AI compute scheduler
+Checks concurrency limits, short-job priority, rejection and cancellation
+"""
+
+import asyncio
+import threading
+import time
+
+from server.scheduler import AIScheduler, SchedulerFull, JobCancelled
+
+
+def test_limits_and_short_jobs_first():
+    """Per-client and global limits hold, queued short jobs run before long ones"""
+    async def run():
+        scheduler = AIScheduler(max_concurrent=2, per_client=1, per_client_queue=3, aging=0.0)
+        active = {'now': 0, 'peak': 0, 'alice': 0, 'alice_peak': 0}
+        order = []
+        lock = threading.Lock()
+
+        def job(name, client, seconds):
+            with lock:
+                active['now'] += 1
+                active['peak'] = max(active['peak'], active['now'])
+                if client == 'alice':
+                    active['alice'] += 1
+                    active['alice_peak'] = max(active['alice_peak'], active['alice'])
+            time.sleep(seconds)
+            with lock:
+                active['now'] -= 1
+                if client == 'alice':
+                    active['alice'] -= 1
+                order.append(name)
+            return name
+
+        tasks = [
+            asyncio.create_task(scheduler.submit(job, 'a1', 'alice', 0.05, client='alice', cost=0.05)),
+            asyncio.create_task(scheduler.submit(job, 'b1', 'bob', 0.1, client='bob', cost=0.1)),
+            asyncio.create_task(scheduler.submit(job, 'a-long', 'alice', 0.01, client='alice', cost=5.0)),
+            asyncio.create_task(scheduler.submit(job, 'a-short', 'alice', 0.01, client='alice', cost=0.01)),
+        ]
+        await asyncio.sleep(0)
+        try:
+            await scheduler.submit(job, 'a4', 'alice', 0.0, client='alice')
+            assert False, "client quota not enforced"
+        except SchedulerFull:
+            pass
+
+        results = await asyncio.gather(*tasks)
+        assert results == ['a1', 'b1', 'a-long', 'a-short']
+        assert active['peak'] <= 2 and active['alice_peak'] == 1
+        assert order.index('a-short') < order.index('a-long')
+        assert scheduler.completed == 4 and scheduler.rejected == 1
+        assert scheduler.queue_depth() == 0 and scheduler.running_count() == 0
+
+    asyncio.run(run())
+
+
+def test_cancel_queued_and_running():
+    """cancel() drops a queued job and stops a running one through on_cancel"""
+    async def run():
+        scheduler = AIScheduler(max_concurrent=1)
+        stop = threading.Event()
+
+        def search():
+            stop.wait(5)
+            return 'stopped' if stop.is_set() else 'finished'
+
+        running = asyncio.create_task(scheduler.submit(search, client='a', key='g1', on_cancel=stop.set))
+        queued = asyncio.create_task(scheduler.submit(search, client='b', key='g2'))
+        await asyncio.sleep(0.05)
+        assert scheduler.running_count() == 1 and scheduler.queue_depth() == 1
+
+        assert scheduler.cancel('g2') == 1
+        assert scheduler.queue_depth() == 0
+        assert scheduler.cancel('g1') == 1
+        for task in (running, queued):
+            try:
+                await task
+                assert False, "cancelled job returned"
+            except JobCancelled:
+                pass
+
+        # Cancelling the awaiting task also stops the search
+        stop.clear()
+        task = asyncio.create_task(scheduler.submit(search, client='a', on_cancel=stop.set))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        assert stop.is_set() and scheduler.running_count() == 0
+        assert scheduler.cancelled == 3
+
+    asyncio.run(run())
+
+
+def main():
+    print("Testing AI scheduler")
+    print("=" * 60)
+    test_limits_and_short_jobs_first()
+    test_cancel_queued_and_running()
+    print("✓ All scheduler tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for AI search statistics and the /metrics endpoint
+Uses shallow searches to keep the run short
+"""
+
+from fastapi.testclient import TestClient
+
+from engine.ai_player import AIPlayer
+from engine.board import Board
+from engine.search_stats import SearchMetrics
+from engine.transposition import TranspositionTable
+from server.api import app
+
+
+def test_search_records_counters():
+    """A search counts nodes, depth, cutoffs and table hits"""
+    tt = TranspositionTable(capacity=50000)
+    _, stats = AIPlayer(depth=2, color='red', tt=tt).search(Board())
+    assert stats.nodes > 0
+    assert stats.max_depth >= 2
+    assert 0 < stats.beta_cutoffs and stats.first_move_cutoffs <= stats.beta_cutoffs
+    assert stats.tt_probes > 0
+    assert stats.elapsed > 0 and stats.nps > 0
+
+    # Searching the same position again finds the stored results
+    _, again = AIPlayer(depth=2, color='red', tt=tt).search(Board())
+    assert again.tt_hits > 0
+    assert again.nodes < stats.nodes
+    assert again.to_dict()['tt_hits'] == again.tt_hits
+
+    metrics = SearchMetrics()
+    metrics.record(stats)
+    metrics.record(again)
+    assert metrics.searches == 2
+    assert metrics.totals['nodes'] == stats.nodes + again.nodes
+    assert f'xiangqi_ai_tt_hits_total {again.tt_hits + stats.tt_hits}' in metrics.to_prometheus()
+
+
+def test_metrics_endpoint():
+    """/metrics exposes search totals and the gauges of the server components"""
+    client = TestClient(app)
+    game_id = client.post('/api/game/new', json={'ai_color': 'red', 'ai_depth': 1}).json()['game_id']
+    assert client.post(f'/api/game/{game_id}/ai-move').json()['success']
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/plain')
+    values = {}
+    for line in response.text.splitlines():
+        if not line.startswith('#'):
+            name, value = line.split()
+            values[name] = float(value)
+    for name in ('xiangqi_ai_searches_total', 'xiangqi_ai_nodes_total', 'xiangqi_ai_tt_hits_total',
+                 'xiangqi_ai_search_seconds_max', 'xiangqi_games_active', 'xiangqi_ws_subscribers',
+                 'xiangqi_ai_queue_depth'):
+        assert name in values, name
+    assert values['xiangqi_ai_searches_total'] >= 1
+    assert values['xiangqi_ai_nodes_total'] > 0
+    assert '# TYPE xiangqi_ai_nodes_total counter' in response.text
+
+
+def main():
+    print("Testing search statistics")
+    print("=" * 60)
+    test_search_records_counters()
+    test_metrics_endpoint()
+    print("✓ All search statistics tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
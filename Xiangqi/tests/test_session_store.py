@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Tests for the game session store
+Verifies that games moved out of memory are restored on access
+"""
+
+import os
+import tempfile
+
+from engine.game_engine import GameEngine
+
+
+def test_lru_spill_and_reload():
+    """The least recently used game is spilled and comes back unchanged"""
+    engine = GameEngine(session_capacity=2)
+    first = engine.new_game(ai_enabled=False)
+    assert engine.make_move(first, (7, 7), (7, 4))['success']
+    assert engine.make_move(first, (0, 7), (2, 6))['success']
+    fen = engine.get_board(first).to_fen()
+
+    engine.new_game(ai_enabled=False)
+    engine.new_game(ai_enabled=False)
+    assert engine.games.resident_count() == 2
+    assert engine.games.spills == 1
+
+    board = engine.get_board(first)
+    assert engine.games.loads == 1
+    assert board.to_fen() == fen
+    assert len(board.move_history) == 2
+    assert board.current_player == 'red'
+
+
+def test_idle_games_are_spilled():
+    """Games idle longer than the TTL leave memory but stay playable"""
+    engine = GameEngine(session_ttl=0)
+    game_id = engine.new_game(ai_enabled=True, ai_depth=2)
+    engine.new_game(ai_enabled=False)
+    assert engine.games.resident_count() == 1
+
+    state = engine.get_game_state(game_id)
+    assert state['ai_enabled'] is True
+    assert engine.get_game(game_id)['ai'].depth == 2
+
+
+def test_delete_spilled_game():
+    """Deleting removes games from disk as well as memory"""
+    engine = GameEngine(session_capacity=1)
+    game_id = engine.new_game(ai_enabled=False)
+    engine.new_game(ai_enabled=False)
+    assert engine.delete_game(game_id)
+    assert engine.get_game(game_id) is None
+    assert not engine.delete_game(game_id)
+
+
+def test_save_after_spill_keeps_change():
+    """A game spilled while a request held it keeps the move saved afterwards"""
+    engine = GameEngine(session_capacity=1)
+    game_id = engine.new_game(ai_enabled=False)
+    game = engine.get_game(game_id)
+    engine.new_game(ai_enabled=False)  # Spills the game being played
+
+    game['board'].move_piece((7, 7), (7, 4))
+    assert engine.games.save(game_id, game)
+    assert len(engine.get_board(game_id).move_history) == 1
+
+    # Spilled and reloaded as another object before the save
+    engine.new_game(ai_enabled=False)
+    assert engine.get_game(game_id) is not game
+    game['board'].move_piece((0, 7), (2, 6))
+    assert engine.games.save(game_id, game)
+    assert engine.get_game(game_id) is game
+
+    assert engine.delete_game(game_id)
+    assert not engine.games.save(game_id, game)
+    assert engine.get_game(game_id) is None
+
+
+def test_shared_state_between_engines():
+    """Two engines on one database file see each other's games and moves"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'sessions.db')
+        worker_a = GameEngine(session_db=path, session_shared=True)
+        worker_b = GameEngine(session_db=path, session_shared=True)
+
+        game_id = worker_a.new_game(ai_enabled=False)
+        assert worker_b.make_move(game_id, (7, 7), (7, 4))['success']
+        assert worker_a.get_board(game_id).current_player == 'black'
+        assert worker_a.make_move(game_id, (0, 7), (2, 6))['success']
+        assert worker_b.get_board(game_id).to_fen() == worker_a.get_board(game_id).to_fen()
+
+        # A stale copy is rejected instead of overwriting the other worker's move
+        game = worker_a.get_game(game_id)
+        assert worker_b.make_move(game_id, (9, 1), (7, 2))['success']
+        game['board'].move_piece((9, 7), (7, 6))
+        assert not worker_a.games.save(game_id, game)
+        assert len(worker_a.get_board(game_id).move_history) == 3
+
+        assert worker_b.delete_game(game_id)
+        assert worker_a.get_game(game_id) is None
+
+
+def main():
+    print("Testing session store")
+    print("=" * 60)
+    test_lru_spill_and_reload()
+    test_idle_games_are_spilled()
+    test_delete_spilled_game()
+    test_save_after_spill_keeps_change()
+    test_shared_state_between_engines()
+    print("✓ All session store tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
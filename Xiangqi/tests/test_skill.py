@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for AI skill levels and server-wide search limits
+"""
+
+from engine.ai_player import AIPlayer
+from engine.board import Board
+from engine.game_engine import GameEngine
+from engine.skill import skill_settings, apply_limits
+
+
+def test_node_budget_bounds_search():
+    """A node budget stops the search early but still returns a move"""
+    ai = AIPlayer(depth=4, color='red', max_nodes=200)
+    move, stats = ai.search(Board())
+    assert move is not None
+    assert stats.nodes <= 201
+
+
+def test_noisy_level_picks_among_best_lines():
+    """With multipv the AI plays one of its best moves"""
+    board = Board()
+    lines, _ = AIPlayer(depth=1, color='red').analyse(board, k=4)
+    ai = AIPlayer(depth=1, color='red', noise=1000, multipv=4, seed=7)
+    moves = {ai.search(board)[0] for _ in range(5)}
+    assert moves <= {line['move'] for line in lines}
+
+
+def test_limits_and_levels():
+    """Server limits clamp every level, unknown levels are rejected"""
+    settings = apply_limits(skill_settings('expert'), max_depth=3, max_nodes=1000, max_time=1.0)
+    assert (settings['depth'], settings['max_nodes'], settings['time_limit']) == (3, 1000, 1.0)
+
+    plain = apply_limits(skill_settings(None, 9), max_nodes=500)
+    assert plain['depth'] == 9 and plain['max_nodes'] == 500
+
+    try:
+        skill_settings('grandmaster')
+        assert False, "unknown level accepted"
+    except ValueError:
+        pass
+
+    engine = GameEngine(session_capacity=1, max_ai_nodes=100)
+    game_id = engine.new_game(skill='easy')
+    engine.new_game()  # Spills the first game, which is then rebuilt from its stored settings
+    game = engine.get_game(game_id)
+    assert game['ai_settings']['skill'] == 'easy'
+    assert game['ai'].max_nodes == 100 and game['ai'].multipv == 3
+    assert engine.get_game_state(game_id)['skill'] == 'easy'
+
+
+def main():
+    print("Testing skill levels")
+    print("=" * 60)
+    test_node_budget_bounds_search()
+    test_noisy_level_picks_among_best_lines()
+    test_limits_and_levels()
+    print("✓ All skill tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
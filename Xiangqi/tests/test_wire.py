@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests for the compact wire formats
+Checks that compact states are small and lose no information
+"""
+
+import json
+
+from engine.board import Board
+from engine.game_engine import GameEngine
+from server import wire
+
+
+def _played_game():
+    """Create a game with a few moves played"""
+    engine = GameEngine()
+    game_id = engine.new_game(ai_enabled=False)
+    for from_pos, to_pos in [((6, 0), (5, 0)), ((3, 0), (4, 0)), ((7, 1), (7, 4)), ((2, 1), (2, 4))]:
+        assert engine.make_move(game_id, from_pos, to_pos)['success']
+    return engine.get_game_state(game_id)
+
+
+def test_compact_state_is_small_and_complete():
+    """The compact state is far smaller and rebuilds the same position"""
+    state = _played_game()
+    compact = wire.compact_state(state)
+
+    full_size = len(json.dumps(state))
+    compact_size = len(wire.encode(state, wire.COMPACT))
+    assert compact_size * 8 < full_size, (compact_size, full_size)
+    assert 'start_fen' not in compact
+
+    board = Board()
+    for from_pos, to_pos in wire.unpack_moves(compact['moves']):
+        assert board.make_move((from_pos, to_pos))
+    assert board.to_fen() == compact['fen']
+
+
+def test_negotiation():
+    """Accept headers and subprotocols select the format, JSON otherwise"""
+    assert wire.negotiate(None) == wire.JSON
+    assert wire.negotiate('text/html, application/vnd.xiangqi.compact+json;q=0.9') == wire.COMPACT
+    assert wire.select_subprotocol(['xiangqi.compact']) == ('xiangqi.compact', wire.COMPACT)
+    assert wire.select_subprotocol(['other']) == (None, wire.JSON)
+
+    if wire.msgpack is None:
+        print("  (msgpack not installed, falling back to JSON)")
+        assert wire.negotiate('application/msgpack') == wire.JSON
+    else:
+        assert wire.negotiate('application/msgpack') == wire.MSGPACK
+        message = {'type': 'move', 'data': {'state': _played_game()}}
+        decoded = wire.decode(wire.encode(message, wire.MSGPACK))
+        assert decoded['data']['state'] == wire.compact_state(message['data']['state'])
+
+
+def main():
+    print("Testing wire formats")
+    print("=" * 60)
+    test_compact_state_is_small_and_complete()
+    test_negotiation()
+    print("✓ All wire format tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the Checkers rules
+Sets up fixed positions on an otherwise empty board
+"""
+
+import copy
+import random
+
+from Checkers import BitboardEngine, CheckersEngine, Move, square_bit
+
+
+def engine_with(pieces):
+    """Engine whose board holds only the given {(row, col): piece} pieces"""
+    engine = CheckersEngine(seed=1)
+    engine.board = [[' ' for _ in range(8)] for _ in range(8)]
+    for (row, col), piece in pieces.items():
+        engine.board[row][col] = piece
+    engine.human_pieces = sum(engine.is_human_piece(piece) for piece in pieces.values())
+    engine.ai_pieces = sum(engine.is_ai_piece(piece) for piece in pieces.values())
+    return engine
+
+
+def test_double_jump():
+    """A piece that can jump again must continue, and the move lists every square"""
+    engine = engine_with({(2, 1): 'X', (3, 2): 'O', (5, 4): 'O', (0, 1): 'X'})
+    assert engine.get_captures(2, 1) == [Move(((2, 1), (4, 3), (6, 5)), ((3, 2), (5, 4)))]
+
+
+def test_branching_chain():
+    """Every way a multi-jump can split is a separate move"""
+    engine = engine_with({(2, 3): 'X', (3, 4): 'O', (5, 4): 'O', (5, 6): 'O', (3, 2): 'O'})
+    assert sorted(engine.get_captures(2, 3)) == sorted([
+        Move(((2, 3), (4, 1)), ((3, 2),)),
+        Move(((2, 3), (4, 5), (6, 3)), ((3, 4), (5, 4))),
+        Move(((2, 3), (4, 5), (6, 7)), ((3, 4), (5, 6))),
+    ])
+
+
+def test_crowning_ends_the_move():
+    """A man crowned by a jump stops there; a king carries on"""
+    pieces = {(5, 2): 'X', (6, 3): 'O', (6, 5): 'O'}
+    engine = engine_with(pieces)
+    assert engine.get_captures(5, 2) == [Move(((5, 2), (7, 4)), ((6, 3),))]
+
+    engine = engine_with({**pieces, (5, 2): 'K'})
+    assert engine.get_captures(5, 2) == [Move(((5, 2), (7, 4), (5, 6)), ((6, 3), (6, 5)))]
+
+
+def test_king_loop_over_start_square():
+    """A king may land on the square it started from, but never jumps a piece twice"""
+    ring = {(3, 4): 'O', (5, 4): 'O', (5, 2): 'O', (3, 2): 'O'}
+    engine = engine_with({**ring, (2, 3): 'K'})
+    moves = engine.get_captures(2, 3)
+    assert sorted(moves) == sorted([
+        Move(((2, 3), (4, 5), (6, 3), (4, 1), (2, 3)), ((3, 4), (5, 4), (5, 2), (3, 2))),
+        Move(((2, 3), (4, 1), (6, 3), (4, 5), (2, 3)), ((3, 2), (5, 2), (5, 4), (3, 4))),
+    ])
+    assert engine.board[2][3] == 'K'  # Put back after generating the moves
+
+    # Returning to the start square with a loop of four pieces removes them all
+    engine.make_move(moves[0])
+    assert engine.board[2][3] == 'K' and engine.ai_pieces == 0
+    assert engine.check_winner('ai') == 'human'
+
+
+def test_jumps_are_compulsory():
+    """Only jumps are legal while any piece can jump"""
+    engine = engine_with({(2, 1): 'X', (2, 5): 'X', (3, 2): 'O', (6, 3): 'O'})
+    assert engine.get_all_valid_moves('human') == [Move(((2, 1), (4, 3)), ((3, 2),))]
+    assert engine.get_simple_moves(2, 5)  # The other piece could move if jumping were optional
+    assert engine.get_all_valid_moves('ai') == [Move(((3, 2), (1, 0)), ((2, 1),))]
+
+
+def test_undo_restores_board_and_counts():
+    """undo_move takes back every capture and a crowning"""
+    engine = engine_with({(2, 1): 'X', (3, 2): 'O', (5, 4): 'O', (7, 0): 'O', (2, 7): 'O', (1, 6): 'X'})
+    for player in ('human', 'ai'):
+        for move in engine.get_all_valid_moves(player):
+            board = copy.deepcopy(engine.board)
+            counts = (engine.human_pieces, engine.ai_pieces)
+            undo = engine.make_move(move)
+            assert engine.board != board
+            engine.undo_move(move, undo)
+            assert engine.board == board
+            assert (engine.human_pieces, engine.ai_pieces) == counts
+
+    # A double jump that ends on the last row: two captures and a new king
+    engine = engine_with({(3, 0): 'X', (4, 1): 'O', (6, 3): 'O', (0, 7): 'O'})
+    move, = engine.get_all_valid_moves('human')
+    board = copy.deepcopy(engine.board)
+    undo = engine.make_move(move)
+    assert engine.board[7][4] == 'K' and engine.ai_pieces == 1
+    engine.undo_move(move, undo)
+    assert engine.board == board and engine.ai_pieces == 3 and engine.human_pieces == 1
+
+
+def as_bitboard_move(move):
+    """(from bit, to bit, jumped pieces) of a CheckersEngine move"""
+    return (square_bit(*move.path[0]), square_bit(*move.path[-1]),
+            sum(square_bit(row, col) for row, col in move.captures))
+
+
+def test_bitboard_engine_agrees_with_rules():
+    """BitboardEngine generates and applies the same moves as CheckersEngine"""
+    bitboard = BitboardEngine()
+    for seed in range(5):
+        rng = random.Random(seed)
+        engine = CheckersEngine(seed=seed)
+        player = 'human'
+        for _ in range(150):
+            own, opp, kings, side = engine.to_bitboards(player)
+            moves = engine.get_all_valid_moves(player)
+            assert sorted(bitboard.legal_moves(own, opp, kings, side)) == sorted(map(as_bitboard_move, moves))
+            if not moves:
+                break
+
+            move = rng.choice(moves)
+            engine.make_move(move)
+            player = 'ai' if player == 'human' else 'human'
+            assert bitboard.apply(own, opp, kings, side, as_bitboard_move(move)) == engine.to_bitboards(player)[:3]
+
+
+def test_search_finds_forced_win():
+    """The search finds the waiting move that forces the last human man into a capture"""
+    engine = engine_with({(5, 0): 'X', (7, 2): 'O', (0, 7): 'Q'})
+    bitboard = BitboardEngine()
+    move, score, _ = bitboard.best_move(*engine.to_bitboards('ai'), time_limit=5)
+    assert score >= BitboardEngine.WIN_SCORE - 3
+    assert move[0] == square_bit(0, 7)  # Moving the man lets the human man through
+
+    # Play it out: the human's only move walks into the capture
+    engine.time_limit = 5
+    engine.make_move(engine.choose_move('ai'))
+    reply, = engine.get_all_valid_moves('human')
+    engine.make_move(reply)
+    engine.make_move(engine.choose_move('ai'))
+    assert engine.check_winner('human') == 'ai'
+
+
+def main():
+    print("Testing Checkers rules")
+    print("=" * 60)
+    test_double_jump()
+    test_branching_chain()
+    test_crowning_ends_the_move()
+    test_king_loop_over_start_square()
+    test_jumps_are_compulsory()
+    test_undo_restores_board_and_counts()
+    test_bitboard_engine_agrees_with_rules()
+    test_search_finds_forced_win()
+    print("✓ All Checkers tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the Connect 4 solver and opening book
+Builds a small book a few plies below a late position so the solves stay quick
+"""
+
+import os
+import struct
+import tempfile
+
+from Connect4 import BENCHMARK_POSITIONS, BitboardEngine, OpeningBook, build_opening_book
+
+# Root of the test book (18 moves played) and the plies it covers
+BOOK_ROOT = "134443344324172631"
+BOOK_PLIES = 2
+
+
+def mirrored(sequence):
+    """Moves of the mirror image of a game (columns 1-7)"""
+    return "".join(str(8 - int(move)) for move in sequence)
+
+
+def test_solve_benchmark_positions():
+    """The solver finds the exact score of every benchmark position"""
+    engine = BitboardEngine(tt_size=100_003)
+    for sequence, expected in BENCHMARK_POSITIONS:
+        assert engine.solve(*BitboardEngine.from_moves(sequence)) == expected, sequence
+
+
+def test_opening_book():
+    """A built book agrees with solve_move, also for mirror images, and has the documented format"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.bin")
+        build_opening_book(path, plies=BOOK_PLIES, root=BOOK_ROOT, workers=1)
+        book = OpeningBook(path)
+        engine = BitboardEngine(tt_size=100_003)
+
+        checked = 0
+        for sequence in [BOOK_ROOT] + [BOOK_ROOT + str(col) for col in range(1, 8)]:
+            try:
+                position, mask, moves = BitboardEngine.from_moves(sequence)
+            except ValueError:
+                continue  # Full column, or the game ends with this move
+            entry = book.lookup(position, mask)
+            assert entry is not None, sequence
+            col, score = entry
+            assert score == engine.solve_move(position, mask, moves)[1]
+
+            # The book move reaches that score (other columns may tie with it)
+            bit = ((mask + BitboardEngine.BOTTOM) & BitboardEngine.FULL) & (0x3F << (col * 7))
+            assert bit
+            assert -engine.solve(position ^ mask, mask | bit, moves + 1) == score
+
+            mirror_position, mirror_mask, _ = BitboardEngine.from_moves(mirrored(sequence))
+            mirror = book.lookup(mirror_position, mirror_mask)
+            assert mirror == (6 - col, score)
+            checked += 1
+        assert checked == book.count > 1
+        deeper = BitboardEngine.from_moves(BOOK_ROOT + "55")
+        assert book.lookup(deeper[0], deeper[1]) is None  # Beyond the plies of the book
+        book.close()
+
+        # Header, then sorted records: key << 9 | (score + 21) << 3 | column
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, plies, count = OpeningBook.HEADER.unpack_from(data)
+        assert magic == b"C4BK"
+        assert plies == len(BOOK_ROOT) + BOOK_PLIES and count == checked
+        records = struct.unpack_from(f"<{count}Q", data, OpeningBook.HEADER.size)
+        assert len(data) == OpeningBook.HEADER.size + 8 * count
+        assert list(records) == sorted(records)
+        position, mask, _ = BitboardEngine.from_moves(BOOK_ROOT)
+        key, _ = OpeningBook.canonical(position, mask)
+        record = next(value for value in records if value >> 9 == key)
+        assert (record & 7, ((record >> 3) & 0x3F) - 21) == OpeningBook(path).entries()[key]
+
+        with open(path, "r+b") as f:
+            f.write(b"XXXX")
+        try:
+            OpeningBook(path)
+            assert False, "corrupt book accepted"
+        except ValueError:
+            pass
+
+
+def main():
+    print("Testing the Connect 4 solver")
+    print("=" * 60)
+    test_solve_benchmark_positions()
+    test_opening_book()
+    print("✓ All Connect 4 solver tests passed!")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())